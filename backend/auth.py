@@ -1,12 +1,13 @@
 # backend/auth.py
 import os
+from functools import lru_cache
 from typing import List, Optional
 
-from fastapi import Header, HTTPException, status
+from fastapi import Depends, Header, HTTPException, status
 from firebase_admin import auth as fb_auth
 
-from google.oauth2 import id_token as google_id_token
-from google.auth.transport import requests as google_requests
+# google.oauth2.id_token / google.auth.transport.requests are imported on
+# first use (_oidc_request): only Cloud Scheduler's OIDC calls need them.
 
 # -------------------------
 # Config from environment
@@ -27,6 +28,34 @@ ALLOWED_SERVICE_ACCOUNTS: List[str] = [
 # Expected audience for Google OIDC tokens (Cloud Run URL)
 SERVICE_AUDIENCE: Optional[str] = os.getenv("SERVICE_AUDIENCE")
 
+# Google's OIDC signing certs (warm_oidc_certs)
+GOOGLE_OAUTH2_CERTS_URL = "https://www.googleapis.com/oauth2/v1/certs"
+
+
+@lru_cache(maxsize=1)
+def _oidc_request():
+    """
+    Transport for OIDC verification. The session honours Cache-Control, so
+    Google's signing certs are fetched once per expiry, not on every call.
+    """
+    import cachecontrol
+    import requests
+    from google.auth.transport import requests as google_requests
+
+    return google_requests.Request(session=cachecontrol.CacheControl(requests.Session()))
+
+
+def warm_oidc_certs():
+    """
+    Fetch Google's OIDC signing certs through the cached transport that
+    verify_oauth2_token uses (called from main.py's lifespan hook), so the
+    first service-account call doesn't pay for it. No-op without
+    SERVICE_AUDIENCE. Firebase ID token certs aren't warmed: firebase_admin
+    verifies through its own session and cache.
+    """
+    if SERVICE_AUDIENCE:
+        _oidc_request()(url=GOOGLE_OAUTH2_CERTS_URL, method="GET")
+
 
 def _email_domain(email: str) -> str:
     """Return the exact domain part after '@'."""
@@ -88,10 +117,11 @@ def _try_verify_service_account_token(raw_token: str):
             detail="SERVICE_AUDIENCE not configured on server",
         )
 
-    request = google_requests.Request()
+    from google.oauth2 import id_token as google_id_token
+
     try:
         payload = google_id_token.verify_oauth2_token(
-            raw_token, request, SERVICE_AUDIENCE
+            raw_token, _oidc_request(), SERVICE_AUDIENCE
         )
     except Exception as e:
         # Not a valid OIDC token, or wrong audience/issuer
@@ -152,3 +182,22 @@ def verify_firebase_token(authorization: str | None = Header(default=None)):
 
     # 2) Try OIDC (service accounts, e.g., Cloud Scheduler)
     return _try_verify_service_account_token(raw_token)
+
+
+def require_admin(claims: dict = Depends(verify_firebase_token)):
+    """
+    Dependency for /admin endpoints: on top of verify_firebase_token, only
+    internal callers pass, i.e. a service account listed in
+    ALLOWED_SERVICE_ACCOUNTS (Cloud Scheduler) or a Firebase user with the
+    custom claim admin=true. Any other signed-in student gets 403.
+    """
+    if "firebase" in claims:  # Firebase ID token (students)
+        if claims.get("admin") is True:
+            return claims
+    elif (claims.get("email") or "").lower() in ALLOWED_SERVICE_ACCOUNTS:
+        return claims
+
+    raise HTTPException(
+        status_code=status.HTTP_403_FORBIDDEN,
+        detail="Admin access required",
+    )
@@ -0,0 +1,83 @@
+# backend/benchmarks/bench_artifacts.py
+# File size and load time of the pipeline artifacts (out_busy,
+# out_availability, availability_slots) as JSONL vs the columnar ".cols"
+# format in scrapers/webscraping_and_firestore/artifacts.py, on a synthetic
+# schedule: whole records, and one field (roomId, as collect_codes_from_jsonl
+# reads it) via iter_column. Also checks every record round-trips unchanged.
+#
+#   cd backend && python -m benchmarks.bench_artifacts
+#   python -m benchmarks.bench_artifacts --rows 100000 --repeat 1
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.bench_pipeline import _quiet, make_schedule, scraper, slotgen
+
+import artifacts  # noqa: E402  (scraper dir is on sys.path via bench_pipeline)
+
+
+def pipeline_records(n_rows: int, seed: int):
+    """{"busy": [...], "availability": [...], "slots": [...]} as csulb_scraper.main writes them."""
+    classes, building_map = make_schedule(n_rows, seed)
+    per_day = scraper.build_daily_busy_and_free(_quiet(scraper.clean_scraped_data, classes, building_map))
+    out = {"busy": [], "availability": [], "slots": []}
+    for (room_id, date), data in per_day.items():
+        bcode, room_num = scraper._split_room_id_for_floor(room_id)
+        room = {
+            "buildingCode": bcode, "roomNumber": room_num,
+            "floor": scraper._infer_floor(room_num), "campusZone": scraper._campus_zone_student(bcode),
+        }
+        out["busy"].append({"roomId": room_id, "date": date, "intervals": data["busy"], **room})
+        avail = {"roomId": room_id, "date": date, "campusOpen": {"start": "07:00", "end": "22:00"},
+                 "free": data["free"], **room}
+        out["availability"].append(avail)
+        out["slots"].extend(slotgen.slots_for_availability(avail))
+    return out
+
+
+def _best(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSONL vs columnar artifact size and load time")
+    parser.add_argument("--rows", type=int, default=20000, help="synthetic class rows")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    records = pipeline_records(args.rows, args.seed)
+    ok = True
+    print(f"{args.rows} class rows")
+    print(f"{'artifact':<14}{'records':>9}{'jsonl MB':>10}{'cols MB':>9}{'ratio':>7}"
+          f"{'jsonl load s':>14}{'cols load s':>13}{'jsonl roomId s':>16}{'cols roomId s':>15}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for kind, recs in records.items():
+            jp, cp = os.path.join(tmp, kind + artifacts.JSONL), os.path.join(tmp, kind + artifacts.COLUMNAR)
+            artifacts.write_records(jp, recs, kind)
+            artifacts.write_records(cp, recs, kind)
+            if list(artifacts.read_records(cp)) != recs or list(artifacts.read_records(jp)) != recs:
+                print(f"{kind}: ROUND-TRIP MISMATCH")
+                ok = False
+            js, cs = os.path.getsize(jp), os.path.getsize(cp)
+            jt = _best(lambda: list(artifacts.read_records(jp)), args.repeat)
+            ct = _best(lambda: list(artifacts.read_records(cp)), args.repeat)
+            if list(artifacts.iter_column(cp, "roomId")) != [r["roomId"] for r in recs]:
+                print(f"{kind}: COLUMN MISMATCH")
+                ok = False
+            jf = _best(lambda: set(artifacts.iter_column(jp, "roomId")), args.repeat)
+            cf = _best(lambda: set(artifacts.iter_column(cp, "roomId")), args.repeat)
+            print(f"{kind:<14}{len(recs):>9}{js / 2**20:>10.2f}{cs / 2**20:>9.2f}{js / cs:>6.1f}x"
+                  f"{jt:>14.3f}{ct:>13.3f}{jf:>16.3f}{cf:>15.4f}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+# backend/benchmarks/bench_pipeline.py
+# Micro-benchmarks for the scraper / slot-generation pipeline on synthetic
+# schedules, plus golden-output checks so optimizations of these functions
+# can be shown to be behavior-preserving.
+#
+# Stages (each timed on its own input, produced by the previous stage):
+#   normalize   normalize_time_range on every raw "8-9:50AM"-style range
+#   clean       clean_scraped_data (day codes, session dates, normalize)
+#   expand      expand_days_to_dates for every cleaned row
+#   merge       validate_and_merge per (roomId, date)
+#   invert      invert_busy_to_free per (roomId, date)
+#   daily       build_daily_busy_and_free end to end (expand+merge+invert)
+#   slots       slots_for_availability per availability record
+#
+#   cd backend && python -m benchmarks.bench_pipeline                  # check golden + 10k, 100k rows
+#   python -m benchmarks.bench_pipeline --sizes 10000,1000000 --repeat 1
+#   python -m benchmarks.bench_pipeline --update-golden                # after an intended change
+#
+# Reports rows/s and tracemalloc peak per stage. Exit status 1 if any stage's
+# output differs from benchmarks/golden/pipeline.json.
+import argparse
+import gc
+import hashlib
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SCRAPER_DIR = os.path.join(HERE, "..", "scrapers", "webscraping_and_firestore")
+GOLDEN_PATH = os.path.join(HERE, "golden", "pipeline.json")
+GOLDEN_ROWS = 3000
+GOLDEN_SEED = 7
+
+sys.path.insert(0, SCRAPER_DIR)
+import csulb_scraper as scraper  # noqa: E402
+import generate_availability_slots as slotgen  # noqa: E402
+
+SESSIONS = ["Aug 25-Dec 10,2025", "Aug 25-Oct 17,2025", "Oct 20-Dec 10,2025"]
+DAY_CODES = ["MW", "TuTh", "MWF", "M", "Tu", "W", "Th", "F", "MTuWTh", "WF", "Sa"]
+DURATIONS = [50, 75, 110, 165]
+
+
+def _raw_range(rng: random.Random) -> str:
+    """A class time in one of the schedule's formats ('8-9:50AM', '11:00-12:15PM', ...)."""
+    start = rng.randrange(7 * 60, 21 * 60, 30)
+    end = start + rng.choice(DURATIONS)
+
+    def tok(m, minutes_always):
+        h12 = (m // 60 - 1) % 12 + 1
+        return f"{h12}:{m % 60:02d}" if (m % 60 or minutes_always) else str(h12)
+
+    sfx_s = "AM" if start < 720 else "PM"
+    sfx_e = "AM" if end < 720 else "PM"
+    style = rng.randrange(3)
+    if style == 0:      # suffix on both sides
+        return f"{tok(start, True)}{sfx_s}-{tok(end, True)}{sfx_e}"
+    if style == 1:      # end suffix only, minutes optional
+        return f"{tok(start, False)}-{tok(end, False)}{sfx_e}"
+    return f"{tok(start, True)}-{tok(end, True)}{sfx_e}"
+
+
+def make_schedule(n_rows: int, seed: int):
+    """Raw scraped rows [session, days, time, location] + building map."""
+    rng = random.Random(seed)
+    with open(os.path.join(SCRAPER_DIR, "building_codes.json"), encoding="utf-8") as f:
+        building_map = json.load(f)
+    codes = sorted(building_map)
+    n_rooms = max(20, n_rows // 8)
+    rooms = [f"{rng.choice(codes)}-{rng.randrange(1, 6)}{rng.randrange(0, 40):02d}" for _ in range(n_rooms)]
+    classes = [
+        [rng.choice(SESSIONS), rng.choice(DAY_CODES), _raw_range(rng), rng.choice(rooms)]
+        for _ in range(n_rows)
+    ]
+    return classes, building_map
+
+
+def _quiet(fn, *args):
+    """clean_scraped_data prints a warning for unknown codes; keep output readable."""
+    stdout, sys.stdout = sys.stdout, open(os.devnull, "w")
+    try:
+        return fn(*args)
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+
+
+def stages(classes, building_map):
+    """[(name, n_items, fn)]; each fn runs the stage on inputs prepared here."""
+    raw_ranges = [c[2] for c in classes]
+    cleaned = _quiet(scraper.clean_scraped_data, classes, building_map)
+
+    grouped = defaultdict(list)
+    for row in cleaned:
+        room_id = f"{row['building_code']}-{row['room']}"
+        for d in scraper.expand_days_to_dates(row["start_date"], row["end_date"], row["days"]):
+            grouped[(room_id, d)].append({"start": row["start_time"], "end": row["end_time"]})
+    groups = list(grouped.values())
+    merged = [scraper.validate_and_merge(g) for g in groups]
+
+    per_day = scraper.build_daily_busy_and_free(cleaned)
+    availability = []
+    for (room_id, date), data in per_day.items():
+        bcode, room_num = scraper._split_room_id_for_floor(room_id)
+        availability.append({
+            "roomId": room_id, "date": date, "free": data["free"],
+            "buildingCode": bcode, "roomNumber": room_num,
+            "floor": scraper._infer_floor(room_num), "campusZone": scraper._campus_zone_student(bcode),
+        })
+
+    return [
+        ("normalize", len(raw_ranges), lambda: [scraper.normalize_time_range(r) for r in raw_ranges]),
+        ("clean", len(classes), lambda: _quiet(scraper.clean_scraped_data, classes, building_map)),
+        ("expand", len(cleaned), lambda: [
+            scraper.expand_days_to_dates(r["start_date"], r["end_date"], r["days"]) for r in cleaned
+        ]),
+        ("merge", len(groups), lambda: [scraper.validate_and_merge(g) for g in groups]),
+        ("invert", len(merged), lambda: [scraper.invert_busy_to_free(b) for b in merged]),
+        ("daily", len(cleaned), lambda: scraper.build_daily_busy_and_free(cleaned)),
+        ("slots", len(availability), lambda: [slotgen.slots_for_availability(a) for a in availability]),
+    ]
+
+
+def _digest(output) -> str:
+    if isinstance(output, dict):  # build_daily_busy_and_free: {(roomId, date): ...}
+        output = sorted([list(k), v] for k, v in output.items())
+    return hashlib.sha256(json.dumps(output, sort_keys=True).encode()).hexdigest()
+
+
+def golden_digests():
+    classes, building_map = make_schedule(GOLDEN_ROWS, GOLDEN_SEED)
+    return {name: _digest(fn()) for name, _, fn in stages(classes, building_map)}
+
+
+def check_golden(update: bool) -> bool:
+    digests = golden_digests()
+    if update:
+        os.makedirs(os.path.dirname(GOLDEN_PATH), exist_ok=True)
+        with open(GOLDEN_PATH, "w", encoding="utf-8") as f:
+            json.dump({"rows": GOLDEN_ROWS, "seed": GOLDEN_SEED, "sha256": digests}, f, indent=2)
+            f.write("\n")
+        print(f"golden: updated {GOLDEN_PATH}")
+        return True
+    with open(GOLDEN_PATH, encoding="utf-8") as f:
+        expected = json.load(f)["sha256"]
+    bad = [name for name in expected if digests.get(name) != expected[name]]
+    print("golden: OK" if not bad else f"golden: MISMATCH in {', '.join(bad)}")
+    return not bad
+
+
+def bench(n_rows: int, repeat: int, seed: int):
+    classes, building_map = make_schedule(n_rows, seed)
+    print(f"\n{n_rows} class rows")
+    print(f"{'stage':<11}{'items':>10}{'best s':>10}{'items/s':>13}{'peak MB':>10}")
+    for name, n_items, fn in stages(classes, building_map):
+        best = float("inf")
+        for _ in range(repeat):
+            gc.collect()
+            t0 = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - t0)
+        # separate run: tracemalloc slows the code it traces
+        gc.collect()
+        tracemalloc.start()
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"{name:<11}{n_items:>10}{best:>10.3f}{n_items / best:>13,.0f}{peak / 2**20:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scraper pipeline micro-benchmarks")
+    parser.add_argument("--sizes", default="10000,100000", help="comma-separated class-row counts")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--update-golden", action="store_true")
+    parser.add_argument("--golden-only", action="store_true")
+    args = parser.parse_args()
+
+    ok = check_golden(args.update_golden)
+    if not args.golden_only:
+        for n in (int(s) for s in args.sizes.split(",") if s):
+            bench(n, args.repeat, args.seed)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
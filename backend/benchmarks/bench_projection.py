@@ -0,0 +1,152 @@
+# backend/benchmarks/bench_projection.py
+# Bytes and latency saved per page by the select() projections on the listing
+# routes (list_rooms, list_buildings, get_all_groups).
+#
+# Runs against the Firestore emulator only; it seeds its own data:
+#   gcloud emulators firestore start --host-port=localhost:8080
+#   cd backend && FIRESTORE_EMULATOR_HOST=localhost:8080 python -m benchmarks.bench_projection
+import argparse
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+from google.cloud import firestore
+
+from routers import groups, rooms
+from services import metrics
+
+BENCH_DATE = "2099-01-01"
+BATCH_SIZE = 500
+
+
+def _seed(db, n_slots: int, n_groups: int):
+    """Slot / building / group docs shaped like the scrapers' and create_group's output."""
+    batch, pending = db.batch(), 0
+
+    def put(ref, data):
+        nonlocal batch, pending
+        batch.set(ref, data)
+        pending += 1
+        if pending == BATCH_SIZE:
+            batch.commit()
+            batch, pending = db.batch(), 0
+
+    for b in range(50):
+        code = f"B{b:02d}"
+        put(db.collection(rooms.BUILDINGS_COLLECTION).document(code), {
+            "code": code,
+            "name": f"Benchmark Building {b}",
+            "address": f"{b} Bellflower Blvd, Long Beach, CA",
+            "campusZone": "north" if b % 2 else "south",
+            "floors": 1 + b % 5,
+        })
+
+    for i in range(n_slots):
+        code = f"B{i % 50:02d}"
+        room = f"{100 + (i // 50) % 400}"
+        start = 420 + (i % 12) * 60
+        end = start + 90
+        room_id = f"{code}-{room}"
+        put(db.collection(rooms.COLLECTION).document(f"{room_id}_{BENCH_DATE}_{start}_{end}"), {
+            "roomId": room_id,
+            "buildingCode": code,
+            "roomNumber": room,
+            "date": BENCH_DATE,
+            "start": f"{start // 60:02d}:{start % 60:02d}",
+            "end": f"{end // 60:02d}:{end % 60:02d}",
+            "startMin": start,
+            "endMin": end,
+            "durationMin": end - start,
+            "floor": int(room[0]),
+            "campusZone": "north" if i % 2 else "south",
+            "locked_reports": 0,
+            "currentCheckins": 0,
+        })
+
+    expire = datetime.now(timezone.utc) + timedelta(days=30)
+    for i in range(n_groups):
+        name = f"Benchmark Study Group {i} Calculus Review"
+        put(db.collection(groups.COLLECTION).document(f"bench-{i}"), {
+            "id": f"bench-{i}",
+            "name": name,
+            "nameLower": name.lower(),
+            "nameTokens": groups._name_search_tokens(name),
+            "buildingCode": "B00",
+            "roomNumber": "101",
+            "date": "2099-01-01",
+            "startTime": "09:00",
+            "endTime": "10:30",
+            "quantity": 4,
+            "ownerID": "bench-owner",
+            "members": [f"bench-user-{i}-{m}" for m in range(4)],
+            "availabilitySlotDocument": f"B00-101_{BENCH_DATE}_540_630",
+            "expireAt": expire,
+        })
+
+    if pending:
+        batch.commit()
+
+
+def _queries(db, page: int):
+    slots = (
+        db.collection(rooms.COLLECTION)
+        .where("date", "==", BENCH_DATE)
+        .order_by("roomId").order_by("date").order_by("startMin")
+        .limit(page)
+    )
+    return {
+        "list_rooms": (slots, rooms.SLOT_LIST_FIELDS),
+        "list_buildings": (db.collection(rooms.BUILDINGS_COLLECTION), rooms.BUILDING_LIST_FIELDS),
+        "get_all_groups": (db.collection(groups.COLLECTION), groups.GROUP_LIST_FIELDS),
+    }
+
+
+def _measure(query, repeat: int):
+    """Median (bytes, seconds, docs) of streaming `query` `repeat` times."""
+    samples = []
+    for _ in range(repeat):
+        stats, token = metrics.begin_request()
+        t0 = time.perf_counter()
+        n = sum(1 for _ in query.stream())
+        elapsed = time.perf_counter() - t0
+        metrics.end_request(token)
+        samples.append((stats.bytes, elapsed, n))
+    return (
+        statistics.median(s[0] for s in samples),
+        statistics.median(s[1] for s in samples),
+        samples[0][2],
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Projection benchmark (Firestore emulator only)")
+    parser.add_argument("--slots", type=int, default=5000)
+    parser.add_argument("--groups", type=int, default=500)
+    parser.add_argument("--page", type=int, default=200, help="docs per list_rooms page")
+    parser.add_argument("--repeat", type=int, default=15)
+    parser.add_argument("--no-seed", action="store_true")
+    args = parser.parse_args()
+
+    if not os.getenv("FIRESTORE_EMULATOR_HOST"):
+        sys.exit("FIRESTORE_EMULATOR_HOST is not set; this benchmark writes data and only runs on the emulator.")
+
+    db = metrics.instrument_client(firestore.Client(project=os.getenv("FIRESTORE_PROJECT_ID", "demo-studybuddy")))
+    if not args.no_seed:
+        print(f"Seeding {args.slots} slots, 50 buildings, {args.groups} groups ...")
+        _seed(db, args.slots, args.groups)
+
+    print(f"{'route':<16}{'docs':>6}{'full KB':>10}{'proj KB':>10}{'saved':>8}{'full ms':>10}{'proj ms':>10}")
+    for route, (query, fields) in _queries(db, args.page).items():
+        full_bytes, full_sec, n = _measure(query, args.repeat)
+        proj_bytes, proj_sec, _ = _measure(query.select(fields), args.repeat)
+        saved = 1 - proj_bytes / full_bytes if full_bytes else 0.0
+        print(
+            f"{route:<16}{n:>6}{full_bytes / 1024:>10.1f}{proj_bytes / 1024:>10.1f}{saved:>8.0%}"
+            f"{full_sec * 1000:>10.1f}{proj_sec * 1000:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
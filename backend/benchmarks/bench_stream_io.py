@@ -0,0 +1,142 @@
+# backend/benchmarks/bench_stream_io.py
+# JSONL read/write speed and upload-path memory: the per-line json.loads /
+# json.dumps text I/O the pipeline used before vs stream_io (orjson when
+# installed, 1 MiB buffers), on a synthetic full-semester schedule.
+#
+# The upload rows replay upload_availability with a no-op WriteBatch, so
+# only file I/O and the writes-list vs generator difference are measured;
+# the peak is tracemalloc's, at 1x and 4x the file (repeated records), to
+# show whether memory grows with the file.
+#
+#   cd backend && python -m benchmarks.bench_stream_io
+#   python -m benchmarks.bench_stream_io --rows 5000 --repeat 1
+import argparse
+import json
+import os
+import tempfile
+import tracemalloc
+
+from benchmarks.bench_artifacts import _best, pipeline_records
+
+import stream_io  # noqa: E402  (scraper dir is on sys.path via bench_pipeline)
+
+
+class _NullBatch:
+    def set(self, ref, data, merge=False):
+        pass
+
+    def delete(self, ref):
+        pass
+
+    def commit(self):
+        pass
+
+
+class _NullDB:
+    def batch(self):
+        return _NullBatch()
+
+
+def write_old(path, records):
+    with open(path, "w", encoding="utf-8") as f:
+        for rec in records:
+            f.write(json.dumps(rec) + "\n")
+
+
+def write_new(path, records):
+    with stream_io.JsonlWriter(path) as w:
+        for rec in records:
+            w.write(rec)
+
+
+def read_old(path):
+    n = 0
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                json.loads(line)
+                n += 1
+    return n
+
+
+def read_new(path):
+    return sum(1 for _ in stream_io.iter_jsonl(path))
+
+
+def upload_old(path, db, batch_size=500):
+    """upload_availability before: whole writes list, then batched_set."""
+    writes = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                obj = json.loads(line)
+                bcode, room = obj["roomId"].split("-", 1)
+                writes.append((obj["roomId"], {**obj, "buildingCode": bcode, "room": room}, False))
+    batch, i = db.batch(), 0
+    for ref, data, merge in writes:
+        batch.set(ref, data, merge=merge)
+        i += 1
+        if i >= batch_size:
+            batch.commit()
+            batch, i = db.batch(), 0
+    if i:
+        batch.commit()
+    return len(writes)
+
+
+def upload_new(path, db, batch_size=500):
+    """upload_availability now: a generator straight into commit_in_batches."""
+    def writes():
+        for obj in stream_io.iter_jsonl(path):
+            bcode, room = obj["roomId"].split("-", 1)
+            yield obj["roomId"], {**obj, "buildingCode": bcode, "room": room}, False
+    return stream_io.commit_in_batches(db, writes(), batch_size)
+
+
+def _peak_mb(fn, *args):
+    tracemalloc.start()
+    fn(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="json vs stream_io JSONL speed and upload memory")
+    parser.add_argument("--rows", type=int, default=20000, help="synthetic class rows (~ a full semester)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    records = pipeline_records(args.rows, args.seed)
+    codec = "orjson" if stream_io.orjson is not None else "json (orjson not installed)"
+    print(f"{args.rows} class rows; stream_io codec: {codec}")
+    print(f"{'artifact':<14}{'records':>9}{'MB':>7}{'write old s':>13}{'write new s':>13}"
+          f"{'read old s':>12}{'read new s':>12}{'speedup':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for kind, recs in records.items():
+            old_path, new_path = os.path.join(tmp, f"{kind}.old.jsonl"), os.path.join(tmp, f"{kind}.new.jsonl")
+            w_old = _best(lambda: write_old(old_path, recs), args.repeat)
+            w_new = _best(lambda: write_new(new_path, recs), args.repeat)
+            assert list(stream_io.iter_jsonl(old_path)) == list(stream_io.iter_jsonl(new_path)) == recs
+            r_old = _best(lambda: read_old(old_path), args.repeat)
+            r_new = _best(lambda: read_new(new_path), args.repeat)
+            mb = os.path.getsize(old_path) / 1e6
+            print(f"{kind:<14}{len(recs):>9}{mb:>7.1f}{w_old:>13.3f}{w_new:>13.3f}"
+                  f"{r_old:>12.3f}{r_new:>12.3f}{(w_old + r_old) / (w_new + r_new):>8.1f}x")
+
+        print(f"\nupload_availability replay (no-op batches)")
+        print(f"{'file':<8}{'records':>9}{'old s':>8}{'new s':>8}{'old peak MB':>13}{'new peak MB':>13}")
+        db = _NullDB()
+        for scale in (1, 4):
+            path = os.path.join(tmp, f"availability.x{scale}.jsonl")
+            write_new(path, records["availability"] * scale)
+            t_old = _best(lambda: upload_old(path, db), args.repeat)
+            t_new = _best(lambda: upload_new(path, db), args.repeat)
+            assert upload_old(path, db) == upload_new(path, db)
+            print(f"{scale}x{'':<6}{len(records['availability']) * scale:>9}{t_old:>8.2f}{t_new:>8.2f}"
+                  f"{_peak_mb(upload_old, path, db):>13.1f}{_peak_mb(upload_new, path, db):>13.2f}")
+
+
+if __name__ == "__main__":
+    main()
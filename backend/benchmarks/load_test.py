@@ -0,0 +1,225 @@
+# backend/benchmarks/load_test.py
+# Drives a running API (pointed at the emulators and seeded by
+# benchmarks/seed_emulator.py) at a fixed concurrency and reports, per
+# scenario, p50/p95/p99 latency, throughput and Firestore ops per request
+# (from the API's own /metrics counters).
+#
+#   cd backend && FIRESTORE_EMULATOR_HOST=localhost:8080 \
+#       FIREBASE_AUTH_EMULATOR_HOST=localhost:9099 \
+#       GOOGLE_CLOUD_PROJECT=demo-studybuddy uvicorn main:app --port 8000
+#   FIREBASE_AUTH_EMULATOR_HOST=localhost:9099 python -m benchmarks.load_test \
+#       --concurrency 16 --requests 400
+#
+# Results go to benchmarks/results/<commit>[-dirty][-label].json; pass
+# --compare <older results file> to print the change per scenario.
+import argparse
+import http.client
+import json
+import math
+import os
+import random
+import re
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from benchmarks.seed_emulator import MANIFEST_PATH
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+FS_FIELDS = ("reads", "writes", "round_trips", "bytes")
+_METRIC_RE = re.compile(r'^studybuddy_firestore_(\w+)_total\{route="([^"]*)"\} (\S+)$')
+
+
+# name -> (method, route template as labelled in /metrics, path builder)
+def _scenarios(m):
+    dates = m["dates"]
+    today = dates[0]
+
+    def rooms(rng):
+        q = {"date": today, "limit": 50}
+        if rng.random() < 0.5:
+            s = rng.randrange(7, 20)
+            q["startTime"], q["endTime"] = f"{s:02d}:00", f"{s + 2:02d}:00"
+        if rng.random() < 0.3:
+            q["building"] = rng.choice(m["buildings"])
+        return "/rooms/?" + urllib.parse.urlencode(q)
+
+    return {
+        "rooms": ("GET", "/rooms/", rooms),
+        "buildings": ("GET", "/rooms/buildings", lambda rng: "/rooms/buildings"),
+        "groups": ("GET", "/group/", lambda rng: "/group/"),
+        "group_detail": ("GET", "/group/{group_id}", lambda rng: f"/group/{rng.choice(m['groupIds'])}"),
+        "report_locked": (
+            "POST",
+            "/rooms/{room_id}/report_locked",
+            lambda rng: f"/rooms/{rng.choice(m['slotIds'])}/report_locked",
+        ),
+    }
+
+
+def _sign_in(users, password):
+    """ID tokens from the Auth emulator (any API key is accepted there)."""
+    host = os.getenv("FIREBASE_AUTH_EMULATOR_HOST")
+    if not host:
+        sys.exit("FIREBASE_AUTH_EMULATOR_HOST is not set.")
+    url = f"http://{host}/identitytoolkit.googleapis.com/v1/accounts:signInWithPassword?key=benchmark"
+    tokens = []
+    for u in users:
+        body = json.dumps({"email": u["email"], "password": password, "returnSecureToken": True}).encode()
+        req = urllib.request.Request(url, data=body, headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(req) as resp:
+            tokens.append(json.load(resp)["idToken"])
+    return tokens
+
+
+def _firestore_counters(base_url):
+    """{route: {reads, writes, round_trips, bytes}} from GET /metrics."""
+    with urllib.request.urlopen(base_url + "/metrics") as resp:
+        text = resp.read().decode()
+    out = {}
+    for line in text.splitlines():
+        match = _METRIC_RE.match(line)
+        if match and match.group(1) in FS_FIELDS:
+            out.setdefault(match.group(2), dict.fromkeys(FS_FIELDS, 0.0))[match.group(1)] = float(match.group(3))
+    return out
+
+
+class _Client:
+    """One keep-alive connection per worker thread."""
+
+    _local = threading.local()
+
+    def __init__(self, base_url):
+        parsed = urllib.parse.urlparse(base_url)
+        self.host, self.port = parsed.hostname, parsed.port or 80
+
+    def request(self, method, path, token):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = http.client.HTTPConnection(self.host, self.port, timeout=60)
+        headers = {"Authorization": f"Bearer {token}", "Accept-Encoding": "gzip"}
+        t0 = time.perf_counter()
+        try:
+            conn.request(method, path, headers=headers)
+            resp = conn.getresponse()
+            resp.read()
+            status = resp.status
+        except (http.client.HTTPException, OSError):
+            self._local.conn = None
+            conn.close()
+            status = 0
+        return time.perf_counter() - t0, status
+
+
+def _percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    # nearest-rank
+    k = max(0, min(len(sorted_values) - 1, math.ceil(p / 100 * len(sorted_values)) - 1))
+    return sorted_values[k]
+
+
+def run_scenario(client, base_url, method, route, make_path, tokens, n, concurrency, warmup, seed):
+    rng = random.Random(seed)
+    jobs = [(make_path(rng), tokens[i % len(tokens)]) for i in range(warmup + n)]
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(lambda j: client.request(method, *j), jobs[:warmup]))
+        before = _firestore_counters(base_url).get(route, dict.fromkeys(FS_FIELDS, 0.0))
+        t0 = time.perf_counter()
+        results = list(pool.map(lambda j: client.request(method, *j), jobs[warmup:]))
+        wall = time.perf_counter() - t0
+    after = _firestore_counters(base_url).get(route, dict.fromkeys(FS_FIELDS, 0.0))
+
+    latencies = sorted(r[0] * 1000 for r in results)
+    errors = sum(1 for _, status in results if status == 0 or status >= 500)
+    return {
+        "requests": n,
+        "errors": errors,
+        "rps": round(n / wall, 1),
+        "p50_ms": round(_percentile(latencies, 50), 2),
+        "p95_ms": round(_percentile(latencies, 95), 2),
+        "p99_ms": round(_percentile(latencies, 99), 2),
+        "mean_ms": round(statistics.fmean(latencies), 2),
+        "firestore_per_request": {f: round((after[f] - before[f]) / n, 2) for f in FS_FIELDS},
+    }
+
+
+def _git_commit():
+    try:
+        commit = subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+        dirty = bool(subprocess.check_output(["git", "status", "--porcelain", "--untracked-files=no"], text=True).strip())
+        return commit, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown", False
+
+
+def _print_table(results, baseline=None):
+    print(f"{'scenario':<14}{'rps':>8}{'p50':>9}{'p95':>9}{'p99':>9}{'err':>5}{'reads':>8}{'writes':>8}{'rtrips':>8}")
+    for name, r in results.items():
+        fs = r["firestore_per_request"]
+        print(
+            f"{name:<14}{r['rps']:>8}{r['p50_ms']:>9}{r['p95_ms']:>9}{r['p99_ms']:>9}{r['errors']:>5}"
+            f"{fs['reads']:>8}{fs['writes']:>8}{fs['round_trips']:>8}"
+        )
+        old = (baseline or {}).get(name)
+        if old:
+            def pct(key):
+                return f"{(r[key] - old[key]) / old[key]:+.0%}" if old[key] else "n/a"
+            print(f"{'  vs base':<14}{pct('rps'):>8}{pct('p50_ms'):>9}{pct('p95_ms'):>9}{pct('p99_ms'):>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test against an emulator-backed API")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=400, help="measured requests per scenario")
+    parser.add_argument("--warmup", type=int, default=20, help="unmeasured requests per scenario")
+    parser.add_argument("--scenarios", default="rooms,buildings,groups,group_detail,report_locked")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--label", default="", help="suffix for the results file")
+    parser.add_argument("--compare", help="earlier results JSON to compare against")
+    args = parser.parse_args()
+
+    with open(MANIFEST_PATH) as f:
+        manifest = json.load(f)
+    scenarios = _scenarios(manifest)
+    tokens = _sign_in(manifest["authUsers"], manifest["password"])
+    client = _Client(args.base_url)
+
+    results = {}
+    for name in args.scenarios.split(","):
+        method, route, make_path = scenarios[name]
+        results[name] = run_scenario(
+            client, args.base_url, method, route, make_path, tokens,
+            args.requests, args.concurrency, args.warmup, args.seed,
+        )
+
+    commit, dirty = _git_commit()
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["scenarios"]
+    _print_table(results, baseline)
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    name = commit + ("-dirty" if dirty else "") + (f"-{args.label}" if args.label else "")
+    path = os.path.join(RESULTS_DIR, f"{name}.json")
+    with open(path, "w") as f:
+        json.dump({
+            "commit": commit,
+            "dirty": dirty,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "config": vars(args) | {"seed_config": manifest["config"]},
+            "scenarios": results,
+        }, f, indent=2)
+    print(f"results: {path}")
+
+
+if __name__ == "__main__":
+    main()
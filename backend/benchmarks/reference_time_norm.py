@@ -0,0 +1,64 @@
+# backend/benchmarks/reference_time_norm.py
+# Frozen copy of csulb_scraper's time-range parser as it was before the
+# table-driven rewrite. benchmarks/verify_time_norm.py checks the current
+# normalize_time_range against it; do not "fix" or optimize this file.
+import re as _re_from_norm
+from datetime import datetime as _dt_from_norm
+
+
+def _to_24_for_norm(hhmm_ampm: str) -> str:
+    """
+    Accepts 'H[H][:MM]AM/PM' (minutes optional) and returns 'HH:MM' 24h.
+    Examples: '8AM' -> '08:00', '9:50PM' -> '21:50'
+    """
+    s = hhmm_ampm.strip().upper()
+    m = _re_from_norm.fullmatch(r'(\d{1,2})(?::(\d{2}))?(AM|PM)', s)
+    if not m:
+        raise ValueError(f"Bad time token: {hhmm_ampm!r}")
+    hh = int(m.group(1))
+    mm = m.group(2) or "00"
+    ampm = m.group(3)
+    return _dt_from_norm.strptime(f"{hh:02d}:{mm}{ampm}", "%I:%M%p").strftime("%H:%M")
+
+
+def normalize_time_range(raw_range: str) -> tuple[str, str]:
+    """
+    Handles:
+      - '11:00-12:15PM'
+      - '8-9:50AM'
+      - '8-9AM'
+      - '9:30AM-10:45AM'
+    Returns ('HH:MM','HH:MM') in 24h.
+    """
+    t = raw_range.strip().upper().replace(" ", "")
+    # Allow minutes on either side (optional), AM/PM on start optional, end required
+    m = _re_from_norm.fullmatch(r'(\d{1,2}(?::\d{2})?)(AM|PM)?-(\d{1,2}(?::\d{2})?)(AM|PM)', t)
+    if m:
+        s, sfx_s, e, sfx_e = m.groups()
+        # Inherit end suffix if start missing
+        sfx_s = sfx_s or sfx_e
+        s24 = _to_24_for_norm(f"{s}{sfx_s}")
+        e24 = _to_24_for_norm(f"{e}{sfx_e}")
+        # If we inherited and start>=end (rare), flip the start's suffix once
+        if m.group(2) is None:
+            s_min = int(s24[:2]) * 60 + int(s24[3:])
+            e_min = int(e24[:2]) * 60 + int(e24[3:])
+            if s_min >= e_min:
+                sfx_s = "AM" if sfx_e == "PM" else "PM"
+                s24 = _to_24_for_norm(f"{s}{sfx_s}")
+        return s24, e24
+
+    # Both have explicit suffixes? (covered above, but keep a clear path)
+    m2 = _re_from_norm.fullmatch(r'(\d{1,2}(?::\d{2})?)(AM|PM)-(\d{1,2}(?::\d{2})?)(AM|PM)', t)
+    if m2:
+        s, sfx_s, e, sfx_e = m2.groups()
+        return _to_24_for_norm(f"{s}{sfx_s}"), _to_24_for_norm(f"{e}{sfx_e}")
+
+    # Last resort: no suffixes anywhere -> assume AM both sides and add :00 if needed
+    if "-" in t:
+        s, e = t.split("-", 1)
+        if ":" not in s: s += ":00"
+        if ":" not in e: e += ":00"
+        return _to_24_for_norm(f"{s}AM"), _to_24_for_norm(f"{e}AM")
+
+    raise ValueError(f"Unrecognized time range: {raw_range!r}")
@@ -0,0 +1,238 @@
+# backend/benchmarks/seed_emulator.py
+# Seeds the Firestore + Auth emulators with a deterministic "semester" for
+# benchmarks/load_test.py:
+#
+#   availabilitySlots  --days days x --buildings buildings x --rooms rooms,
+#                      a few free windows per room and day (scraper shape)
+#   buildings          code + name (+ fields the app doesn't list)
+#   users              --users profiles (user_service.dart shape); the first
+#                      --auth-users also get an Auth emulator account so the
+#                      load test can sign in as them
+#   studyGroups        --groups groups with members, incomingRequests, invites
+#
+# Same --seed, same data. Writes benchmarks/.seed_manifest.json (ids the load
+# test picks from). Start the emulators first, e.g.
+#   firebase emulators:start --only firestore,auth
+#   cd backend && FIRESTORE_EMULATOR_HOST=localhost:8080 \
+#       FIREBASE_AUTH_EMULATOR_HOST=localhost:9099 \
+#       GOOGLE_CLOUD_PROJECT=demo-studybuddy python -m benchmarks.seed_emulator
+import argparse
+import json
+import os
+import random
+import sys
+from datetime import datetime, timedelta, timezone
+
+import firebase_admin
+from firebase_admin import auth as fb_auth
+from google.cloud import firestore
+
+from routers import groups, rooms
+
+MANIFEST_PATH = os.path.join(os.path.dirname(__file__), ".seed_manifest.json")
+PASSWORD = "benchmark-password"
+EMAIL_DOMAIN = "student.csulb.edu"
+BATCH_SIZE = 500
+
+# Room schedules: free windows per room and day, as (startMin, endMin)
+DAY_PATTERNS = [
+    [(420, 600), (690, 840), (960, 1320)],
+    [(420, 480), (570, 780), (1110, 1320)],
+    [(540, 1320)],
+    [(420, 510), (600, 690), (780, 870), (1020, 1320)],
+]
+
+
+class _Writer:
+    """Batched set() calls, committed every BATCH_SIZE writes."""
+
+    def __init__(self, db):
+        self.db = db
+        self.batch = db.batch()
+        self.pending = 0
+        self.total = 0
+
+    def set(self, ref, data):
+        self.batch.set(ref, data)
+        self.pending += 1
+        if self.pending == BATCH_SIZE:
+            self.flush()
+
+    def flush(self):
+        if self.pending:
+            self.batch.commit()
+            self.total += self.pending
+            self.batch, self.pending = self.db.batch(), 0
+
+
+def _hhmm(minutes: int) -> str:
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def seed_slots(w: _Writer, rng: random.Random, start: datetime, days: int, n_buildings: int, n_rooms: int):
+    codes = [f"BK{b:02d}" for b in range(n_buildings)]
+    for b, code in enumerate(codes):
+        w.set(w.db.collection(rooms.BUILDINGS_COLLECTION).document(code), {
+            "code": code,
+            "name": f"Benchmark Hall {b}",
+            "campusZone": "upper" if b % 2 else "lower",
+        })
+
+    slot_ids = []
+    for d in range(days):
+        date = (start + timedelta(days=d)).strftime("%Y-%m-%d")
+        for code in codes:
+            for r in range(n_rooms):
+                room = f"{1 + r // 10}{r % 10:02d}"
+                room_id = f"{code}-{room}"
+                for s, e in rng.choice(DAY_PATTERNS):
+                    slot_id = f"{room_id}_{date}_{s}_{e}"
+                    w.set(w.db.collection(rooms.COLLECTION).document(slot_id), {
+                        "roomId": room_id,
+                        "buildingCode": code,
+                        "roomNumber": room,
+                        "date": date,
+                        "start": _hhmm(s),
+                        "end": _hhmm(e),
+                        "startMin": s,
+                        "endMin": e,
+                        "durationMin": e - s,
+                        "floor": int(room[0]),
+                        "campusZone": "upper" if codes.index(code) % 2 else "lower",
+                        "locked_reports": 0,
+                        "currentCheckins": 0,
+                    })
+                    slot_ids.append(slot_id)
+    return codes, slot_ids
+
+
+def seed_users(w: _Writer, uids, joined, n_auth: int):
+    """User profiles, with the joinedStudyGroups map seed_groups built."""
+    for i, uid in enumerate(uids):
+        gmap = joined.get(uid, {})
+        w.set(w.db.collection(groups.USER_COLLECTION).document(uid), {
+            "uid": uid,
+            "displayName": f"Bench User {i}",
+            "handle": f"bench_{i:05d}",
+            "email": f"{uid}@{EMAIL_DOMAIN}",
+            "checkedIn": False,
+            "joinedStudyGroupIds": list(gmap),
+            "joinedStudyGroups": gmap,
+        })
+
+    auth_users = []
+    for uid in uids[:n_auth]:
+        email = f"{uid}@{EMAIL_DOMAIN}"
+        try:
+            fb_auth.create_user(uid=uid, email=email, password=PASSWORD, email_verified=True)
+        except fb_auth.UidAlreadyExistsError:
+            pass
+        auth_users.append({"uid": uid, "email": email})
+    return auth_users
+
+
+def seed_groups(w: _Writer, rng: random.Random, uids, slot_ids, n_groups: int):
+    group_ids = []
+    joined = {uid: {} for uid in uids}
+    for i in range(n_groups):
+        slot_id = rng.choice(slot_ids)
+        room_id, date, s, e = slot_id.rsplit("_", 3)
+        code, room = room_id.split("-", 1)
+        start = int(s) + 30 * rng.randrange(max(1, (int(e) - int(s)) // 30 - 1))
+        end = min(int(e), start + 60)
+        owner = rng.choice(uids)
+        members = [owner] + [u for u in rng.sample(uids, 7) if u != owner][:rng.randrange(0, 6)]
+        name = f"{rng.choice(['Calc', 'Physics', 'CECS', 'Chem', 'History'])} {rng.randrange(100, 500)} Study Group {i}"
+        gid = f"bench-group-{i:05d}"
+        ref = w.db.collection(groups.COLLECTION).document(gid)
+        w.set(ref, {
+            "id": gid,
+            "name": name,
+            "nameLower": name.casefold(),
+            "nameTokens": groups._name_search_tokens(name),
+            "buildingCode": code,
+            "roomNumber": room,
+            "date": date,
+            "startTime": _hhmm(start),
+            "endTime": _hhmm(end),
+            "availabilitySlotDocument": slot_id,
+            "quantity": len(members),
+            "ownerID": owner,
+            "members": members,
+            "expireAt": groups.convert_to_utc_datetime(date, _hhmm(end)),
+        })
+        for m in members:
+            joined[m][gid] = {"name": name, "startTime": _hhmm(start), "endTime": _hhmm(end), "date": date}
+
+        outsiders = [u for u in rng.sample(uids, 8) if u not in members]
+        for u in outsiders[:2]:
+            w.set(ref.collection(groups.JOIN_REQUEST_SUBCOLLECTION).document(u), {
+                "requesterId": u,
+                "requesterHandle": f"bench_{u[-5:]}",
+                "requesterDisplayName": f"Bench User {int(u[-5:])}",
+                "createdAt": datetime.now(timezone.utc),
+            })
+        for u in outsiders[2:4]:
+            w.set(ref.collection(groups.INVITES_SUBCOLLECTION).document(u), {
+                "inviteeId": u,
+                "inviteeHandle": f"bench_{u[-5:]}",
+                "inviteeDisplayName": f"Bench User {int(u[-5:])}",
+                "ownerId": owner,
+                "ownerHandle": f"bench_{owner[-5:]}",
+                "ownerDisplayName": f"Bench User {int(owner[-5:])}",
+                "groupId": gid,
+                "groupName": name,
+                "createdAt": datetime.now(timezone.utc),
+            })
+        group_ids.append(gid)
+    return group_ids, joined
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed the Firestore/Auth emulators for benchmarks")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--start-date", default=None, help="first slot date, YYYY-MM-DD (default today)")
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--buildings", type=int, default=50)
+    parser.add_argument("--rooms", type=int, default=20, help="rooms per building")
+    parser.add_argument("--users", type=int, default=3000)
+    parser.add_argument("--auth-users", type=int, default=50, help="users the load test can sign in as")
+    parser.add_argument("--groups", type=int, default=1500)
+    args = parser.parse_args()
+
+    for var in ("FIRESTORE_EMULATOR_HOST", "FIREBASE_AUTH_EMULATOR_HOST"):
+        if not os.getenv(var):
+            sys.exit(f"{var} is not set; this script writes data and only runs against the emulators.")
+
+    project = os.getenv("GOOGLE_CLOUD_PROJECT", "demo-studybuddy")
+    firebase_admin.initialize_app(options={"projectId": project})
+    db = firestore.Client(project=project)
+    rng = random.Random(args.seed)
+    start = datetime.strptime(args.start_date, "%Y-%m-%d") if args.start_date else datetime.now()
+
+    w = _Writer(db)
+    codes, slot_ids = seed_slots(w, rng, start, args.days, args.buildings, args.rooms)
+    print(f"slots: {len(slot_ids)} over {args.days} days, {len(codes)} buildings")
+    uids = [f"bench-user-{i:05d}" for i in range(args.users)]
+    group_ids, joined = seed_groups(w, rng, uids, slot_ids, args.groups)
+    auth_users = seed_users(w, uids, joined, args.auth_users)
+    w.flush()
+    print(f"users: {len(uids)} ({len(auth_users)} with Auth accounts)")
+    print(f"groups: {len(group_ids)}; {w.total} docs written")
+
+    dates = [(start + timedelta(days=d)).strftime("%Y-%m-%d") for d in range(args.days)]
+    with open(MANIFEST_PATH, "w") as f:
+        json.dump({
+            "config": vars(args) | {"project": project},
+            "dates": dates,
+            "buildings": codes,
+            "slotIds": rng.sample(slot_ids, min(len(slot_ids), 5000)),
+            "groupIds": group_ids,
+            "authUsers": auth_users,
+            "password": PASSWORD,
+        }, f)
+    print(f"manifest: {MANIFEST_PATH}")
+
+
+if __name__ == "__main__":
+    main()
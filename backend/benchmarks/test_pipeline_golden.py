@@ -0,0 +1,26 @@
+# backend/benchmarks/test_pipeline_golden.py
+# The golden-output check of bench_pipeline.py as a pytest test, so CI fails
+# when a pipeline stage's output stops matching benchmarks/golden/pipeline.json.
+#
+#   cd backend && python -m pytest -q benchmarks/test_pipeline_golden.py
+import json
+
+import pytest
+
+from benchmarks.bench_pipeline import GOLDEN_PATH, golden_digests
+
+with open(GOLDEN_PATH, encoding="utf-8") as f:
+    EXPECTED = json.load(f)["sha256"]
+
+
+@pytest.fixture(scope="module")
+def digests():
+    return golden_digests()
+
+
+@pytest.mark.parametrize("stage", sorted(EXPECTED))
+def test_stage_matches_golden(digests, stage):
+    assert digests.get(stage) == EXPECTED[stage], (
+        f"{stage} output differs from {GOLDEN_PATH}; if intended, run "
+        "python -m benchmarks.bench_pipeline --update-golden"
+    )
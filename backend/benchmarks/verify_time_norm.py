@@ -0,0 +1,86 @@
+# backend/benchmarks/verify_time_norm.py
+# Checks csulb_scraper.normalize_time_range against the frozen pre-rewrite
+# implementation (benchmarks/reference_time_norm.py) on every distinct input
+# in the saved schedule corpus plus an exhaustive grid of clock formats,
+# then compares per-row cost on a synthetic schedule.
+#
+#   cd backend && python -m benchmarks.verify_time_norm
+#   python -m benchmarks.verify_time_norm --corpus my_ranges.txt   # extra inputs, one per line
+#
+# Exit status 1 on any difference (same output, or both raising ValueError).
+import argparse
+import os
+import sys
+import time
+
+from benchmarks import reference_time_norm as reference
+from benchmarks.bench_pipeline import HERE, make_schedule, scraper
+
+CORPUS_PATH = os.path.join(HERE, "golden", "time_ranges.txt")
+
+
+def _grid():
+    """Every clock shape the parser accepts or rejects, both sides, all suffix combos."""
+    hours = [str(h) for h in range(0, 14)] + ["00", "07", "09", "012"]
+    minutes = ["", ":00", ":05", ":15", ":30", ":45", ":50", ":59", ":60", ":5", ":075"]
+    tokens = [h + m for h in ("1", "8", "11", "12", "0", "13", "09") for m in minutes] + [h for h in hours]
+    sfx = ["", "AM", "PM", "am", "pm"]
+    out = set()
+    for a in tokens:
+        for b in ("9:50", "12", "12:15", "1", "10", "7:30", "0", "13"):
+            for sa in sfx:
+                for sb in sfx:
+                    out.add(f"{a}{sa}-{b}{sb}")
+    out.update({"", "-", "TBA", "8AM", "8 - 9:50 AM", " 11:00-12:15PM ", "9:30AM - 10:45AM", "8-9-10AM"})
+    return out
+
+
+def _run(fn, raw):
+    try:
+        return fn(raw)
+    except ValueError:
+        return ValueError
+
+
+def _time_per_row(fn, ranges, clear=None):
+    if clear:
+        clear()
+    t0 = time.perf_counter()
+    for r in ranges:
+        fn(r)
+    return (time.perf_counter() - t0) / len(ranges)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verify normalize_time_range against the reference")
+    parser.add_argument("--corpus", action="append", default=[CORPUS_PATH])
+    parser.add_argument("--rows", type=int, default=200000, help="synthetic schedule size for timing")
+    args = parser.parse_args()
+
+    inputs = _grid()
+    for path in args.corpus:
+        with open(path, encoding="utf-8") as f:
+            inputs.update(line.rstrip("\n") for line in f if line.strip())
+
+    mismatches = []
+    for raw in sorted(inputs):
+        new, ref = _run(scraper.normalize_time_range, raw), _run(reference.normalize_time_range, raw)
+        if new != ref:
+            mismatches.append((raw, ref, new))
+    print(f"checked {len(inputs)} distinct inputs: {len(mismatches)} mismatches")
+    for raw, ref, new in mismatches[:20]:
+        print(f"  {raw!r}: reference={ref} new={new}")
+
+    ranges = [c[2] for c in make_schedule(args.rows, seed=1)[0]]
+    ref_cost = _time_per_row(reference.normalize_time_range, ranges)
+    cold = _time_per_row(scraper.normalize_time_range.__wrapped__, ranges)
+    cached = _time_per_row(scraper.normalize_time_range, ranges, scraper.normalize_time_range.cache_clear)
+    print(f"{len(ranges)} rows ({len(set(ranges))} distinct ranges), per row:")
+    print(f"  reference           {ref_cost * 1e6:8.2f} us")
+    print(f"  compiled, no memo   {cold * 1e6:8.2f} us  ({ref_cost / cold:.1f}x)")
+    print(f"  compiled + memo     {cached * 1e6:8.2f} us  ({ref_cost / cached:.1f}x)")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,28 @@
 # backend/main.py
-from dotenv import load_dotenv
+import time
+
+_IMPORT_T0 = time.perf_counter()
+
+import asyncio
 import os
+from contextlib import asynccontextmanager
 from typing import List
 
-from fastapi import FastAPI, Depends
+from dotenv import load_dotenv
+
+from fastapi import FastAPI, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 
 import firebase_admin
 from firebase_admin import credentials
 
 from routers import rooms
 from routers import addgroup, groups
-from auth import verify_firebase_token  # use shared auth helper
+from auth import verify_firebase_token, warm_oidc_certs  # use shared auth helper
+from services import buildings, encoding, metrics
+from services.firestore_client import get_db
+from services.logging_setup import configure_logging
 
 # --------------------------------------------------------------------
 # Load .env for LOCAL development only.
@@ -19,20 +30,30 @@ from auth import verify_firebase_token  # use shared auth helper
 # --------------------------------------------------------------------
 load_dotenv(os.path.join(os.path.dirname(__file__), "..", ".env"), override=True)
 
+# Queue-based, level-gated logging (STUDYBUDDY_DEBUG=1 for debug output)
+log = configure_logging()
+
 # --------------------------------------------------------------------
 # 🔥 Firebase Admin Initialization (LOCAL + CLOUD RUN SAFE)
+# Runs in the lifespan hook below, not at import.
 # --------------------------------------------------------------------
-sa_path = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
+def init_firebase():
+    try:
+        firebase_admin.get_app()
+        return  # already initialized (e.g. a reload)
+    except ValueError:
+        pass
+    sa_path = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
 
-if sa_path and os.path.exists(sa_path):
-    # Local development mode
-    cred = credentials.Certificate(sa_path)
-    firebase_admin.initialize_app(cred)
-    print(f"✅ Firebase Admin initialized using local service account: {sa_path}")
-else:
-    # Cloud Run mode (Application Default Credentials)
-    firebase_admin.initialize_app()
-    print("✅ Firebase Admin initialized using Application Default Credentials (ADC)")
+    if sa_path and os.path.exists(sa_path):
+        # Local development mode
+        cred = credentials.Certificate(sa_path)
+        firebase_admin.initialize_app(cred)
+        log.info("✅ Firebase Admin initialized using local service account: %s", sa_path)
+    else:
+        # Cloud Run mode (Application Default Credentials)
+        firebase_admin.initialize_app()
+        log.info("✅ Firebase Admin initialized using Application Default Credentials (ADC)")
 
 # --------------------------------------------------------------------
 # Allowed email domains (for logging only; enforcement is in auth.py)
@@ -49,12 +70,57 @@ allowed_domains: List[str] = [
     if d.strip()
 ]
 
-print(f"✅ Allowed domains (Firebase users): {allowed_domains}")
+log.info("✅ Allowed domains (Firebase users): %s", allowed_domains)
+
+# --------------------------------------------------------------------
+# Startup: everything the first request would otherwise pay for.
+# Each step is timed (studybuddy_startup_seconds at /metrics); warm-up
+# steps are best effort, so a failure only costs the first request.
+# STARTUP_WARMUP=0 skips them (firebase init still runs).
+# --------------------------------------------------------------------
+STARTUP_WARMUP = os.getenv("STARTUP_WARMUP", "1").lower() not in ("0", "false", "no")
+
+
+def _startup_step(phase: str, fn, required: bool = False):
+    t0 = time.perf_counter()
+    try:
+        fn()
+    except Exception as e:
+        if required:
+            raise
+        log.warning("startup: %s failed: %s: %s", phase, type(e).__name__, e)
+    finally:
+        metrics.record_startup(phase, time.perf_counter() - t0)
+
+
+def warm_up():
+    _startup_step("firebase_init", init_firebase, required=True)
+    if not STARTUP_WARMUP:
+        return
+    _startup_step("firestore_client", get_db)
+    # first RPC opens the gRPC channel; the result fills the buildings cache
+    _startup_step("buildings", lambda: buildings.all_buildings(get_db()))
+    _startup_step("oidc_certs", warm_oidc_certs)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    t0 = time.perf_counter()
+    await asyncio.to_thread(warm_up)
+    metrics.record_startup("lifespan", time.perf_counter() - t0)
+    log.info("✅ Startup warm-up done in %.0f ms", (time.perf_counter() - t0) * 1000)
+    yield
+
 
 # --------------------------------------------------------------------
 # FastAPI app + CORS
 # --------------------------------------------------------------------
-app = FastAPI(title="StudyBuddy API", version="1.0")
+app = FastAPI(
+    title="StudyBuddy API",
+    version="1.0",
+    default_response_class=encoding.FastJSONResponse,
+    lifespan=lifespan,
+)
 
 app.add_middleware(
     CORSMiddleware,
@@ -64,6 +130,54 @@ app.add_middleware(
     allow_credentials=True,
 )
 
+# Compress large responses (room/group lists); see services/encoding.py
+log.info("Response compression: %s", encoding.add_compression(app))
+
+# --------------------------------------------------------------------
+# Metrics: per-route latency + Firestore accounting (see services/metrics.py)
+# SERVER_TIMING=1 also returns a Server-Timing header on every response.
+# --------------------------------------------------------------------
+SERVER_TIMING = os.getenv("SERVER_TIMING", "").lower() in ("1", "true", "yes")
+
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    stats, token = metrics.begin_request()
+    t0 = time.perf_counter()
+    try:
+        response = await call_next(request)
+    except Exception:
+        _observe_request(request, 500, t0, stats)
+        raise
+    finally:
+        metrics.end_request(token)
+    if SERVER_TIMING:
+        # work done before the headers; a streamed body's Firestore calls
+        # still count in /metrics
+        response.headers["Server-Timing"] = metrics.server_timing_header(time.perf_counter() - t0, stats)
+    # Observe once the body has been sent: a StreamingResponse (list_rooms
+    # range mode) keeps calling Firestore after call_next has returned.
+    response.body_iterator = _observe_after_body(response.body_iterator, request, response.status_code, t0, stats)
+    return response
+
+
+async def _observe_after_body(body, request: Request, status: int, t0: float, stats):
+    try:
+        async for chunk in body:
+            yield chunk
+    finally:
+        _observe_request(request, status, t0, stats)
+
+
+def _observe_request(request: Request, status: int, t0: float, stats):
+    elapsed = time.perf_counter() - t0
+    # route template ("/group/{group_id}"), not the raw path, to keep labels bounded
+    route = getattr(request.scope.get("route"), "path", "(unmatched)")
+    metrics.observe_request(request.method, route, status, elapsed, stats)
+    if not metrics.startup_recorded("first_request"):
+        metrics.record_startup("first_request", elapsed)
+
+
 # --------------------------------------------------------------------
 # Routers
 # --------------------------------------------------------------------
@@ -94,3 +208,15 @@ app.include_router(
 @app.get("/health")
 def health():
     return {"ok": True, "service": "StudyBuddy API"}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    """Prometheus text format (see services/metrics.py)."""
+    return PlainTextResponse(
+        metrics.render_prometheus(),
+        media_type="text/plain; version=0.0.4",
+    )
+
+
+metrics.record_startup("import", time.perf_counter() - _IMPORT_T0)
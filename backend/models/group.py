@@ -137,3 +137,49 @@ class IncomingGroupInvite(BaseModel):
 
 class IncomingGroupInviteList(BaseModel):
     items: List[IncomingGroupInvite]
+
+
+class GroupRow:
+    """
+    One studyGroups document, decoded once from its snapshot.
+
+    `data` keeps the raw dict for helpers that take one (e.g. role checks);
+    the listed fields are what the group responses are built from.
+    """
+
+    __slots__ = (
+        "id",
+        "data",
+        "name",
+        "nameLower",
+        "buildingCode",
+        "roomNumber",
+        "date",
+        "startTime",
+        "endTime",
+        "quantity",
+        "ownerID",
+        "members",
+        "availabilitySlotDocument",
+        "expireAt",
+    )
+
+    def __init__(self, id: str, d: dict):
+        self.id = d.get("id") or id
+        self.data = d
+        self.name = d.get("name", "")
+        self.nameLower = d.get("nameLower", "")
+        self.buildingCode = d.get("buildingCode", "")
+        self.roomNumber = str(d.get("roomNumber", ""))
+        self.date = d.get("date", "")
+        self.startTime = d.get("startTime", "")
+        self.endTime = d.get("endTime", "")
+        self.quantity = int(d.get("quantity", 0))
+        self.ownerID = d.get("ownerID", "")
+        self.members = d.get("members", [])
+        self.availabilitySlotDocument = d.get("availabilitySlotDocument", "")
+        self.expireAt = d.get("expireAt")
+
+    @classmethod
+    def from_snapshot(cls, snap) -> "GroupRow":
+        return cls(snap.id, snap.to_dict() or {})
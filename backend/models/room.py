@@ -18,3 +18,66 @@ class Room(BaseModel):
 class RoomsResponse(BaseModel):
     items: List[Room]
     nextPageToken: Optional[str] = None
+
+
+class RoomSearchResult(Room):
+    floor: Optional[int] = None
+    campusZone: Optional[str] = None
+    freeStart: str = ""      # part of the slot inside the requested window
+    freeEnd: str = ""
+    freeMinutes: int = 0
+
+
+class RoomSearchResponse(BaseModel):
+    items: List[RoomSearchResult]
+
+
+class SlotRow:
+    """
+    One availabilitySlots document, decoded once from its snapshot.
+
+    list_rooms filters, paginates and builds responses from these instead of
+    calling snapshot.to_dict() at every step.
+    """
+
+    __slots__ = (
+        "id",
+        "reference",
+        "roomId",
+        "buildingCode",
+        "roomNumber",
+        "date",
+        "start",
+        "end",
+        "startMin",
+        "endMin",
+        "durationMin",
+        "floor",
+        "campusZone",
+        "capacity",
+        "locked_reports",
+        "currentCheckins",
+    )
+
+    def __init__(self, id: str, reference, d: dict):
+        self.id = id
+        self.reference = reference
+        self.roomId = d.get("roomId", "")
+        self.buildingCode = d.get("buildingCode", "")
+        self.roomNumber = str(d.get("roomNumber", ""))
+        self.date = d.get("date", "")
+        self.start = d.get("start", "")
+        self.end = d.get("end", "")
+        # missing bounds never satisfy a time filter
+        self.startMin = int(d.get("startMin", 9999))
+        self.endMin = int(d.get("endMin", -1))
+        self.durationMin = int(d.get("durationMin", self.endMin - self.startMin))
+        self.floor = d.get("floor")
+        self.campusZone = d.get("campusZone")
+        self.capacity = d.get("capacity")
+        self.locked_reports = int(d.get("locked_reports", 0) or 0)
+        self.currentCheckins = int(d.get("currentCheckins", 0) or 0)
+
+    @classmethod
+    def from_snapshot(cls, snap) -> "SlotRow":
+        return cls(snap.id, snap.reference, snap.to_dict() or {})
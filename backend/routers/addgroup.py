@@ -1,4 +1,6 @@
 # backend/routers/addgroup.py
+import logging
+
 from fastapi import APIRouter, HTTPException
 from google.cloud import firestore
 
@@ -7,6 +9,7 @@ from services.firestore_client import get_db
 
 # The router is included in main with prefix "/groups"; keep local routes simple
 router = APIRouter()
+log = logging.getLogger("uvicorn.error")
 
 @router.post("/create", status_code=201)
 def create_group(group: Group):
@@ -27,7 +30,7 @@ def create_group(group: Group):
             "created_at": firestore.SERVER_TIMESTAMP,
         }
         write_result, doc_ref = db.collection("groups").add(data)
-        print(f"[groups] created {doc_ref.id} name='{group.name}'")
+        log.info("[groups] created %s name=%r", doc_ref.id, group.name)
         return {"id": doc_ref.id, "message": "Group created successfully"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Create group failed: {type(e).__name__}: {e}")
\ No newline at end of file
@@ -1,9 +1,12 @@
 # backend/routers/groups.py
-from fastapi import APIRouter, HTTPException, Depends, Query
+import logging
+import re
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
 from typing import List, Union, Optional
+from services import encoding
 from services.firestore_client import get_db, firestore
+from services.loader import DocLoader, get_loader
 from google.cloud.firestore_v1.base_query import FieldFilter
-from google.cloud.firestore_v1.field_path import FieldPath
 from models.group import (
     StudyGroupCreate,
     StudyGroupPublicResponse,
@@ -20,17 +23,42 @@ from models.group import (
     OutgoingGroupInviteList,
     IncomingGroupInvite,
     IncomingGroupInviteList,
+    GroupRow,
 )
 from datetime import datetime, timezone
 from zoneinfo import ZoneInfo
 from auth import verify_firebase_token
 
 router = APIRouter()
+log = logging.getLogger("uvicorn.error")
 COLLECTION = "studyGroups"
 USER_COLLECTION = "users"
 JOIN_REQUEST_SUBCOLLECTION = "incomingRequests"
 INVITES_SUBCOLLECTION = "invites"
 
+# Longest prefix stored in 'nameTokens'. Longer search strings are truncated for
+# the indexed query and then checked against 'nameLower' in Python.
+NAME_TOKEN_MAX_LEN = 20
+_NAME_WORD_RE = re.compile(r"\w+")
+
+# Fields get_all_groups reads (GroupRow + role/expiry checks); the listing
+# query select()s only these, leaving out e.g. the 'nameTokens' array.
+GROUP_LIST_FIELDS = [
+    "id",
+    "name",
+    "nameLower",
+    "buildingCode",
+    "roomNumber",
+    "date",
+    "startTime",
+    "endTime",
+    "quantity",
+    "ownerID",
+    "members",
+    "availabilitySlotDocument",
+    "expireAt",
+]
+
 
 def convert_to_utc_datetime(date: str, time: str) -> datetime:
     dt = datetime.strptime(f"{date} {time}" , "%Y-%m-%d %H:%M")
@@ -38,44 +66,80 @@ def convert_to_utc_datetime(date: str, time: str) -> datetime:
     dt_la = dt.replace(tzinfo=la_tz)
     return dt_la.astimezone(timezone.utc) 
 
-def _doc_to_publicStudyGroup(doc, owner_doc, has_pending: bool = False) -> StudyGroupPublicResponse: 
-    d = doc.to_dict()
-    o = owner_doc.to_dict()
+def _normalize_group_name(name: str) -> str:
+    """casefold + collapse whitespace, so 'Calc  1' and 'calc 1' search the same"""
+    return " ".join((name or "").casefold().split())
+
+
+def _name_search_tokens(name: str) -> list[str]:
+    """
+    Build the 'nameTokens' array used for search-as-you-type.
+
+    Contains every prefix (up to NAME_TOKEN_MAX_LEN chars) of the full name and
+    of the name starting at each word, e.g. "Calc 1 Review" ->
+      "c", "ca", ..., "calc 1 review", "1", "1 r", ..., "r", "re", ...
+    so both "calc 1" (prefix) and "rev" (token) match with one array_contains query.
+    Prefixes are rstripped ("calc " is stored as "calc"); _name_query_token
+    normalises searches the same way.
+    """
+    normalized = _normalize_group_name(name)
+    tokens: set[str] = set()
+    for word in _NAME_WORD_RE.finditer(normalized):
+        tail = normalized[word.start():][:NAME_TOKEN_MAX_LEN]
+        for i in range(1, len(tail) + 1):
+            tokens.add(tail[:i].rstrip())
+    tokens.discard("")
+    return sorted(tokens)
+
+
+def _name_query_token(search: str) -> str:
+    """The nameTokens entry a normalized search has to match (truncated like the stored tokens)."""
+    return search[:NAME_TOKEN_MAX_LEN].rstrip()
+
+
+def _name_matches(search: str, name_lower: str) -> bool:
+    """Exact check for searches longer than NAME_TOKEN_MAX_LEN."""
+    normalized = _normalize_group_name(name_lower)
+    return any(
+        normalized.startswith(search, word.start())
+        for word in _NAME_WORD_RE.finditer(normalized)
+    )
+
+
+def _row_to_publicStudyGroup(row: GroupRow, owner_id: str, owner: dict, has_pending: bool = False) -> StudyGroupPublicResponse: 
     return StudyGroupPublicResponse(
-        id=d.get("id", ""),
-        buildingCode=d.get("buildingCode", ""),
-        roomNumber=str(d.get("roomNumber", "")),
-        date=d.get("date", ""),
-        startTime=d.get("startTime", ""),
-        endTime=d.get("endTime", ""),
-        name=d.get("name", ""),
-        quantity=int(d.get("quantity", 0)),
+        id=row.id,
+        buildingCode=row.buildingCode,
+        roomNumber=row.roomNumber,
+        date=row.date,
+        startTime=row.startTime,
+        endTime=row.endTime,
+        name=row.name,
+        quantity=row.quantity,
         access=UserGroupRole.PUBLIC,
-        ownerID=owner_doc.id,
-        ownerHandle=o.get("handle", ""),
-        ownerDisplayName=o.get("displayName", ""),
-        availabilitySlotDocument=d.get("availabilitySlotDocument", ""),
+        ownerID=owner_id,
+        ownerHandle=owner.get("handle", ""),
+        ownerDisplayName=owner.get("displayName", ""),
+        availabilitySlotDocument=row.availabilitySlotDocument,
         hasPendingRequest=has_pending,
     )
 
-def _doc_to_privateStudyGroup(doc, owner_doc, members: list[str], access: UserGroupRole, has_pending: bool = False,) -> StudyGroupPrivateResponse: 
-    d = doc.to_dict()
-    o = owner_doc.to_dict()
+def _row_to_privateStudyGroup(row: GroupRow, owner_id: str, owner: dict, members: list[str], access: UserGroupRole, has_pending: bool = False,) -> StudyGroupPrivateResponse: 
     return StudyGroupPrivateResponse(
-        id=d.get("id", ""),
-        buildingCode=d.get("buildingCode", ""),
-        roomNumber=str(d.get("roomNumber", "")),
-        date=d.get("date", ""),
-        startTime=d.get("startTime", ""),
-        endTime=d.get("endTime", ""),
-        name=d.get("name", ""),
-        quantity=int(d.get("quantity", 0)),
+        id=row.id,
+        buildingCode=row.buildingCode,
+        roomNumber=row.roomNumber,
+        date=row.date,
+        startTime=row.startTime,
+        endTime=row.endTime,
+        name=row.name,
+        quantity=row.quantity,
         access=access,
-        ownerID=owner_doc.id,
-        ownerHandle=o.get("handle", ""),
-        ownerDisplayName=o.get("displayName", ""),
+        ownerID=owner_id,
+        ownerHandle=owner.get("handle", ""),
+        ownerDisplayName=owner.get("displayName", ""),
         members=members,
-        availabilitySlotDocument=d.get("availabilitySlotDocument", ""),
+        availabilitySlotDocument=row.availabilitySlotDocument,
         hasPendingRequest=has_pending,
     )
 
@@ -153,8 +217,9 @@ def _update_group_transaction(transaction, studyGroupRef, updates_data: dict, us
 
     if "name" in updates_data:
         updates_data["nameLower"] = updates_data["name"].casefold() 
+        updates_data["nameTokens"] = _name_search_tokens(updates_data["name"])
 
-    transaction.update(studyGroupRef, updates_data)   # Updates Study group doc 'name' and 'nameLower' fields
+    transaction.update(studyGroupRef, updates_data)   # Updates Study group doc 'name', 'nameLower' and 'nameTokens' fields
     for doc in user_docs: # Updates all applicable User docs - only updates 'name' field
         transaction.update(doc.reference, {f"joinedStudyGroups.{studyGroupRef.id}.name": updates_data.get("name")} )
     # ADD: UPDATE all applicable incoming_requests documents 'studyGroupName' field
@@ -212,6 +277,7 @@ def create_group(group: StudyGroupCreate,
         data = group.model_dump()
         data.update({"id": newGroupRef.id,  
                      "nameLower" : data["name"].casefold(), # casefold: for case-insensitive string matching 
+                     "nameTokens": _name_search_tokens(data["name"]), # prefixes for search-as-you-type
                      "quantity": 1, 
                      "ownerID": userRef.id,
                      "members": [userRef.id],
@@ -227,6 +293,7 @@ def create_group(group: StudyGroupCreate,
 @router.get("/myInvites", response_model=IncomingGroupInviteList)
 def list_my_incoming_invites(
     claims: dict = Depends(verify_firebase_token),
+    loader: DocLoader = Depends(get_loader),
 ):
     """
     Current user lists all incoming group invites.
@@ -244,18 +311,21 @@ def list_my_incoming_invites(
             "inviteeId", "==", uid
         )
 
-        items: list[IncomingGroupInvite] = []
+        invites = []
         for d in invite_query.stream():
             inv = d.to_dict() or {}
+            if inv.get("ownerId") and inv.get("groupId"):
+                invites.append(inv)
+
+        # Refresh owner name/handle from users collection (one batched read)
+        owner_docs = loader.get_many(users_col.document(inv["ownerId"]) for inv in invites)
+
+        items: list[IncomingGroupInvite] = []
+        for inv, owner_doc in zip(invites, owner_docs):
             group_id = inv.get("groupId", "")
             group_name = inv.get("groupName", "")
             owner_id = inv.get("ownerId", "")
 
-            if not owner_id or not group_id:
-                continue
-
-            # Refresh owner name/handle from users collection
-            owner_doc = users_col.document(owner_id).get()
             if not owner_doc.exists:
                 # Owner account might have been deleted; skip or show with blanks
                 continue
@@ -350,22 +420,30 @@ def get_joined_groups(claims: dict = Depends(verify_firebase_token)) -> JoinedSt
 
 @router.get("/")
 def get_all_groups(
+    request: Request,
     name_filter: Optional[str] = Query(None, description="StudyGroupName"),
-    claims: dict = Depends(verify_firebase_token)
+    fmt: str = Query("json", alias="format", pattern=encoding.FORMATS, description="json | columnar"),
+    claims: dict = Depends(verify_firebase_token),
+    loader: DocLoader = Depends(get_loader),
     ) -> StudyGroupList:
     """"
     Accepts optional name_filter query parameter to filter by Study Group Name.
+    Matching is case-insensitive and by prefix of the name or of any word in it
+    ("calc" and "review" both match "Calc 1 Review"), using the 'nameTokens' array.
     If no query parameter is specified, returns all study groups.
 
     Returns List of Study Groups with appropriate access based on user.
     Owners and members have access to the 'members' field.
     Users who are not members can see number of people in a group but do not have access to the 'members' field.
+
+    format=columnar sends `items` as one array per field ('members' is null for public entries).
     """
     try:
         db = get_db()
-        query = db.collection(COLLECTION)
-        if name_filter:
-            query = query.where(filter=FieldFilter("nameLower", "==", name_filter.casefold()))
+        query = db.collection(COLLECTION).select(GROUP_LIST_FIELDS)
+        search = _normalize_group_name(name_filter or "")
+        if search:
+            query = query.where(filter=FieldFilter("nameTokens", "array_contains", _name_query_token(search)))
         items: List[StudyGroupPublicResponse] = []
 
         uid = claims.get("uid") or claims.get("sub")
@@ -373,45 +451,66 @@ def get_all_groups(
         # 0) Find all groups where this user has a pending join request
         pending_query = db.collection_group(JOIN_REQUEST_SUBCOLLECTION).where(
             "requesterId", "==", uid
-        )
+        ).select(["__name__"])  # only the path is used
         pending_group_ids = {
             d.reference.parent.parent.id  # parent = incomingRequests, parent.parent = group doc
             for d in pending_query.stream()
         }
 
-        docs = query.stream()
-        for doc in docs:
-            groupEndTime = doc.to_dict()["expireAt"]
-            if groupEndTime < datetime.now(timezone.utc):
+        users_col = db.collection(USER_COLLECTION)
+        now = datetime.now(timezone.utc)
+        live_rows: List[GroupRow] = []
+        for doc in query.stream():
+            row = GroupRow.from_snapshot(doc)
+            if row.expireAt < now:
                 continue   # do not send past study groups
 
-            ownerID = doc.to_dict().get("ownerID", "")
-            owner_doc = db.collection(USER_COLLECTION).document(ownerID).get()
+            if len(search) > NAME_TOKEN_MAX_LEN and not _name_matches(search, row.nameLower):
+                continue   # indexed query only matched the truncated prefix
+            live_rows.append(row)
+
+        # Owners of every listed group, plus members of the groups this user
+        # belongs to, in one batched read (each user fetched once).
+        user_refs = []
+        for row in live_rows:
+            user_refs.append(users_col.document(row.ownerID or "-"))
+            if _get_user_groupRole(uid, row.data) != UserGroupRole.PUBLIC:
+                user_refs.extend(users_col.document(m) for m in row.members)
+        loader.get_many(user_refs)
+
+        # Each user snapshot decoded once, however many groups reference it
+        user_dicts: dict[str, dict] = {}
+
+        def user_dict(user_doc) -> dict:
+            if user_doc.id not in user_dicts:
+                user_dicts[user_doc.id] = user_doc.to_dict() or {}
+            return user_dicts[user_doc.id]
+
+        for row in live_rows:
+            owner_doc = loader.get(users_col.document(row.ownerID or "-"))
             if not owner_doc.exists:
                 continue  # do not send groups with invalid field for 'ownerID'
             
-            doc_dict = doc.to_dict()
-            user_role = _get_user_groupRole(uid, doc_dict)
+            user_role = _get_user_groupRole(uid, row.data)
 
-            has_pending = doc.id in pending_group_ids
+            has_pending = row.id in pending_group_ids
 
             if user_role == UserGroupRole.MEMBER or user_role == UserGroupRole.OWNER:
                 members = []
-                member_ids = doc_dict.get("members", [])
-                member_docs = db.collection(USER_COLLECTION).where(FieldPath.document_id(), "in", member_ids).get() #only up to 30 members
-                for user_doc in member_docs:
-                    members.append(user_doc.to_dict().get("displayName", ""))
+                for user_doc in loader.get_many(users_col.document(m) for m in row.members):
+                    if user_doc.exists:
+                        members.append(user_dict(user_doc).get("displayName", ""))
             
                 # Build private response with has_pending
-                item = _doc_to_privateStudyGroup(doc, owner_doc, members, user_role, has_pending)
+                item = _row_to_privateStudyGroup(row, owner_doc.id, user_dict(owner_doc), members, user_role, has_pending)
                 items.append(item)
             
             else: # user role is public access
-                item = _doc_to_publicStudyGroup(doc, owner_doc, has_pending)
+                item = _row_to_publicStudyGroup(row, owner_doc.id, user_dict(owner_doc), has_pending)
                 items.append(item)
         
         items.sort(key=lambda item: convert_to_utc_datetime(item.date, item.startTime))
-        return StudyGroupList(items=items)
+        return encoding.respond(request, StudyGroupList(items=items), fmt)
             
     
     except Exception as e:
@@ -421,7 +520,8 @@ def get_all_groups(
 
 @router.get("/{group_id}", 
             response_model=Union[StudyGroupPrivateResponse, StudyGroupPublicResponse]) 
-def get_group(group_id: str, claims: dict = Depends(verify_firebase_token)):
+def get_group(group_id: str, claims: dict = Depends(verify_firebase_token),
+              loader: DocLoader = Depends(get_loader)):
     """
     Returns single study group with appropriate access based on the user sending the request
     """
@@ -434,26 +534,29 @@ def get_group(group_id: str, claims: dict = Depends(verify_firebase_token)):
         doc = col.document(group_id).get()
       
         if doc.exists:
-            group_dict = doc.to_dict()
-            user_role = _get_user_groupRole(uid, group_dict)
+            row = GroupRow.from_snapshot(doc)
+            user_role = _get_user_groupRole(uid, row.data)
 
          
-            ownerID = group_dict.get("ownerID", "")
-            owner_doc = db.collection(USER_COLLECTION).document(ownerID).get()
+            users_col = db.collection(USER_COLLECTION)
+            member_ids = row.members if user_role != UserGroupRole.PUBLIC else []
+            # owner + members in one batched read
+            owner_doc, *member_docs = loader.get_many(
+                [users_col.document(row.ownerID or "-")] + [users_col.document(m) for m in member_ids]
+            )
 
             if owner_doc.exists:
                 if user_role == UserGroupRole.MEMBER or user_role == UserGroupRole.OWNER:
 
                     members = []
-                    member_ids = group_dict.get("members", [])
-                    member_docs = db.collection(USER_COLLECTION).where(FieldPath.document_id(), "in", member_ids).get() #only up to 30 members
                     for user_doc in member_docs:
-                        members.append(user_doc.to_dict().get("displayName", ""))
+                        if user_doc.exists:
+                            members.append(user_doc.to_dict().get("displayName", ""))
                 
-                    return _doc_to_privateStudyGroup(doc, owner_doc, members, user_role)  
+                    return _row_to_privateStudyGroup(row, owner_doc.id, owner_doc.to_dict() or {}, members, user_role)  
                 
                 # user_role is public access
-                return _doc_to_publicStudyGroup(doc, owner_doc)
+                return _row_to_publicStudyGroup(row, owner_doc.id, owner_doc.to_dict() or {})
             
             else:
                 raise HTTPException(status_code=404, detail="This Study Group may no longer exist. Study Group Owner not found.")
@@ -628,9 +731,11 @@ def cleanup_current_user_study_groups(
                 inv_doc.reference.delete()
         except Exception as sub_e:
             # Log but don't fail the entire cleanup if invite deletion has an issue
-            print(
-                f"[cleanupCurrentUser] Failed to delete some invites for {uid}: "
-                f"{type(sub_e).__name__}: {sub_e}"
+            log.warning(
+                "[cleanupCurrentUser] Failed to delete some invites for %s: %s: %s",
+                uid,
+                type(sub_e).__name__,
+                sub_e,
             )
 
         return {"status": "ok"}
@@ -647,6 +752,7 @@ def cleanup_current_user_study_groups(
 def create_join_request_current_user(
     group_id: str,
     claims: dict = Depends(verify_firebase_token),
+    loader: DocLoader = Depends(get_loader),
 ):
     """
     Current user requests to join the given study group.
@@ -659,15 +765,14 @@ def create_join_request_current_user(
         users_col = db.collection(USER_COLLECTION)
         groups_col = db.collection(COLLECTION)
 
-        # 1) Get user
-        user_doc = users_col.document(uid).get()
+        # 1) Get user + group (one batched read)
+        group_ref = groups_col.document(group_id)
+        user_doc, group_doc = loader.get_many([users_col.document(uid), group_ref])
         if not user_doc.exists:
             raise HTTPException(status_code=404, detail="User not found")
         user_data = user_doc.to_dict() or {}
 
-        # 2) Get group
-        group_ref = groups_col.document(group_id)
-        group_doc = group_ref.get()
+        # 2) Check group
         if not group_doc.exists:
             raise HTTPException(status_code=404, detail="Study Group not found")
         group_data = group_doc.to_dict() or {}
@@ -708,6 +813,7 @@ def create_join_request_current_user(
 def list_incoming_requests(
     group_id: str,
     claims: dict = Depends(verify_firebase_token),
+    loader: DocLoader = Depends(get_loader),
 ):
     """
     Owner lists incoming join requests for this study group.
@@ -734,14 +840,15 @@ def list_incoming_requests(
         req_docs = group_ref.collection(JOIN_REQUEST_SUBCOLLECTION).stream()
         users_col = db.collection(USER_COLLECTION)
 
-        items: list[SimpleJoinRequest] = []
+        requester_ids = []
         for d in req_docs:
-            req_data = d.to_dict() or {}
-            requester_id = req_data.get("requesterId")
-            if not requester_id:
-                continue
+            requester_id = (d.to_dict() or {}).get("requesterId")
+            if requester_id:
+                requester_ids.append(requester_id)
 
-            user_doc = users_col.document(requester_id).get()
+        items: list[SimpleJoinRequest] = []
+        user_docs = loader.get_many(users_col.document(r) for r in requester_ids)
+        for requester_id, user_doc in zip(requester_ids, user_docs):
             if not user_doc.exists:
                 continue
             user_data = user_doc.to_dict() or {}
@@ -770,6 +877,7 @@ def list_incoming_requests(
 def list_outgoing_invites(
     group_id: str,
     claims: dict = Depends(verify_firebase_token),
+    loader: DocLoader = Depends(get_loader),
 ):
     """
     Owner lists outgoing invites for this study group.
@@ -784,7 +892,7 @@ def list_outgoing_invites(
         users_col = db.collection(USER_COLLECTION)
 
         group_ref = groups_col.document(group_id)
-        group_doc = group_ref.get()
+        group_doc = loader.get(group_ref)
         if not group_doc.exists:
             raise HTTPException(status_code=404, detail="Study Group not found")
 
@@ -800,23 +908,22 @@ def list_outgoing_invites(
 
         invite_docs = group_ref.collection(INVITES_SUBCOLLECTION).stream()
 
-        # Get latest owner info from users collection
-        owner_doc = users_col.document(uid).get()
-        owner_data = owner_doc.to_dict() or {}
-        owner_handle = owner_data.get("handle", "")
-        owner_display_name = owner_data.get("displayName", "")
-
-        items: list[OutgoingGroupInvite] = []
-
+        invitee_ids = []
         for d in invite_docs:
-            inv = d.to_dict() or {}
-            invitee_id = inv.get("inviteeId", "")
+            invitee_id = (d.to_dict() or {}).get("inviteeId", "")
+            if invitee_id:
+                invitee_ids.append(invitee_id)
 
-            if not invitee_id:
-                continue
+        items: list[OutgoingGroupInvite] = []
 
-            # Refresh invitee's handle/name from users collection
-            invitee_doc = users_col.document(invitee_id).get()
+        # Latest owner + invitees' handle/name from users collection (one batched read)
+        owner_doc, *invitee_docs = loader.get_many(
+            [users_col.document(uid)] + [users_col.document(i) for i in invitee_ids]
+        )
+        owner_data = owner_doc.to_dict() or {}
+        owner_handle = owner_data.get("handle", "")
+        owner_display_name = owner_data.get("displayName", "")
+        for invitee_id, invitee_doc in zip(invitee_ids, invitee_docs):
             if not invitee_doc.exists:
                 # If the user doc is gone (deleted account, etc.), you might
                 # skip this invite or still include it with blank fields.
@@ -900,6 +1007,7 @@ def invite_user_by_handle(
     group_id: str,
     payload: InviteByHandle,
     claims: dict = Depends(verify_firebase_token),
+    loader: DocLoader = Depends(get_loader),
 ):
     """
     Study group owner invites a user by their handle.
@@ -917,7 +1025,7 @@ def invite_user_by_handle(
         users_col = db.collection(USER_COLLECTION)
 
         group_ref = groups_col.document(group_id)
-        group_doc = group_ref.get()
+        group_doc = loader.get(group_ref)
         if not group_doc.exists:
             raise HTTPException(status_code=404, detail="Study Group not found")
 
@@ -932,8 +1040,8 @@ def invite_user_by_handle(
                 detail="Only Study Group Owners can invite users.",
             )
 
-        # 2) Get owner user data (for ownerHandle / ownerDisplayName)
-        owner_doc = users_col.document(uid).get()
+        # 2) Owner user data (for ownerHandle / ownerDisplayName)
+        owner_doc = loader.get(users_col.document(uid))
         if not owner_doc.exists:
             raise HTTPException(status_code=404, detail="Owner user doc not found")
         owner_data = owner_doc.to_dict() or {}
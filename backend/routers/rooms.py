@@ -1,14 +1,20 @@
 # backend/routers/rooms.py
 import base64, json
+import contextvars
 import logging
-from datetime import datetime, timedelta
-from fastapi import APIRouter, HTTPException, Query, Depends
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from fastapi import APIRouter, HTTPException, Query, Depends, Request
+from fastapi.responses import StreamingResponse
 from typing import Any, Dict, List, Optional
 from google.cloud import firestore
-from google.api_core.exceptions import AlreadyExists
+from google.api_core.exceptions import AlreadyExists, FailedPrecondition
 from services.firestore_client import get_db
-from models.room import Room, RoomsResponse
-from auth import verify_firebase_token
+from services import buildings, counters, encoding, locked_reports_reset, slot_index
+from models.room import Room, RoomsResponse, RoomSearchResponse, RoomSearchResult, SlotRow
+from auth import require_admin, verify_firebase_token
 
 try:
     from zoneinfo import ZoneInfo
@@ -22,11 +28,45 @@ log = logging.getLogger("uvicorn.error")
 # Each document in this collection is an availability slot for a room/time.
 COLLECTION = "availabilitySlots"
 # Subcollection used to track which users have reported a slot as locked.
+# Doc ids are "{day}_{uid}", so each day's votes form their own partition.
 USER_SUBCOLLECTION = "lockedReportsUsers"
-BUILDINGS_COLLECTION = "buildings"
+BUILDINGS_COLLECTION = buildings.COLLECTION
+# One presence doc per user: checkins/{uid} -> which slot they are in right now.
+CHECKINS_COLLECTION = "checkins"
+# A check-in auto-expires after this long (or at the slot's end, if sooner).
+CHECKIN_MAX_MINUTES = int(os.getenv("CHECKIN_MAX_MINUTES", "180"))
+
+# list_rooms reads Firestore in pages of at most SCAN_PAGE_MAX docs and stops
+# once it has limit+1 matches, or after SCAN_MAX_DOCS docs (then it returns a
+# short page whose token resumes the scan).
+SCAN_PAGE_MAX = 500
+SCAN_MAX_DOCS = 2000
+
+# startDate/endDate mode of list_rooms: at most RANGE_MAX_DAYS days and
+# RANGE_MAX_ITEMS slots per request, days looked up RANGE_MAX_WORKERS at a time.
+RANGE_MAX_DAYS = int(os.getenv("RANGE_MAX_DAYS", "14"))
+RANGE_MAX_ITEMS = int(os.getenv("RANGE_MAX_ITEMS", "2000"))
+RANGE_MAX_WORKERS = int(os.getenv("RANGE_MAX_WORKERS", "7"))
+
+# Fields each listing route reads; queries select() only these, so unused
+# fields (floor, campusZone, durationMin, ...) never leave Firestore.
+BUILDING_LIST_FIELDS = buildings.LIST_FIELDS
+SLOT_LIST_FIELDS = [
+    "roomId",
+    "buildingCode",
+    "roomNumber",
+    "date",
+    "start",
+    "end",
+    "startMin",
+    "endMin",
+    counters.LOCKED_REPORTS,
+    counters.CURRENT_CHECKINS,
+]
 
 @router.get("/buildings")
 def list_buildings(
+    request: Request,
     claims: dict = Depends(verify_firebase_token),
 ):
     """
@@ -35,22 +75,11 @@ def list_buildings(
     Each document in 'buildings' is expected to have fields:
       - code: "VEC"
       - name: "Vivian Engineering Center"
+
+    Served from the per-instance cache in services.buildings.
     """
     try:
-        db = get_db()
-        col = db.collection(BUILDINGS_COLLECTION)
-
-        docs = col.stream()
-        buildings = []
-        for d in docs:
-            data = d.to_dict() or {}
-            code = data.get("code") or d.id
-            name = data.get("name") or code
-            buildings.append({"code": code, "name": name})
-
-        # sort by code so it's stable
-        buildings.sort(key=lambda b: b["code"])
-        return buildings
+        return encoding.respond(request, buildings.all_buildings(get_db()))
 
     except Exception as e:
         log.exception("list_buildings failed: %s", e)
@@ -60,22 +89,27 @@ def list_buildings(
         )
 
 
-def _doc_to_room(doc, user_has_reported: bool = False) -> Room:
-    d = doc.to_dict() or {}
+def _row_to_room(row: SlotRow, user_has_reported: bool = False, counts: Optional[Dict[str, Dict[str, int]]] = None) -> Room:
+    counts = counts or {}
     return Room(
-        id=doc.id,
-        buildingCode=d.get("buildingCode", ""),
-        roomNumber=str(d.get("roomNumber", "")),
-        date=d.get("date", ""),
-        start=d.get("start", ""),
-        end=d.get("end", ""),
-        # Firestore field stored as "locked_reports"
-        lockedReports = int(d.get("locked_reports", 0) or 0),
+        id=row.id,
+        buildingCode=row.buildingCode,
+        roomNumber=row.roomNumber,
+        date=row.date,
+        start=row.start,
+        end=row.end,
+        # Firestore field stored as "locked_reports" (+ sharded counter total)
+        lockedReports=counters.slot_count(counts, row.id, counters.LOCKED_REPORTS, row.locked_reports),
         userHasReported=user_has_reported,
-        currentCheckins=int(d.get("currentCheckins", 0) or 0),
+        currentCheckins=counters.slot_count(counts, row.id, counters.CURRENT_CHECKINS, row.currentCheckins),
     )
 
 
+def _vote_doc_id(uid: str) -> str:
+    """Today's vote-marker id for a user (see USER_SUBCOLLECTION)."""
+    return f"{counters.today()}_{uid}"
+
+
 def _encode_token(cursor: Dict[str, Any]) -> str:
     raw = json.dumps(cursor).encode("utf-8")
     return base64.urlsafe_b64encode(raw).decode("utf-8")
@@ -96,19 +130,215 @@ def _parse_hhmm_to_min(hhmm: Optional[str]) -> Optional[int]:
         return None
 
 
-@router.get("/", response_model=RoomsResponse)
+def _cursor_values(row: SlotRow) -> List[Any]:
+    """Position of a slot in list_rooms' (roomId, date, startMin) ordering."""
+    return [row.roomId, row.date, row.startMin]
+
+
+def _scan_slots(q, limit: int, keep, start_after: Optional[List[Any]] = None):
+    """
+    Page through `q` (already ordered) until `limit` rows pass `keep`, and
+    check whether one more exists.
+
+    Returns (rows, resume_after, scanned). `resume_after` is the raw cursor
+    for the next page: the last doc consumed that is NOT part of a returned
+    row, so docs filtered out here are never read again. It is None when
+    the query is exhausted.
+    """
+    rows: List[SlotRow] = []
+    scanned = 0
+    cursor = start_after
+    # No Python-side filter -> limit+1 docs is exactly one page.
+    page_size = min(limit + 1, SCAN_PAGE_MAX)
+    while True:
+        page_q = q.limit(page_size)
+        if cursor is not None:
+            page_q = page_q.start_after(cursor)
+        page = [SlotRow.from_snapshot(d) for d in page_q.stream()]
+        scanned += len(page)
+
+        for row in page:
+            if not keep(row):
+                cursor = _cursor_values(row)
+                continue
+            if len(rows) == limit:
+                # a (limit+1)-th match exists: resume right before it
+                return rows, cursor, scanned
+            rows.append(row)
+            cursor = _cursor_values(row)
+
+        if len(page) < page_size:
+            return rows, None, scanned
+        if scanned >= SCAN_MAX_DOCS:
+            return rows, cursor, scanned
+
+        # Size the next page from the match rate seen so far.
+        needed = limit + 1 - len(rows)
+        rate = max(len(rows) / scanned, 0.05)
+        page_size = max(1, min(SCAN_PAGE_MAX, SCAN_MAX_DOCS - scanned, int(needed / rate) + 1))
+
+
+def _min_to_hhmm(minutes: int) -> str:
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def _user_reported_ids(db, rows: List[SlotRow], uid: Optional[str]) -> set:
+    """Ids of the rows this user reported today, in one batched read."""
+    if not uid or not rows:
+        return set()
+    vote_id = _vote_doc_id(uid)
+    refs = [r.reference.collection(USER_SUBCOLLECTION).document(vote_id) for r in rows]
+    return {snap.reference.parent.parent.id for snap in db.get_all(refs) if snap.exists}
+
+
+def _range_dates(start_date: str, end_date: str) -> List[str]:
+    try:
+        first = datetime.strptime(start_date, "%Y-%m-%d")
+        last = datetime.strptime(end_date, "%Y-%m-%d")
+    except ValueError:
+        raise HTTPException(status_code=400, detail="startDate/endDate must be YYYY-MM-DD")
+    n_days = (last - first).days + 1
+    if n_days < 1:
+        raise HTTPException(status_code=400, detail="endDate is before startDate")
+    if n_days > RANGE_MAX_DAYS:
+        raise HTTPException(status_code=400, detail=f"date range is limited to {RANGE_MAX_DAYS} days")
+    return [(first + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(n_days)]
+
+
+def _time_params_to_window(start_min: Optional[int], end_min: Optional[int]):
+    """
+    list_rooms' time semantics as a slot_index window (overlap >= 1 minute):
+    start only -> contains T, end only -> starts before E, both -> overlaps [S,E).
+    """
+    if start_min is not None and end_min is None:
+        return (start_min, start_min + 1)
+    return (start_min if start_min is not None else 0, end_min if end_min is not None else 24 * 60)
+
+
+def _day_rows(db, day: str, window, building, zone) -> List[SlotRow]:
+    """One day's matching slots from the slot index, in (roomId, startMin) order."""
+    matches = slot_index.for_date(db, day).search(building=building, zone=zone, window=window)
+    return sorted((m[0] for m in matches), key=lambda r: (r.roomId, r.startMin))
+
+
+def _day_items(db, day: str, rows: List[SlotRow], uid: Optional[str]) -> List[Room]:
+    """Rooms for the rows a range request will send (counters + userHasReported)."""
+    counts = counters.counts_for_date(db, day)
+    reported = _user_reported_ids(db, rows, uid)
+    return [_row_to_room(r, user_has_reported=r.id in reported, counts=counts) for r in rows]
+
+
+def _stream_date_range(db, days: List[str], uid, window, building, zone, per_day_limit: int):
+    """
+    NDJSON body for the range mode: one {"date", "items", "truncated"} line
+    per day, in date order, then a {"done": true, ...} summary line.
+
+    Days are looked up concurrently, in a copy of the request context, so
+    their Firestore calls are counted on this request (the metrics middleware
+    records a streamed request once its body is finished). RANGE_MAX_ITEMS
+    bounds the reads as well as the rows: a day's index lookup only starts
+    while items are left (at most RANGE_MAX_WORKERS days ahead), and counters
+    / vote markers are read for the rows that are sent and no others. Days
+    after the cap is reached are sent empty with "truncated": true.
+    """
+    workers = min(RANGE_MAX_WORKERS, len(days))
+    remaining = RANGE_MAX_ITEMS
+    truncated_any = False
+    upcoming = iter(days)
+    searches = deque()  # (day, future -> rows), in date order
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        def submit(fn, *args):
+            return pool.submit(contextvars.copy_context().run, fn, *args)
+
+        def prefetch():
+            while remaining > 0 and len(searches) < workers:
+                day = next(upcoming, None)
+                if day is None:
+                    return
+                searches.append((day, submit(_day_rows, db, day, window, building, zone)))
+
+        prefetch()
+        for day in days:
+            if not searches or searches[0][0] != day:
+                # cap reached before this day was looked up
+                truncated_any = True
+                yield json.dumps({"date": day, "items": [], "truncated": True}) + "\n"
+                continue
+            try:
+                rows = searches.popleft()[1].result()
+                take = min(per_day_limit, remaining)
+                truncated = len(rows) > take
+                rows = rows[:take]
+                remaining -= len(rows)
+                items_future = submit(_day_items, db, day, rows, uid)
+                prefetch()
+                items = items_future.result()
+            except Exception as e:
+                log.exception("list_rooms range: day %s failed: %s", day, e)
+                prefetch()
+                yield json.dumps({"date": day, "error": f"{type(e).__name__}: {e}"}) + "\n"
+                continue
+            truncated_any = truncated_any or truncated
+            yield json.dumps({
+                "date": day,
+                "items": [i.model_dump() for i in items],
+                "truncated": truncated,
+            }) + "\n"
+    sent = RANGE_MAX_ITEMS - remaining
+    yield json.dumps({"done": True, "days": len(days), "items": sent, "truncated": truncated_any}) + "\n"
+
+
+def _debug_preview(rows: List[SlotRow], n: int = 15) -> list:
+    """(building, room, startMin, endMin) of the first n rows; only build when DEBUG is on."""
+    return [(r.buildingCode, r.roomNumber, r.startMin, r.endMin) for r in rows[:n]]
+
+
+# list_rooms' 200 response: RoomsResponse JSON, or NDJSON lines in range mode
+_LIST_ROOMS_RESPONSES = {
+    200: {
+        "description": "RoomsResponse; with startDate/endDate an NDJSON stream, one line per day",
+        "content": {
+            "application/x-ndjson": {
+                "schema": {
+                    "type": "string",
+                    "description": 'lines of {"date", "items": [Room], "truncated"} (or {"date", "error"}), '
+                                   'then {"done": true, "days", "items", "truncated"}',
+                },
+            },
+        },
+    },
+}
+
+
+@router.get("/", response_model=RoomsResponse, responses=_LIST_ROOMS_RESPONSES)
 def list_rooms(
+    request: Request,
     limit: int = Query(50, ge=1, le=200),
     pageToken: Optional[str] = Query(None, alias="pageToken"),
     building: Optional[str] = Query(None, description="buildingCode like AS, ECS, LA1"),
     date: Optional[str] = Query(None, description="YYYY-MM-DD"), # ADDED DATE
     startTime: Optional[str] = Query(None, description="HH:mm (inclusive start of desired window)"),
     endTime: Optional[str] = Query(None, description="HH:mm (exclusive end of desired window)"),
+    startDate: Optional[str] = Query(None, description="YYYY-MM-DD, first day of a range (with endDate)"),
+    endDate: Optional[str] = Query(None, description="YYYY-MM-DD, last day of a range (inclusive)"),
+    zone: Optional[str] = Query(None, description="campusZone, e.g. upper / lower (range mode only)"),
+    fmt: str = Query("json", alias="format", pattern=encoding.FORMATS, description="json | columnar"),
     claims: dict = Depends(verify_firebase_token),
 ):
     """
     UPDATED: Returns today's available room slots if no date is provided
 
+    RANGE MODE: with startDate/endDate (up to RANGE_MAX_DAYS days) the
+    response is streamed as NDJSON, one line per day:
+        {"date": "2025-10-27", "items": [Room, ...], "truncated": false}
+    followed by {"done": true, "days": n, "items": total, "truncated": bool}.
+    `limit` caps each day, RANGE_MAX_ITEMS caps the whole response;
+    pageToken is not used. Days are served from the per-date slot index.
+    `zone` filters range mode only; other requests with it get 400.
+
+    format=columnar sends `items` as one array per field (single-day mode).
+
     Returns ONLY today's available room slots (from `availabilitySlots`).
 
     Time filter semantics (overlap mode):
@@ -132,6 +362,16 @@ def list_rooms(
 
         uid = claims.get("uid") or claims.get("sub")
 
+        if startDate or endDate:
+            days = _range_dates(startDate or endDate, endDate or startDate)
+            window = _time_params_to_window(_parse_hhmm_to_min(startTime), _parse_hhmm_to_min(endTime))
+            return StreamingResponse(
+                _stream_date_range(db, days, uid, window, building, zone, limit),
+                media_type="application/x-ndjson",
+            )
+        if zone:
+            raise HTTPException(status_code=400, detail="zone is only supported with startDate/endDate")
+
         now = datetime.now(TZ) if TZ else datetime.utcnow()
         # today = (now + timedelta(days=1)).strftime("%Y-%m-%d") # THIS IS FOR TESTING
         today = now.strftime("%Y-%m-%d")
@@ -171,121 +411,71 @@ def list_rooms(
             # Firestore: startMin < E (no extra Python filter needed)
             q = q.where("startMin", "<", end_min_param)
 
-        fetch_limit = 2000  # overfetch to account for post-filtering
-
         # Stable ordering for pagination
         q = (
-            q.order_by("roomId")
+            q.select(SLOT_LIST_FIELDS)
+             .order_by("roomId")
              .order_by("date")
              .order_by("startMin")
-             .limit(fetch_limit)
         )
 
-        # Cursor
+        # --- Python-side filtering for the parts Firestore can't express ---
+        def keep(row: SlotRow) -> bool:
+            if filter_contains_T and start_min_param is not None:
+                # Keep only slots with startMin <= T
+                return row.startMin <= start_min_param
+            if filter_overlap_SE and start_min_param is not None:
+                # We already enforced startMin < E in Firestore,
+                # now enforce endMin > S here.
+                return row.endMin > start_min_param
+            return True
+
+        # Cursor: raw position in the Firestore ordering (see _scan_slots)
+        start_after = None
         if pageToken:
             cursor = _decode_token(pageToken)
-            q = q.start_after([
+            start_after = [
                 cursor.get("roomId", ""),
                 cursor.get("date", ""),
                 cursor.get("startMin", 0),
-            ])
-
-        print(
-            f"[rooms] date={today} "
-            f"building={building!r} "
-            f"startTimeParam={startTime!r} (min={start_min_param}) "
-            f"endTimeParam={endTime!r} (min={end_min_param}) "
-            f"limit={limit} fetch_limit={fetch_limit}"
-        )
+            ]
 
-        # --- Fetch from Firestore ---
-        docs = list(q.stream())
-        print(f"[rooms DEBUG] BEFORE post-filter: {len(docs)} docs")
-        preview_before = []
-        for d in docs[:15]:
-            data = d.to_dict() or {}
-            preview_before.append(
-                (
-                    data.get("buildingCode"),
-                    str(data.get("roomNumber")),
-                    data.get("startMin"),
-                    data.get("endMin"),
-                )
-            )
-        print("    first 15:", preview_before)
+        # --- Fetch from Firestore in small pages (each snapshot decoded once) ---
+        rows, resume_after, scanned = _scan_slots(q, limit, keep, start_after)
 
-        # --- Python-side filtering for the parts Firestore can't express ---
-        if filter_contains_T and start_min_param is not None:
-            # Keep only slots with startMin <= T
-            tmp = []
-            for d in docs:
-                data = d.to_dict() or {}
-                start_min = int(data.get("startMin", 9999))
-                if start_min <= start_min_param:
-                    tmp.append(d)
-            docs = tmp
-
-        if filter_overlap_SE and start_min_param is not None:
-            # We already enforced startMin < E in Firestore,
-            # now enforce endMin > S here.
-            tmp = []
-            for d in docs:
-                data = d.to_dict() or {}
-                end_min = int(data.get("endMin", -1))
-                if end_min > start_min_param:
-                    tmp.append(d)
-            docs = tmp
-
-        print(f"[rooms DEBUG] AFTER post-filter: {len(docs)} docs")
-        preview_after = []
-        for d in docs[:15]:
-            data = d.to_dict() or {}
-            preview_after.append(
-                (
-                    data.get("buildingCode"),
-                    str(data.get("roomNumber")),
-                    data.get("startMin"),
-                    data.get("endMin"),
-                )
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug(
+                "[rooms] date=%s building=%r startTimeParam=%r (min=%s) "
+                "endTimeParam=%r (min=%s) limit=%d scanned=%d matched=%d, first 15: %s",
+                q_date, building, startTime, start_min_param,
+                endTime, end_min_param, limit, scanned, len(rows), _debug_preview(rows),
             )
-        print("    first 15:", preview_after)
-
-        # --- Pagination bookkeeping (on the filtered docs) ---
-        has_more = len(docs) > limit
-        docs = docs[:limit]
-
-        items: List[Room] = []
-
-        for d in docs:
-            user_has_reported = False
-            if uid:
-                try:
-                    vote_ref = d.reference.collection(USER_SUBCOLLECTION).document(uid)
-                    vote_snap = vote_ref.get()
-                    user_has_reported = vote_snap.exists
-                except Exception as ex:
-                    # Don't fail the whole request if this per-doc check breaks
-                    log.warning(
-                        "list_rooms: failed userHasReported check for doc %s uid=%s: %s",
-                        d.id,
-                        uid,
-                        ex,
-                    )
-            items.append(_doc_to_room(d, user_has_reported=user_has_reported))
+
+        counts = counters.counts_for_date(db, q_date)
+        try:
+            reported = _user_reported_ids(db, rows, uid)
+        except Exception as ex:
+            # Don't fail the whole request if the userHasReported lookup breaks
+            log.warning("list_rooms: failed userHasReported check uid=%s: %s", uid, ex)
+            reported = set()
+        items: List[Room] = [
+            _row_to_room(row, user_has_reported=row.id in reported, counts=counts) for row in rows
+        ]
 
         next_token = None
-        if has_more and docs:
-            last_data = docs[-1].to_dict() or {}
+        if resume_after is not None:
             next_token = _encode_token(
                 {
-                    "roomId": last_data.get("roomId", ""),
-                    "date": last_data.get("date", ""),
-                    "startMin": last_data.get("startMin", 0),
+                    "roomId": resume_after[0],
+                    "date": resume_after[1],
+                    "startMin": resume_after[2],
                 }
             )
 
-        return RoomsResponse(items=items, nextPageToken=next_token)
+        return encoding.respond(request, RoomsResponse(items=items, nextPageToken=next_token), fmt)
 
+    except HTTPException:
+        raise
     except Exception as e:
         log.exception("list_rooms failed: %s", e)
         raise HTTPException(
@@ -294,6 +484,100 @@ def list_rooms(
         )
 
 
+# Ranking keys for /rooms/search over (row, freeStart, freeEnd, lockedReports)
+_SEARCH_SORTS = {
+    "longest": lambda m: (-(m[2] - m[1]), m[3], m[1], m[0].id),
+    "leastReports": lambda m: (m[3], -(m[2] - m[1]), m[1], m[0].id),
+    "earliest": lambda m: (m[1], -(m[2] - m[1]), m[0].id),
+}
+
+
+@router.get("/search", response_model=RoomSearchResponse)
+def search_rooms(
+    request: Request,
+    date: Optional[str] = Query(None, description="YYYY-MM-DD (default today)"),
+    startTime: Optional[str] = Query(None, description="HH:mm, start of the window to be free in"),
+    endTime: Optional[str] = Query(None, description="HH:mm, end of the window"),
+    minDuration: int = Query(0, ge=0, le=24 * 60, description="minutes free inside the window"),
+    zone: Optional[str] = Query(None, description="campusZone, e.g. upper / lower"),
+    floor: Optional[int] = Query(None, ge=0),
+    building: Optional[str] = Query(None, description="buildingCode like AS, ECS, LA1"),
+    sort: str = Query("longest", pattern="^(longest|leastReports|earliest)$"),
+    limit: int = Query(20, ge=1, le=200),
+    fmt: str = Query("json", alias="format", pattern=encoding.FORMATS, description="json | columnar"),
+    claims: dict = Depends(verify_firebase_token),
+):
+    """
+    "Rooms free for at least N minutes in zone X on floor Y between S and E".
+
+    Answered from the per-date in-memory slot index (services.slot_index),
+    so any combination of filters costs no extra Firestore index or query.
+    Each result carries the part of the slot inside [S, E) (freeStart,
+    freeEnd, freeMinutes). Ranking:
+      - longest       longest free window first (default)
+      - leastReports  fewest locked reports first
+      - earliest      earliest free start first
+    """
+    try:
+        db = get_db()
+        uid = claims.get("uid") or claims.get("sub")
+        q_date = date or counters.today()
+
+        lo = _parse_hhmm_to_min(startTime)
+        hi = _parse_hhmm_to_min(endTime)
+        window = (lo if lo is not None else 0, hi if hi is not None else 24 * 60)
+        if window[0] >= window[1]:
+            raise HTTPException(status_code=400, detail="startTime must be before endTime")
+
+        index = slot_index.for_date(db, q_date)
+        matches = index.search(
+            building=building,
+            zone=zone,
+            floor=floor,
+            window=window,
+            min_minutes=minDuration,
+        )
+
+        # Rank on plain tuples; only the top `limit` become response models.
+        counts = counters.counts_for_date(db, q_date)
+        ranked = sorted(
+            (
+                (row, free_start, free_end,
+                 counters.slot_count(counts, row.id, counters.LOCKED_REPORTS, row.locked_reports))
+                for row, free_start, free_end in matches
+            ),
+            key=_SEARCH_SORTS[sort],
+        )[:limit]
+
+        reported = _user_reported_ids(db, [m[0] for m in ranked], uid)
+        items = [
+            RoomSearchResult(
+                **_row_to_room(row, user_has_reported=row.id in reported, counts=counts).model_dump(),
+                floor=row.floor,
+                campusZone=row.campusZone,
+                freeStart=_min_to_hhmm(free_start),
+                freeEnd=_min_to_hhmm(free_end),
+                freeMinutes=free_end - free_start,
+            )
+            for row, free_start, free_end, _ in ranked
+        ]
+
+        log.debug(
+            "[rooms/search] date=%s window=%s min=%d zone=%r floor=%r building=%r -> %d of %d slots",
+            q_date, window, minDuration, zone, floor, building, len(matches), len(index),
+        )
+        return encoding.respond(request, RoomSearchResponse(items=items), fmt)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        log.exception("search_rooms failed: %s", e)
+        raise HTTPException(
+            status_code=500,
+            detail=f"/rooms/search failed: {type(e).__name__}: {e}",
+        )
+
+
 @router.post("/{room_id}/report_locked")
 def report_locked(
     room_id: str,
@@ -304,9 +588,15 @@ def report_locked(
     but ONLY once per unique user (Firebase uid), regardless of session/device.
 
     We enforce uniqueness by creating:
-      availabilitySlots/{room_id}/lockedReportsUsers/{uid}
+      availabilitySlots/{room_id}/lockedReportsUsers/{day}_{uid}
+
+    Reports are partitioned by campus-local day, so a new day starts with
+    no reports and no reset writes; old markers expire via TTL on expireAt.
 
-    If that doc already exists, we do NOT increment again.
+    The marker create and the counter increment go out in ONE batched write:
+    if the marker already exists the whole batch fails with AlreadyExists and
+    nothing is incremented. The increment lands on a random counter shard
+    (see services/counters.py), so a popular slot is not a hot document.
     """
     uid = claims.get("uid") or claims.get("sub")
     email = (claims.get("email") or "").lower()
@@ -324,30 +614,38 @@ def report_locked(
         if not snap.exists:
             raise HTTPException(status_code=404, detail="Room slot not found")
 
-        votes_ref = slot_ref.collection(USER_SUBCOLLECTION).document(uid)
-
-        # Try to create a marker doc for this user.
-        # - If it already exists, Firestore raises AlreadyExists → user already reported.
-        # - If it succeeds, this is the first report from this uid.
+        slot_data = snap.to_dict() or {}
+        slot_date = slot_data.get("date", "")
+        report_day = counters.today()
+        votes_ref = slot_ref.collection(USER_SUBCOLLECTION).document(_vote_doc_id(uid))
+
+        # Warm the aggregated counts BEFORE writing; our own increment is
+        # then applied locally so it is never counted twice.
+        counts = counters.counts_for_date(db, slot_date)
+
+        batch = db.batch()
+        batch.create(
+            votes_ref,
+            {
+                "createdAt": firestore.SERVER_TIMESTAMP,
+                "email": email,
+                "day": report_day,
+                "expireAt": counters.partition_expire_at(report_day),
+            },
+        )
+        counters.add_increment(batch, slot_ref, slot_date, counters.LOCKED_REPORTS, 1)
         try:
-            votes_ref.create(
-                {
-                    "createdAt": firestore.SERVER_TIMESTAMP,
-                    "email": email,
-                }
-            )
+            batch.commit()
             first_time = True
         except AlreadyExists:
             first_time = False
 
         if first_time:
-            # First time this user reports → increment the counter
-            slot_ref.update({"locked_reports": firestore.Increment(1)})
+            counters.apply_local_delta(slot_date, room_id, counters.LOCKED_REPORTS, 1)
 
-        # Read the latest count (outside any transaction)
-        new_snap = slot_ref.get()
-        data = new_snap.to_dict() or {}
-        new_count = int(data.get("locked_reports", 0))
+        new_count = counters.slot_count(
+            counts, room_id, counters.LOCKED_REPORTS, slot_data.get("locked_reports", 0)
+        )
 
         log.info(
             "report_locked: room_id=%s uid=%s first_time=%s new_count=%d",
@@ -375,96 +673,303 @@ def report_locked(
 
 
 @router.post("/admin/reset_locked_reports")
-def reset_locked_reports(claims: dict = Depends(verify_firebase_token)):
+def reset_locked_reports(
+    purgeLegacy: bool = Query(False, description="also clear pre-partition report data"),
+    claims: dict = Depends(require_admin),
+):
     """
-    Reset locked_reports = 0 ONLY for slots that currently have
-    locked_reports > 0, and clear their per-user 'lockedReportsUsers'
-    subcollections.
-
-    Intended to be called by a scheduled job once per day (around 00:00)
-    using Cloud Scheduler + OIDC service account auth.
-
-    This is implemented as a loop over small batches of docs with
-    locked_reports > 0, so it finishes within Cloud Run / Scheduler
-    time limits.
+    Nightly roll-over of locked reports (Cloud Scheduler around 00:00,
+    OIDC service account auth). Admin only (auth.require_admin).
+
+    Reports and their vote markers are stored per campus-local day (see
+    services/counters.py), so the new day already starts empty: this only
+    records the roll-over in adminJobs/lockedReportsPartition, one write.
+    Old partitions are deleted by Firestore TTL policies on `expireAt` for
+    the 'counterShards' and 'lockedReportsUsers' collection groups.
+
+    purgeLegacy=true additionally runs services/locked_reports_reset.py to
+    clear report data written before partitioning (slot-doc locked_reports,
+    un-partitioned shards and vote markers). That run is cursor-paged,
+    chunked, concurrent and resumable; it returns status "partial" when it
+    stopped early, plus per-phase timing stats.
     """
     try:
         db = get_db()
-        col = db.collection(COLLECTION)
+        day = counters.today()
+        db.collection(locked_reports_reset.CHECKPOINT_COLLECTION).document("lockedReportsPartition").set(
+            {"currentDay": day, "rolledAt": firestore.SERVER_TIMESTAMP}
+        )
+        counters.invalidate()
+        log.info("reset_locked_reports: rolled over to partition %s", day)
+
+        if not purgeLegacy:
+            return {"status": "ok", "currentDay": day}
 
+        result = locked_reports_reset.run_reset(db)
         log.info(
-            "reset_locked_reports: starting selective reset for collection '%s'",
-            COLLECTION,
+            "reset_locked_reports: legacy purge %s, slotsReset=%d, shardsReset=%d, userVotesCleared=%d",
+            result["status"].upper(),
+            result["slotsReset"],
+            result["shardsReset"],
+            result["userVotesCleared"],
         )
+        return {**result, "currentDay": day}
 
-        BATCH_SIZE = 100
-        total_slots = 0
-        total_votes = 0
-        batch_round = 0
+    except Exception as e:
+        log.exception("reset_locked_reports: FAILED: %s", e)
+        raise HTTPException(
+            status_code=500,
+            detail=f"reset_locked_reports failed: {type(e).__name__}: {e}",
+        )
 
-        while True:
-            batch_round += 1
+def _slot_end_datetime(slot_data: dict) -> Optional[datetime]:
+    """Slot's end as an aware datetime (campus time), or None if unknown."""
+    try:
+        day = datetime.strptime(slot_data.get("date", ""), "%Y-%m-%d")
+        end_min = int(slot_data["endMin"])
+    except Exception:
+        return None
+    if TZ:
+        day = day.replace(tzinfo=TZ)
+    else:
+        day = day.replace(tzinfo=timezone.utc)
+    return day + timedelta(minutes=end_min)
 
-            # Only documents that actually have any reports
-            query = col.where("locked_reports", ">", 0).limit(BATCH_SIZE)
-            docs = list(query.stream())
 
-            if not docs:
-                log.info(
-                    "reset_locked_reports: no more docs with locked_reports > 0 "
-                    "(completed in %d rounds)",
-                    batch_round - 1,
-                )
-                break
+@firestore.transactional
+def _checkin_transaction(transaction, presence_ref, slot_ref, slot_date: str, expire_at: datetime):
+    """
+    Point the user's presence doc at this slot.
+    Returns (counted, previous, occupancy): `counted` is True if this slot
+    gained an occupant, `previous` is the (slotId, date) the user was moved
+    out of, and `occupancy` is the exact count before this check-in when the
+    slot has a 'capacity' (else None).
+
+    The capacity check reads the slot and its shards inside the transaction,
+    so two concurrent check-ins can't both take the last place.
+    """
+    snap = presence_ref.get(transaction=transaction)
+    prev = (snap.to_dict() or {}) if snap.exists else None
+
+    previous = None
+    if prev and prev.get("slotId") != slot_ref.id:
+        previous = (prev.get("slotId", ""), prev.get("date", ""))
+    counted = prev is None or previous is not None
+
+    occupancy = None
+    slot_snap = slot_ref.get(transaction=transaction)
+    capacity = (slot_snap.to_dict() or {}).get("capacity") if slot_snap.exists else None
+    if capacity is not None:
+        occupancy = counters.transactional_slot_count(
+            transaction, slot_ref, slot_snap, slot_date, counters.CURRENT_CHECKINS
+        )
+        if counted and occupancy >= int(capacity):
+            raise HTTPException(status_code=409, detail="Room is at capacity")
+
+    # all reads done; writes from here on
+    if previous:
+        prev_ref = slot_ref.parent.document(previous[0])
+        counters.add_increment(transaction, prev_ref, previous[1], counters.CURRENT_CHECKINS, -1)
+    if counted:
+        counters.add_increment(transaction, slot_ref, slot_date, counters.CURRENT_CHECKINS, 1)
+
+    transaction.set(
+        presence_ref,
+        {
+            "slotId": slot_ref.id,
+            "date": slot_date,
+            "checkedInAt": firestore.SERVER_TIMESTAMP,
+            "expireAt": expire_at,
+        },
+    )
+    return counted, previous, occupancy
 
-            batch = db.batch()
-            slots_in_batch = 0
-            votes_in_batch = 0
 
-            for d in docs:
-                slot_ref = d.reference
-                slots_in_batch += 1
-                total_slots += 1
+@firestore.transactional
+def _checkout_transaction(transaction, presence_ref, slot_ref) -> Optional[str]:
+    """Remove the user's presence from this slot. Returns the slot date, or None if not checked in here."""
+    snap = presence_ref.get(transaction=transaction)
+    if not snap.exists:
+        return None
+    prev = snap.to_dict() or {}
+    if prev.get("slotId") != slot_ref.id:
+        return None
 
-                # 1) reset locked_reports count
-                batch.update(slot_ref, {"locked_reports": 0})
+    slot_date = prev.get("date", "")
+    counters.add_increment(transaction, slot_ref, slot_date, counters.CURRENT_CHECKINS, -1)
+    transaction.delete(presence_ref)
+    return slot_date
 
-                # 2) delete all per-user vote docs under this slot
-                votes_col = slot_ref.collection(USER_SUBCOLLECTION)
-                for vote_ref in votes_col.list_documents():
-                    batch.delete(vote_ref)
-                    votes_in_batch += 1
-                    total_votes += 1
 
-            batch.commit()
+@router.post("/{room_id}/checkin")
+def checkin(
+    room_id: str,
+    claims: dict = Depends(verify_firebase_token),
+):
+    """
+    Check the current user into an availability slot.
 
-            log.info(
-                (
-                    "reset_locked_reports: committed batch #%d: "
-                    "slotsReset=%d, userVotesCleared=%d "
-                    "(totals so far: slots=%d, votes=%d)"
-                ),
-                batch_round,
-                slots_in_batch,
-                votes_in_batch,
-                total_slots,
-                total_votes,
-            )
+    Presence is one doc per user (checkins/{uid}), so checking into another
+    slot moves the user instead of double counting. Occupancy is kept in the
+    sharded 'currentCheckins' counter (services/counters.py).
+
+    A check-in expires after CHECKIN_MAX_MINUTES or at the slot's end,
+    whichever is first; /admin/expire_checkins releases expired ones.
+    If the slot doc has a 'capacity' field, full rooms are rejected with 409
+    (checked inside the check-in transaction).
+    """
+    uid = claims.get("uid") or claims.get("sub")
+    if not uid:
+        raise HTTPException(
+            status_code=400,
+            detail="Missing uid in token; cannot uniquely identify user",
+        )
+
+    try:
+        db = get_db()
+        slot_ref = db.collection(COLLECTION).document(room_id)
+        snap = slot_ref.get()
+        if not snap.exists:
+            raise HTTPException(status_code=404, detail="Room slot not found")
+
+        slot_data = snap.to_dict() or {}
+        slot_date = slot_data.get("date", "")
+
+        now = datetime.now(TZ) if TZ else datetime.now(timezone.utc)
+        slot_end = _slot_end_datetime(slot_data)
+        if slot_date != now.strftime("%Y-%m-%d") or (slot_end and slot_end <= now):
+            raise HTTPException(status_code=400, detail="Can only check in to a slot that is available today")
+
+        expire_at = now + timedelta(minutes=CHECKIN_MAX_MINUTES)
+        if slot_end and slot_end < expire_at:
+            expire_at = slot_end
+
+        presence_ref = db.collection(CHECKINS_COLLECTION).document(uid)
+        # cached totals, read before our own increment lands; the transaction
+        # returns the exact count instead when it has a capacity to enforce
+        counts = counters.counts_for_date(db, slot_date)
+        cached_occupancy = counters.slot_count(
+            counts, room_id, counters.CURRENT_CHECKINS, slot_data.get("currentCheckins", 0)
+        )
+        counted, previous, occupancy = _checkin_transaction(
+            db.transaction(), presence_ref, slot_ref, slot_date, expire_at
+        )
+        if occupancy is None:
+            occupancy = cached_occupancy
+
+        if previous:
+            counters.apply_local_delta(previous[1], previous[0], counters.CURRENT_CHECKINS, -1)
+        if counted:
+            counters.apply_local_delta(slot_date, room_id, counters.CURRENT_CHECKINS, 1)
+            occupancy += 1
 
         log.info(
-            "reset_locked_reports: DONE, slotsReset=%d, userVotesCleared=%d",
-            total_slots,
-            total_votes,
+            "checkin: room_id=%s uid=%s counted=%s movedFrom=%s occupancy=%d",
+            room_id,
+            uid,
+            counted,
+            previous[0] if previous else None,
+            occupancy,
         )
         return {
-            "status": "ok",
-            "slotsReset": total_slots,
-            "userVotesCleared": total_votes,
+            "currentCheckins": occupancy,
+            "checkedIn": True,
+            "expireAt": expire_at.isoformat(),
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
-        log.exception("reset_locked_reports: FAILED: %s", e)
+        log.exception("checkin failed for room_id=%s uid=%s: %s", room_id, uid, e)
         raise HTTPException(
             status_code=500,
-            detail=f"reset_locked_reports failed: {type(e).__name__}: {e}",
+            detail=f"checkin failed: {type(e).__name__}: {e}",
+        )
+
+
+@router.post("/{room_id}/checkout")
+def checkout(
+    room_id: str,
+    claims: dict = Depends(verify_firebase_token),
+):
+    """
+    Check the current user out of an availability slot.
+    Idempotent: checking out of a slot you are not in is a no-op.
+    """
+    uid = claims.get("uid") or claims.get("sub")
+    if not uid:
+        raise HTTPException(
+            status_code=400,
+            detail="Missing uid in token; cannot uniquely identify user",
+        )
+
+    try:
+        db = get_db()
+        slot_ref = db.collection(COLLECTION).document(room_id)
+        presence_ref = db.collection(CHECKINS_COLLECTION).document(uid)
+
+        slot_date = _checkout_transaction(db.transaction(), presence_ref, slot_ref)
+        if slot_date is not None:
+            counters.apply_local_delta(slot_date, room_id, counters.CURRENT_CHECKINS, -1)
+
+        log.info("checkout: room_id=%s uid=%s released=%s", room_id, uid, slot_date is not None)
+        return {"checkedIn": False}
+
+    except Exception as e:
+        log.exception("checkout failed for room_id=%s uid=%s: %s", room_id, uid, e)
+        raise HTTPException(
+            status_code=500,
+            detail=f"checkout failed: {type(e).__name__}: {e}",
+        )
+
+
+@router.post("/admin/expire_checkins")
+def expire_checkins(claims: dict = Depends(require_admin)):
+    """
+    Release check-ins whose expireAt has passed and decrement their slot's
+    occupancy. Intended for Cloud Scheduler every few minutes; admins and
+    allowed service accounts only (auth.require_admin).
+
+    Do NOT put a Firestore TTL policy on checkins.expireAt: TTL deletes would
+    skip the decrement. Each delete is conditioned on the doc's update time,
+    so a user re-checking in concurrently is not released by mistake.
+    """
+    try:
+        db = get_db()
+        col = db.collection(CHECKINS_COLLECTION)
+        slots_col = db.collection(COLLECTION)
+        now = datetime.now(timezone.utc)
+
+        # 2 writes per check-in (delete + shard decrement), 500 ops per batch
+        BATCH_SIZE = 250
+        total = 0
+        while True:
+            docs = list(col.where("expireAt", "<=", now).limit(BATCH_SIZE).stream())
+            if not docs:
+                break
+
+            batch = db.batch()
+            for d in docs:
+                data = d.to_dict() or {}
+                batch.delete(d.reference, option=db.write_option(last_update_time=d.update_time))
+                slot_ref = slots_col.document(data.get("slotId", ""))
+                counters.add_increment(batch, slot_ref, data.get("date", ""), counters.CURRENT_CHECKINS, -1)
+            try:
+                batch.commit()
+            except FailedPrecondition:
+                # someone re-checked in while we were sweeping; re-query
+                continue
+            total += len(docs)
+
+        if total:
+            counters.invalidate()
+
+        log.info("expire_checkins: released=%d", total)
+        return {"status": "ok", "checkinsExpired": total}
+
+    except Exception as e:
+        log.exception("expire_checkins: FAILED: %s", e)
+        raise HTTPException(
+            status_code=500,
+            detail=f"expire_checkins failed: {type(e).__name__}: {e}",
         )
@@ -0,0 +1,89 @@
+# apply_calendar_exceptions.py — re-run only the dates a calendar edit changes
+#
+# After editing calendar_exceptions.json (a new closure, a finals week, ...):
+#
+#   python apply_calendar_exceptions.py            # regenerate the changed dates
+#   python apply_calendar_exceptions.py --upload   # ...and replace their slot docs in Firestore
+#
+# Compares calendar_exceptions.json with calendar_exceptions.applied.json (the
+# calendar the local artifacts reflect) and, with --upload, with
+# calendar_exceptions.uploaded.json (the calendar Firestore reflects). For the
+# dates whose rule changed it rebuilds busy/free from cleaned_classes.jsonl (no
+# scraping), swaps those dates' records in out_busy, out_availability and
+# availability_slots, writes their slot docs to availability_slots.changed.*
+# and replaces their per-day snapshots (removing the snapshot of a date that is
+# now closed). The uploaded calendar is only recorded after the upload succeeds.
+import argparse
+import os
+import sys
+
+import artifacts
+import stream_io
+from csulb_scraper import (
+    CAMPUS_OPEN, CLEANED_CLASSES_FILE, UPLOADED_CALENDAR_FILE, SlotStage, availability_record,
+    build_daily_busy_and_free, busy_record, load_calendar_exceptions, load_campus_hours,
+    load_saved_calendar, room_days, save_applied_calendar,
+)
+
+def main():
+    parser = argparse.ArgumentParser(description="Regenerate the dates changed by calendar_exceptions.json")
+    parser.add_argument("--upload", action="store_true", help="replace those dates' availabilitySlots docs")
+    args = parser.parse_args()
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    cleaned_path = os.path.join(here, CLEANED_CLASSES_FILE)
+    if not os.path.exists(cleaned_path):
+        sys.exit(f"{CLEANED_CLASSES_FILE} not found; run csulb_scraper.py once first.")
+
+    calendar = load_calendar_exceptions()
+    changed = calendar.changed_dates(load_saved_calendar(here))
+    if args.upload:
+        # also dates changed since the last upload (e.g. an earlier run without --upload)
+        changed |= calendar.changed_dates(load_saved_calendar(here, UPLOADED_CALENDAR_FILE))
+    if not changed:
+        print("✅ Calendar unchanged since the last run; nothing to regenerate.")
+        return
+
+    cleaned_classes = list(stream_io.iter_jsonl(cleaned_path))
+    hours = load_campus_hours()
+    per_day = build_daily_busy_and_free(cleaned_classes, campus_open=CAMPUS_OPEN, hours=hours,
+                                        calendar=calendar, only_dates=changed)
+
+    busy, availability = [], []
+    with SlotStage(here, stem="availability_slots.changed") as slots:
+        for room, date, data, open_hours in room_days(per_day, hours, calendar):
+            busy.append(busy_record(room, date, data))
+            if open_hours:
+                availability.append(availability_record(room, date, data, open_hours))
+                slots.add(room, date, data["free"])
+    # dates that no longer have any slot (now closed) keep no stale snapshot
+    for date in changed - slots.snapshot_paths.keys():
+        stale = os.path.join(slots.snapshot_dir, artifacts.snapshot_file_name(date))
+        if os.path.exists(stale):
+            os.remove(stale)
+
+    print(f"✅ Regenerated {len(changed)} changed dates: {', '.join(sorted(changed))}")
+    print(f"   - Wrote {slots.count} slot docs to {slots.path}")
+    print(f"   - Replaced {len(slots.snapshot_paths)} daily slot snapshots in {slots.snapshot_dir}")
+
+    # Swap the changed dates in the full artifacts too, so a later full upload
+    # or generate_availability_slots.py run doesn't bring the old dates back.
+    for stem, kind, records in (
+        ("out_busy", "busy", busy),
+        ("out_availability", "availability", availability),
+        ("availability_slots", "slots", artifacts.read_records(slots.path)),
+    ):
+        path = artifacts.find_artifact(here, stem)
+        n = artifacts.replace_dates(path, kind, changed, records)
+        print(f"   - Rewrote {path} ({n} records)")
+    save_applied_calendar(here)
+
+    if args.upload:
+        from firestore_upload_availability_slots import upload_slots
+        upload_slots(slots.path, replace_dates=changed)
+        save_applied_calendar(here, name=UPLOADED_CALENDAR_FILE)
+    else:
+        print("   - Firestore not updated; run with --upload to replace these dates' slot docs")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,418 @@
+# artifacts.py — read/write the pipeline's intermediate files as JSONL or columnar
+#
+# out_busy / out_availability / availability_slots are JSONL by default. With
+# ARTIFACT_FORMAT=columnar they're written as ".cols" files instead:
+#   - roomId, date, buildingCode, ... dictionary-encoded (string table + int codes)
+#   - "HH:MM" times and interval lists stored as integer minutes
+#   - each column one little-endian typed array (stdlib `array`, no numpy)
+# Readers go by extension, so every stage accepts either. JSONL goes through
+# stream_io (orjson when installed, 1 MiB buffers).
+#
+# .cols is a size format (about 10x smaller). Loading whole records costs
+# about the same as orjson JSONL, since either way every dict is built in
+# Python. Reading only some fields (read_column_lists / iter_column) is
+# where .cols is faster: the other columns are never decoded.
+#
+#   python artifacts.py out_availability.jsonl out_availability.cols   # convert
+#   python artifacts.py out_availability.cols out_availability.jsonl   # and back
+#
+# File layout: MAGIC, uint32 header length, JSON header, then the column
+# buffers, each 8-byte aligned at the offset the header gives.
+#
+# SlotSnapshotWriter (bottom) writes the per-day slots-<date>.snap files the
+# API mmaps; that layout is documented in backend/services/slot_snapshot.py.
+import array
+import json
+import os
+import struct
+import sys
+from typing import Iterable, Iterator
+
+import stream_io
+
+MAGIC = b"SBCOLS1\n"
+JSONL, COLUMNAR = ".jsonl", ".cols"
+ARTIFACT_FORMAT = os.getenv("ARTIFACT_FORMAT", "jsonl").lower()
+_INT_CODES = ("b", "h", "i", "q")
+
+# field -> codec, in the field order the JSONL writers use
+SCHEMAS = {
+    "busy": [
+        ("roomId", "str"), ("date", "str"), ("intervals", "intervals"),
+        ("buildingCode", "str"), ("roomNumber", "str"), ("floor", "int"), ("campusZone", "str"),
+    ],
+    "availability": [
+        ("roomId", "str"), ("date", "str"), ("campusOpen", "window"), ("free", "intervals"),
+        ("buildingCode", "str"), ("roomNumber", "str"), ("floor", "int"), ("campusZone", "str"),
+    ],
+    "slots": [
+        ("roomId", "str"), ("buildingCode", "str"), ("roomNumber", "str"), ("floor", "int"),
+        ("campusZone", "str"), ("date", "str"), ("currentCheckins", "int"),
+        ("start", "hhmm"), ("end", "hhmm"), ("startMin", "int"), ("endMin", "int"), ("durationMin", "int"),
+    ],
+}
+
+
+def artifact_path(directory: str, stem: str, fmt: str = None) -> str:
+    """Where to write `stem` in the configured format."""
+    ext = COLUMNAR if (fmt or ARTIFACT_FORMAT) == "columnar" else JSONL
+    return os.path.join(directory, stem + ext)
+
+
+def find_artifact(directory: str, stem: str) -> str:
+    """Existing `stem` file, configured format first; the configured path if neither exists."""
+    preferred = artifact_path(directory, stem)
+    other = os.path.join(directory, stem + (JSONL if preferred.endswith(COLUMNAR) else COLUMNAR))
+    return preferred if os.path.exists(preferred) or not os.path.exists(other) else other
+
+
+def kind_of(record: dict) -> str:
+    if "free" in record:
+        return "availability"
+    if "intervals" in record:
+        return "busy"
+    if "startMin" in record:
+        return "slots"
+    raise ValueError(f"Unrecognized artifact record: {sorted(record)}")
+
+
+# ---------- minutes <-> 'HH:MM' ----------
+def _to_min(hhmm: str) -> int:
+    h, m = int(hhmm[:2]), int(hhmm[3:])
+    if len(hhmm) != 5 or hhmm[2] != ":" or f"{h:02d}:{m:02d}" != hhmm:
+        raise ValueError(f"Not an 'HH:MM' time: {hhmm!r}")
+    return h * 60 + m
+
+
+_HHMM = [f"{m // 60:02d}:{m % 60:02d}" for m in range(24 * 60 + 1)]
+
+
+# ---------- typed column buffers ----------
+def _int_array(values) -> array.array:
+    """Smallest signed typed array that holds `values`."""
+    lo, hi = (min(values), max(values)) if values else (0, 0)
+    for code in _INT_CODES:
+        bits = 8 * array.array(code).itemsize
+        if -(1 << (bits - 1)) <= lo and hi < (1 << (bits - 1)):
+            return array.array(code, values)
+    raise OverflowError(f"Column values out of range: {lo}..{hi}")
+
+
+class _Encoder:
+    """Accumulates one column per schema field, then lays out the file."""
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        self.schema = SCHEMAS[kind]
+        self.rows = 0
+        self.cols = {}
+        for name, codec in self.schema:
+            if codec == "str":
+                self.cols[name] = ({}, [])          # value -> code, codes
+            elif codec == "intervals":
+                self.cols[name] = ([0], [], [])     # offsets, starts, ends
+            elif codec == "window":
+                self.cols[name] = ([], [])          # starts, ends
+            else:
+                self.cols[name] = []                # ints / minutes (None allowed for "int")
+
+    def add(self, rec: dict):
+        for name, codec in self.schema:
+            v, col = rec[name], self.cols[name]
+            if codec == "str":
+                col[1].append(col[0].setdefault(v, len(col[0])))
+            elif codec == "intervals":
+                for iv in v:
+                    col[1].append(_to_min(iv["start"]))
+                    col[2].append(_to_min(iv["end"]))
+                col[0].append(len(col[1]))
+            elif codec == "window":
+                col[0].append(_to_min(v["start"]))
+                col[1].append(_to_min(v["end"]))
+            elif codec == "hhmm":
+                col.append(_to_min(v))
+            else:
+                col.append(v)
+        self.rows += 1
+
+    def _buffers(self):
+        """(header columns, [(name, array)]) with nullable ints given a sentinel."""
+        columns, buffers = {}, []
+        for name, codec in self.schema:
+            col, meta = self.cols[name], {"codec": codec}
+            if codec == "str":
+                meta["dict"] = list(col[0])
+                parts = {"codes": col[1]}
+            elif codec == "intervals":
+                parts = {"offsets": col[0], "start": col[1], "end": col[2]}
+            elif codec == "window":
+                parts = {"start": col[0], "end": col[1]}
+            else:
+                present = [x for x in col if x is not None]
+                if len(present) != len(col):
+                    meta["null"] = min(present, default=0) - 1
+                    col = [meta["null"] if x is None else x for x in col]
+                parts = {"values": col}
+            meta["buffers"] = {}
+            for part, values in parts.items():
+                meta["buffers"][part] = len(buffers)
+                buffers.append(_int_array(values))
+            columns[name] = meta
+        return columns, buffers
+
+    def write(self, path: str):
+        columns, buffers = self._buffers()
+        # offsets depend on the header's own length; lay out twice until it settles
+        header, offsets = b"", []
+        while True:
+            pos = _align(len(MAGIC) + 4 + len(header))
+            offsets = []
+            for buf in buffers:
+                offsets.append([pos, buf.typecode, len(buf)])
+                pos = _align(pos + len(buf) * buf.itemsize)
+            new = json.dumps({"kind": self.kind, "rows": self.rows, "columns": columns, "arrays": offsets},
+                             separators=(",", ":")).encode()
+            settled, header = len(new) == len(header), new
+            if settled:
+                break
+        with open(path, "wb") as f:
+            f.write(MAGIC + struct.pack("<I", len(header)) + header)
+            for buf, (off, _, _) in zip(buffers, offsets):
+                f.write(b"\0" * (off - f.tell()))
+                if sys.byteorder == "big":
+                    buf = array.array(buf.typecode, buf)
+                    buf.byteswap()
+                f.write(buf.tobytes())
+
+
+def _align(n: int) -> int:
+    return (n + 7) & ~7
+
+
+# ---------- reading ----------
+def read_columns(path: str):
+    """(header, [array per buffer]) of a .cols file."""
+    with open(path, "rb") as f:
+        data = f.read()
+    if data[:len(MAGIC)] != MAGIC:
+        raise ValueError(f"{path}: not a columnar artifact")
+    (n,) = struct.unpack_from("<I", data, len(MAGIC))
+    header = json.loads(data[len(MAGIC) + 4:len(MAGIC) + 4 + n])
+    arrays = []
+    for off, code, count in header["arrays"]:
+        a = array.array(code)
+        a.frombytes(data[off:off + count * a.itemsize])
+        if sys.byteorder == "big":
+            a.byteswap()
+        arrays.append(a)
+    return header, arrays
+
+
+def _decode_column(meta: dict, arrays: list) -> list:
+    """One column of a .cols file as Python values, decoded in a single pass."""
+    codec, bufs = meta["codec"], {k: arrays[i] for k, i in meta["buffers"].items()}
+    if codec == "str":
+        return list(map(meta["dict"].__getitem__, bufs["codes"]))
+    if codec == "intervals":
+        o = bufs["offsets"]
+        st, en = map(_HHMM.__getitem__, bufs["start"]), map(_HHMM.__getitem__, bufs["end"])
+        flat = [{"start": s, "end": e} for s, e in zip(st, en)]
+        return [flat[o[i]:o[i + 1]] for i in range(len(o) - 1)]
+    if codec == "window":
+        st, en = map(_HHMM.__getitem__, bufs["start"]), map(_HHMM.__getitem__, bufs["end"])
+        return [{"start": s, "end": e} for s, e in zip(st, en)]
+    if codec == "hhmm":
+        return list(map(_HHMM.__getitem__, bufs["values"]))
+    if "null" in meta:
+        z = meta["null"]
+        return [None if v == z else v for v in bufs["values"]]
+    return bufs["values"].tolist()
+
+
+def read_column_lists(path: str, names: Iterable[str] = None) -> dict:
+    """
+    {field: [value per row]} of a .cols file, optionally only `names`. Each
+    column is decoded in one pass and no per-row dicts are built, so this is
+    the fast way to read a .cols file when only some fields are needed.
+    """
+    header, arrays = read_columns(path)
+    wanted = header["columns"] if names is None else {n: header["columns"][n] for n in names}
+    return {name: _decode_column(meta, arrays) for name, meta in wanted.items()}
+
+
+def iter_column(path: str, name: str) -> Iterator:
+    """One field's values of a .jsonl or .cols artifact, in file order."""
+    if path.endswith(COLUMNAR):
+        return iter(read_column_lists(path, [name])[name])
+    return (rec.get(name) for rec in read_records(path))
+
+
+def _iter_columnar(path: str) -> Iterator[dict]:
+    columns = read_column_lists(path)
+    names = tuple(columns)
+    for row in zip(*columns.values()):
+        yield dict(zip(names, row))
+
+
+def read_records(path: str) -> Iterator[dict]:
+    """Records of a .jsonl or .cols artifact, in file order."""
+    if path.endswith(COLUMNAR):
+        yield from _iter_columnar(path)
+        return
+    yield from stream_io.iter_jsonl(path)
+
+
+class ArtifactWriter:
+    """
+    with ArtifactWriter(path) as w: w.write(rec) ...
+    JSONL is written as it goes; columnar columns are built in memory and
+    laid out on close. `kind` defaults to the first record's.
+    """
+
+    def __init__(self, path: str, kind: str = None):
+        self.path, self.kind, self.count = path, kind, 0
+        self._enc = None
+        self._f = None if path.endswith(COLUMNAR) else stream_io.JsonlWriter(path)
+
+    def write(self, rec: dict):
+        if self._f is not None:
+            self._f.write(rec)
+        else:
+            if self._enc is None:
+                self._enc = _Encoder(self.kind or kind_of(rec))
+            self._enc.add(rec)
+        self.count += 1
+
+    def close(self):
+        if self._f is not None:
+            self._f.close()
+        else:
+            (self._enc or _Encoder(self.kind or "slots")).write(self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *_):
+        if exc_type is None:
+            self.close()
+        elif self._f is not None:
+            self._f.close()
+
+
+def write_records(path: str, records: Iterable[dict], kind: str = None) -> int:
+    """Write records as .jsonl or .cols (by extension); returns the count."""
+    with ArtifactWriter(path, kind) as w:
+        for rec in records:
+            w.write(rec)
+    return w.count
+
+
+def replace_dates(path: str, kind: str, dates, records: Iterable[dict]) -> int:
+    """
+    Rewrite the artifact at `path` with every record on `dates` replaced by
+    `records` (streamed; atomic via a temp file). Returns the record count.
+    """
+    ext = COLUMNAR if path.endswith(COLUMNAR) else JSONL
+    tmp = path[:-len(ext)] + ".tmp" + ext
+    with ArtifactWriter(tmp, kind) as w:
+        if os.path.exists(path):
+            for rec in read_records(path):
+                if rec["date"] not in dates:
+                    w.write(rec)
+        for rec in records:
+            w.write(rec)
+    os.replace(tmp, path)
+    return w.count
+
+
+# ---------- per-day slot snapshots (read by backend/services/slot_snapshot.py) ----------
+SNAPSHOT_MAGIC = b"SBSLOTS2"
+SNAPSHOT_FLOOR_NONE = -32768
+SNAPSHOT_CAPACITY_NONE = -1
+
+
+def snapshot_file_name(date: str) -> str:
+    return f"slots-{date}.snap"
+
+
+class SlotSnapshotWriter:
+    """
+    Collects slot records and writes one fixed-width slots-<date>.snap per
+    date. Layout is documented in backend/services/slot_snapshot.py.
+    """
+
+    def __init__(self):
+        # date -> [(startMin, roomId, endMin, room fields, (locked_reports, currentCheckins, capacity))]
+        self.days = {}
+
+    def add(self, slot: dict):
+        room = (slot["roomId"], slot["buildingCode"], slot["roomNumber"], slot["campusZone"] or "", slot["floor"])
+        values = (slot.get("locked_reports") or 0, slot.get("currentCheckins") or 0, slot.get("capacity"))
+        self.days.setdefault(slot["date"], []).append((slot["startMin"], slot["roomId"], slot["endMin"], room, values))
+
+    def write(self, directory: str) -> dict:
+        """Write every date's file (atomically); returns {date: path}."""
+        os.makedirs(directory, exist_ok=True)
+        paths = {}
+        for date, slots in self.days.items():
+            path = os.path.join(directory, snapshot_file_name(date))
+            tmp = path + ".tmp"
+            with open(tmp, "wb") as f:
+                f.write(_snapshot_bytes(date, sorted(slots, key=lambda x: x[:2])))
+            os.replace(tmp, path)
+            paths[date] = path
+        return paths
+
+
+def _snapshot_bytes(date: str, slots: list) -> bytes:
+    strings, string_ids = [date], {date: 0}
+    rooms, room_ids = [], {}
+
+    def sid(value: str) -> int:
+        if value not in string_ids:
+            string_ids[value] = len(strings)
+            strings.append(value)
+        return string_ids[value]
+
+    slot_room = array.array("I")
+    for _, room_id, _, room, _ in slots:
+        if room_id not in room_ids:
+            room_ids[room_id] = len(rooms)
+            rooms.append(room)
+        slot_room.append(room_ids[room_id])
+    room_str = array.array("I", [sid(v) for r in rooms for v in r[:4]])
+    room_floor = array.array("h", [SNAPSHOT_FLOOR_NONE if r[4] is None else r[4] for r in rooms])
+
+    blobs = [s.encode("utf-8") for s in strings]
+    str_offsets = array.array("I", [0])
+    for b in blobs:
+        str_offsets.append(str_offsets[-1] + len(b))
+    blob = b"".join(blobs)
+
+    sections = [
+        slot_room,
+        array.array("H", [s[0] for s in slots]),
+        array.array("H", [s[2] for s in slots]),
+        array.array("i", [s[4][0] for s in slots]),
+        array.array("i", [s[4][1] for s in slots]),
+        array.array("i", [SNAPSHOT_CAPACITY_NONE if s[4][2] is None else s[4][2] for s in slots]),
+        room_str,
+        room_floor,
+        str_offsets,
+    ]
+    out = bytearray(SNAPSHOT_MAGIC + struct.pack("<4I", len(slots), len(rooms), len(strings), len(blob)))
+    for a in sections:
+        out += b"\0" * (_align(len(out)) - len(out))
+        if sys.byteorder == "big":
+            a.byteswap()
+        out += a.tobytes()
+    out += b"\0" * (_align(len(out)) - len(out))
+    return bytes(out + blob)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        sys.exit("usage: python artifacts.py <in.jsonl|in.cols> <out.jsonl|out.cols>")
+    src, dst = sys.argv[1:]
+    count = write_records(dst, read_records(src))
+    print(f"✅ {src} -> {dst}: {count} records, {os.path.getsize(src):,} -> {os.path.getsize(dst):,} bytes")
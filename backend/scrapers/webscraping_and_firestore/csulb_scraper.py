@@ -1,16 +1,28 @@
 # run the code below to activate the virtual enviroment to activate the dependencies
 # source .venv/bin/activate
 
-import requests
-from bs4 import BeautifulSoup
 from collections import defaultdict
 from datetime import datetime
+from functools import lru_cache
 import re as _re_from_norm
-from datetime import datetime as _dt_from_norm
 from datetime import timedelta
 import json
 import os
 
+import artifacts
+import stream_io
+
+
+def _http():
+    """
+    requests + BeautifulSoup, imported on first use: only the scrape_* steps
+    need them, the date/time helpers below can be imported without.
+    """
+    import requests
+    from bs4 import BeautifulSoup
+    return requests, BeautifulSoup
+
+
 # --- student-definition campus zone helper ---
 UPPER_STUDENT = {
     "AS","CINE","ED2","EED","FA1","FA2","FA3","FA4","FO2",
@@ -51,52 +63,95 @@ def _infer_floor(room_number: str):
 
 DAY_MAP = {"M":0, "Tu":1, "W":2, "Th":3, "F":4, "Sa":5, "Su":6}
 
-def expand_days_to_dates(start_date: str, end_date: str, days: list[str]) -> list[str]:
+@lru_cache(maxsize=1024)
+def _session_dates(start_date: str, end_date: str, weekdays: frozenset) -> tuple[str, ...]:
+    """
+    'YYYY-MM-DD' dates in [start_date, end_date] that fall on `weekdays`.
+    Memoized: a schedule has a handful of sessions x day codes, shared by
+    thousands of rows.
+    """
     start = datetime.strptime(start_date, "%b %d,%Y")
     end   = datetime.strptime(end_date,   "%b %d,%Y")
-    targets = {DAY_MAP[d] for d in days}
     out, cur = [], start
     one = timedelta(days=1)
     while cur <= end:
-        if cur.weekday() in targets:
+        if cur.weekday() in weekdays:
             out.append(cur.strftime("%Y-%m-%d"))
         cur += one
-    return out
+    return tuple(out)
 
-def build_daily_busy_and_free(rows: list[dict], campus_open=("07:00","22:00")):
-    # explode to daily busy rows
-    daily = []
-    for row in rows:
-        room_id = f"{row['building_code']}-{row['room']}"
-        for d in expand_days_to_dates(row['start_date'], row['end_date'], row['days']):
-            daily.append({"roomId": room_id, "date": d, "start": row["start_time"], "end": row["end_time"]})
+def expand_days_to_dates(start_date: str, end_date: str, days: list[str]) -> list[str]:
+    return list(_session_dates(start_date, end_date, frozenset(DAY_MAP[d] for d in days)))
 
-    # group by (roomId, date)
+def build_daily_busy_and_free(rows: list[dict], campus_open=("07:00","22:00"), hours=None,
+                              calendar=None, only_dates=None):
+    """
+    {(roomId, date): {"busy", "free"}}. Free time is clipped to `campus_open`,
+    or with `hours` (CampusHours) to that building's hours for the weekday;
+    a closed day gets no free windows. `calendar` (CalendarExceptions) drops
+    closed dates and cancelled class meetings; `only_dates` limits the
+    output to those dates.
+    """
+    # group busy intervals by (roomId, date); one interval dict per class row,
+    # shared by every date it meets on (validate_and_merge only reads them)
     grouped = defaultdict(list)
-    for r in daily:
-        grouped[(r["roomId"], r["date"])].append({"start": r["start"], "end": r["end"]})
+    room_codes = {}
+    for row in rows:
+        room_id = f"{row['building_code']}-{row['room']}"
+        room_codes[room_id] = row['building_code']
+        interval = {"start": row["start_time"], "end": row["end_time"]}
+        weekdays = frozenset(DAY_MAP[d] for d in row['days'])
+        for d in _session_dates(row['start_date'], row['end_date'], weekdays):
+            if only_dates is not None and d not in only_dates:
+                continue
+            if calendar:
+                if calendar.is_closed(d):
+                    continue
+                if not calendar.classes_meet(d):
+                    grouped[(room_id, d)]  # room still listed, free all day
+                    continue
+            grouped[(room_id, d)].append(interval)
 
     # validate/merge busy, then invert to free (clipped)
     result = {}
     for (roomId, date), intervals in grouped.items():
         busy = validate_and_merge(intervals)  # filters end<=start, merges overlaps
-        free = invert_busy_to_free(busy, campus_open[0], campus_open[1])
+        open_hours = day_hours(room_codes[roomId], date, campus_open, hours, calendar)
+        free = invert_busy_to_free(busy, open_hours[0], open_hours[1]) if open_hours else []
         result[(roomId, date)] = {"busy": busy, "free": free}
     return result
 
+# --- time parsing: precompiled patterns + 12h->24h lookup table ---
+_TIME_TOKEN_RE = _re_from_norm.compile(r'(\d{1,2})(?::(\d{2}))?(AM|PM)')
+_TIME_RANGE_RE = _re_from_norm.compile(r'(\d{1,2}(?::\d{2})?)(AM|PM)?-(\d{1,2}(?::\d{2})?)(AM|PM)')
+# (suffix, 12h hour) -> 24h hour
+_HOUR_24 = {(sfx, h): (h % 12) + (12 if sfx == "PM" else 0) for sfx in ("AM", "PM") for h in range(1, 13)}
+
+
+def _clock_24(hh: int, mm: str, ampm: str, raw: str) -> str:
+    """12h clock parts -> 'HH:MM'; same range checks as strptime('%I:%M%p')."""
+    h24 = _HOUR_24.get((ampm, hh))
+    if h24 is None or len(mm) != 2 or int(mm) > 59:
+        raise ValueError(f"Bad time token: {raw!r}")
+    return f"{h24:02d}:{mm}"
+
+
 def _to_24_for_norm(hhmm_ampm: str) -> str:
     """
     Accepts 'H[H][:MM]AM/PM' (minutes optional) and returns 'HH:MM' 24h.
     Examples: '8AM' -> '08:00', '9:50PM' -> '21:50'
     """
     s = hhmm_ampm.strip().upper()
-    m = _re_from_norm.fullmatch(r'(\d{1,2})(?::(\d{2}))?(AM|PM)', s)
+    m = _TIME_TOKEN_RE.fullmatch(s)
     if not m:
         raise ValueError(f"Bad time token: {hhmm_ampm!r}")
-    hh = int(m.group(1))
-    mm = m.group(2) or "00"
-    ampm = m.group(3)
-    return _dt_from_norm.strptime(f"{hh:02d}:{mm}{ampm}", "%I:%M%p").strftime("%H:%M")
+    return _clock_24(int(m.group(1)), m.group(2) or "00", m.group(3), hhmm_ampm)
+
+
+def _token_24(token: str, ampm: str) -> str:
+    """'9' / '9:50' (already matched by _TIME_RANGE_RE) + suffix -> 'HH:MM'."""
+    hh, _, mm = token.partition(":")
+    return _clock_24(int(hh), mm or "00", ampm, token + ampm)
 
 def _mins(hhmm: str) -> int:
     h, m = map(int, hhmm.split(":"))
@@ -162,6 +217,7 @@ def invert_busy_to_free(busy: list[dict], open_start="07:00", open_end="22:00")
         free.append({"start": _from_mins(cur), "end": _from_mins(ce)})
     return free
 
+@lru_cache(maxsize=8192)
 def normalize_time_range(raw_range: str) -> tuple[str, str]:
     """
     Handles:
@@ -170,31 +226,23 @@ def normalize_time_range(raw_range: str) -> tuple[str, str]:
       - '8-9AM'
       - '9:30AM-10:45AM'
     Returns ('HH:MM','HH:MM') in 24h.
+
+    Memoized: a schedule has only a few hundred distinct ranges.
     """
     t = raw_range.strip().upper().replace(" ", "")
     # Allow minutes on either side (optional), AM/PM on start optional, end required
-    m = _re_from_norm.fullmatch(r'(\d{1,2}(?::\d{2})?)(AM|PM)?-(\d{1,2}(?::\d{2})?)(AM|PM)', t)
+    m = _TIME_RANGE_RE.fullmatch(t)
     if m:
         s, sfx_s, e, sfx_e = m.groups()
-        # Inherit end suffix if start missing
-        sfx_s = sfx_s or sfx_e
-        s24 = _to_24_for_norm(f"{s}{sfx_s}")
-        e24 = _to_24_for_norm(f"{e}{sfx_e}")
-        # If we inherited and start>=end (rare), flip the start's suffix once
-        if m.group(2) is None:
-            s_min = int(s24[:2]) * 60 + int(s24[3:])
-            e_min = int(e24[:2]) * 60 + int(e24[3:])
-            if s_min >= e_min:
-                sfx_s = "AM" if sfx_e == "PM" else "PM"
-                s24 = _to_24_for_norm(f"{s}{sfx_s}")
+        e24 = _token_24(e, sfx_e)
+        if sfx_s is not None:
+            return _token_24(s, sfx_s), e24
+        # Inherit end suffix; if that puts start at/after end (rare), flip it once
+        s24 = _token_24(s, sfx_e)
+        if s24 >= e24:
+            s24 = _token_24(s, "AM" if sfx_e == "PM" else "PM")
         return s24, e24
 
-    # Both have explicit suffixes? (covered above, but keep a clear path)
-    m2 = _re_from_norm.fullmatch(r'(\d{1,2}(?::\d{2})?)(AM|PM)-(\d{1,2}(?::\d{2})?)(AM|PM)', t)
-    if m2:
-        s, sfx_s, e, sfx_e = m2.groups()
-        return _to_24_for_norm(f"{s}{sfx_s}"), _to_24_for_norm(f"{e}{sfx_e}")
-
     # Last resort: no suffixes anywhere -> assume AM both sides and add :00 if needed
     if "-" in t:
         s, e = t.split("-", 1)
@@ -207,6 +255,7 @@ def normalize_time_range(raw_range: str) -> tuple[str, str]:
 base_url = "https://www.csulb.edu/"
 
 def scrape_building_codes_and_names() -> dict:
+    requests, BeautifulSoup = _http()
     url = "https://www.csulb.edu/maps/building-names-codes"
     r = requests.get(url)
     # raises an exception if the request fails
@@ -259,6 +308,7 @@ def scrape_building_codes_and_names() -> dict:
     return building_acronyms_and_names
 
 def scrape_subjects() -> dict:
+    requests, BeautifulSoup = _http()
     base_url = 'https://web.csulb.edu/depts/enrollment/registration/class_schedule/Fall_2025/By_Subject/'
     url = base_url + '#'
     r = requests.get(url)
@@ -281,6 +331,7 @@ def scrape_subjects() -> dict:
     return class_names_and_links
 
 def scrape_subject_links(class_links) -> list:
+    requests, BeautifulSoup = _http()
     classes = []
     for link in class_links:
         page = requests.get(link)
@@ -392,6 +443,281 @@ def clean_scraped_data(classes: list, building_map: dict) -> list:
 #         item['end_time']   = to_24hr(item['end_time'])
 #     return cleaned_classes
 
+# --- slot stage: free windows -> availabilitySlots docs ---
+# Campus hours free time is clipped to, and the shortest free window that
+# becomes a slot doc. CAMPUS_OPEN="HH:MM-HH:MM".
+CAMPUS_OPEN = tuple(os.getenv("CAMPUS_OPEN", "07:00-22:00").split("-", 1))
+MIN_SLOT_MINUTES = int(os.getenv("MIN_SLOT_MINUTES", "30"))
+
+# --- opening hours per building and weekday (campus_hours.json) ---
+_WEEKDAY_TOKENS = {v: k for k, v in DAY_MAP.items()}
+
+@lru_cache(maxsize=512)
+def _weekday_token(date: str) -> str:
+    return _WEEKDAY_TOKENS[datetime.strptime(date, "%Y-%m-%d").weekday()]
+
+def _parse_hours(value, where: str):
+    """'HH:MM-HH:MM' -> (open, close); None -> closed."""
+    if value is None:
+        return None
+    try:
+        start, end = (x.strip() for x in value.split("-", 1))
+        if _mins(end) <= _mins(start) or len(start) != 5 or len(end) != 5:
+            raise ValueError
+    except (AttributeError, ValueError):
+        raise ValueError(f"campus hours {where}: expected 'HH:MM-HH:MM' or null, got {value!r}")
+    return (start, end)
+
+class CampusHours:
+    """
+    Opening hours by building and weekday, from campus_hours.json:
+
+        {"default":   {"*": "07:00-22:00", "Sa": "07:00-17:00", "Su": null},
+         "buildings": {"FLD": {"*": null}, "LIB": {"Su": "10:00-18:00"}}}
+
+    Day keys are DAY_MAP tokens (M Tu W Th F Sa Su) or "*" for every day;
+    null means closed. A building's own entry wins, then "default", then
+    CAMPUS_OPEN.
+    """
+
+    def __init__(self, config: dict = None, fallback=CAMPUS_OPEN):
+        config = config or {}
+        def table(days: dict, where: str) -> dict:
+            for day in days:
+                if day != "*" and day not in DAY_MAP:
+                    raise ValueError(f"campus hours {where}: unknown day {day!r}")
+            return {day: _parse_hours(v, f"{where}.{day}") for day, v in days.items()}
+        self.default = table(config.get("default", {}), "default")
+        self.buildings = {
+            str(code).strip().upper(): table(days, str(code))
+            for code, days in config.get("buildings", {}).items()
+        }
+        self.fallback = tuple(fallback)
+        self._memo = {}
+
+    def for_day(self, bcode: str, date: str):
+        """(open, close) 'HH:MM' for a building on a 'YYYY-MM-DD' date, or None if closed."""
+        key = (bcode, _weekday_token(date))
+        if key not in self._memo:
+            own = self.buildings.get(bcode, {})
+            for days in (own, self.default):
+                if key[1] in days or "*" in days:
+                    self._memo[key] = days.get(key[1], days.get("*"))
+                    break
+            else:
+                self._memo[key] = self.fallback
+        return self._memo[key]
+
+def load_campus_hours(path: str = None) -> CampusHours:
+    """campus_hours.json next to this script (CAMPUS_HOURS_FILE overrides); CAMPUS_OPEN daily if absent."""
+    path = path or os.getenv("CAMPUS_HOURS_FILE") or os.path.join(os.path.dirname(__file__), "campus_hours.json")
+    if not os.path.exists(path):
+        return CampusHours()
+    with open(path, "r", encoding="utf-8") as f:
+        return CampusHours(json.load(f))
+
+# --- holidays, finals and other one-off dates (calendar_exceptions.json) ---
+_REGULAR = "regular"  # an exception that leaves the building hours alone
+
+class CalendarExceptions:
+    """
+    Per-date exceptions to the weekly schedule, from calendar_exceptions.json:
+
+        {"dates": {
+            "2025-11-27": "Thanksgiving",                      closed: no classes, no free time
+            "2025-11-26": {"note": "No classes", "classes": false},
+            "2025-12-11..2025-12-17": {"note": "Finals", "classes": false, "hours": "08:00-20:00"}}}
+
+    "classes": false drops that day's class meetings (rooms stay listed, free
+    all day); "hours" replaces every building's hours ("HH:MM-HH:MM", or null
+    for closed). Keys are dates or inclusive "start..end" ranges.
+    """
+
+    def __init__(self, config: dict = None):
+        # date -> (classes meet?, hours: (open, close) | None | _REGULAR)
+        self.days = {}
+        for key, entry in ((config or {}).get("dates") or {}).items():
+            if isinstance(entry, str) or entry is None:
+                entry = {"note": entry, "classes": False, "hours": None}
+            rule = (bool(entry.get("classes", True)),
+                    _parse_hours(entry["hours"], key) if "hours" in entry else _REGULAR)
+            for d in self._expand_key(key):
+                self.days[d] = rule
+
+    @staticmethod
+    def _expand_key(key: str) -> list[str]:
+        first, _, last = key.partition("..")
+        try:
+            start = datetime.strptime(first.strip(), "%Y-%m-%d")
+            end = datetime.strptime((last or first).strip(), "%Y-%m-%d")
+        except ValueError:
+            raise ValueError(f"calendar exceptions: bad date key {key!r} (YYYY-MM-DD or start..end)")
+        return [(start + timedelta(days=i)).strftime("%Y-%m-%d") for i in range((end - start).days + 1)]
+
+    def __bool__(self):
+        return bool(self.days)
+
+    def is_closed(self, date: str) -> bool:
+        rule = self.days.get(date)
+        return rule is not None and rule[1] is None
+
+    def classes_meet(self, date: str) -> bool:
+        rule = self.days.get(date)
+        return rule is None or rule[0]
+
+    def open_hours(self, date: str, regular):
+        rule = self.days.get(date)
+        return regular if rule is None or rule[1] == _REGULAR else rule[1]
+
+    def changed_dates(self, other: "CalendarExceptions") -> set[str]:
+        """Dates whose rule differs between two calendars (added, removed or edited)."""
+        return {d for d in self.days.keys() | other.days.keys() if self.days.get(d) != other.days.get(d)}
+
+def load_calendar_exceptions(path: str = None) -> CalendarExceptions:
+    """calendar_exceptions.json next to this script (CALENDAR_EXCEPTIONS_FILE overrides); none if absent."""
+    path = path or os.getenv("CALENDAR_EXCEPTIONS_FILE") or os.path.join(os.path.dirname(__file__), "calendar_exceptions.json")
+    if not os.path.exists(path):
+        return CalendarExceptions()
+    with open(path, "r", encoding="utf-8") as f:
+        return CalendarExceptions(json.load(f))
+
+def day_hours(bcode: str, date: str, campus_open=CAMPUS_OPEN, hours=None, calendar=None):
+    """(open, close) for a building on a date after hours + calendar exceptions, or None if closed."""
+    open_hours = hours.for_day(bcode, date) if hours else campus_open
+    return calendar.open_hours(date, open_hours) if calendar else open_hours
+
+def slots_for_free(room: dict, date: str, free: list[dict], min_free_minutes: int = MIN_SLOT_MINUTES) -> list[dict]:
+    """
+    Slot docs for one room's free windows on `date` (windows shorter than
+    min_free_minutes dropped). `room`: roomId, buildingCode, roomNumber,
+    floor, campusZone.
+    """
+    common = {
+        "roomId": room["roomId"],
+        "buildingCode": room["buildingCode"],
+        "roomNumber": room["roomNumber"],
+        "floor": room["floor"],
+        "campusZone": room["campusZone"],
+        "date": date,
+        "currentCheckins": 0,  # default value
+    }
+    slots = []
+    for iv in free:
+        s, e = iv["start"], iv["end"]
+        startMin, endMin = _mins(s), _mins(e)
+        duration = endMin - startMin
+        if duration < min_free_minutes:
+            continue  # drop short intervals
+        slots.append({
+            **common,
+            "start": s,
+            "end": e,
+            "startMin": startMin,
+            "endMin": endMin,
+            "durationMin": duration,
+        })
+    return slots
+
+class SlotStage:
+    """
+    Streams slot docs to availability_slots.{jsonl,cols} and collects the
+    per-day snapshots (artifacts.SlotSnapshotWriter) as free windows come in:
+
+        with SlotStage(here) as stage:
+            stage.add(room, date, free)
+    """
+
+    def __init__(self, directory: str, min_free_minutes: int = MIN_SLOT_MINUTES, stem: str = "availability_slots"):
+        self.min_free_minutes = min_free_minutes
+        self.path = artifacts.artifact_path(directory, stem)
+        # publish with: gsutil -m cp snapshots/*.snap gs://<bucket>/<prefix>/
+        self.snapshot_dir = os.getenv("SLOT_SNAPSHOT_DIR") or os.path.join(directory, "snapshots")
+        self.snapshot_paths = {}
+        self._out = artifacts.ArtifactWriter(self.path, "slots")
+        self._snapshots = artifacts.SlotSnapshotWriter()
+
+    @property
+    def count(self) -> int:
+        return self._out.count
+
+    def add(self, room: dict, date: str, free: list[dict]):
+        for slot in slots_for_free(room, date, free, self.min_free_minutes):
+            self._out.write(slot)
+            self._snapshots.add(slot)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        self._out.__exit__(exc_type, *exc)
+        if exc_type is None:
+            self.snapshot_paths = self._snapshots.write(self.snapshot_dir)
+
+CLEANED_CLASSES_FILE = "cleaned_classes.jsonl"
+# calendar the local artifacts reflect / the calendar Firestore's slot docs reflect
+APPLIED_CALENDAR_FILE = "calendar_exceptions.applied.json"
+UPLOADED_CALENDAR_FILE = "calendar_exceptions.uploaded.json"
+
+def room_days(per_day: dict, hours=None, calendar=None):
+    """(room fields, date, {"busy", "free"}, open hours or None) per (roomId, date)."""
+    for (roomId, date), data in per_day.items():
+        bcode, room_num = _split_room_id_for_floor(roomId)
+        room = {
+            "roomId": roomId,
+            "buildingCode": bcode,
+            "roomNumber": room_num,
+            "floor": _infer_floor(room_num),
+            "campusZone": _campus_zone_student(bcode),
+        }
+        yield room, date, data, day_hours(bcode, date, CAMPUS_OPEN, hours, calendar)
+
+def busy_record(room: dict, date: str, data: dict) -> dict:
+    """out_busy record for one room_days() item."""
+    return {
+        "roomId": room["roomId"],
+        "date": date,
+        "intervals": data["busy"],
+        "buildingCode": room["buildingCode"],
+        "roomNumber": room["roomNumber"],
+        "floor": room["floor"],
+        "campusZone": room["campusZone"]
+    }
+
+def availability_record(room: dict, date: str, data: dict, open_hours: tuple) -> dict:
+    """out_availability record for one room_days() item (open days only)."""
+    return {
+        "roomId": room["roomId"],
+        "date": date,
+        "campusOpen": {"start": open_hours[0], "end": open_hours[1]},
+        "free": data["free"],
+        "buildingCode": room["buildingCode"],
+        "roomNumber": room["roomNumber"],
+        "floor": room["floor"],
+        "campusZone": room["campusZone"]
+    }
+
+def save_applied_calendar(directory: str, path: str = None, name: str = APPLIED_CALENDAR_FILE):
+    """
+    Copy of the calendar this run's outputs reflect (to `name`: the local
+    artifacts, or UPLOADED_CALENDAR_FILE for Firestore), so the next calendar
+    edit can be applied to just the dates it changes.
+    """
+    path = path or os.getenv("CALENDAR_EXCEPTIONS_FILE") or os.path.join(os.path.dirname(__file__), "calendar_exceptions.json")
+    config = {}
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            config = json.load(f)
+    with open(os.path.join(directory, name), "w", encoding="utf-8") as f:
+        json.dump(config, f, indent=2)
+
+def load_saved_calendar(directory: str, name: str = APPLIED_CALENDAR_FILE) -> CalendarExceptions:
+    """A calendar saved by save_applied_calendar (empty if never saved)."""
+    path = os.path.join(directory, name)
+    if not os.path.exists(path):
+        return CalendarExceptions()
+    with open(path, "r", encoding="utf-8") as f:
+        return CalendarExceptions(json.load(f))
+
 def main():
     building_map   = scrape_building_codes_and_names()
     subject_links  = scrape_subjects()
@@ -413,49 +739,48 @@ def main():
         # --- write debug dump next to this script ---
     here = os.path.dirname(__file__)
     final_out_path = os.path.join(here, "final_output.txt")
-    out_busy_path = os.path.join(here, "out_busy.jsonl")
-    out_avail_path = os.path.join(here, "out_availability.jsonl")
+    # .jsonl, or .cols with ARTIFACT_FORMAT=columnar (see artifacts.py)
+    out_busy_path = artifacts.artifact_path(here, "out_busy")
+    out_avail_path = artifacts.artifact_path(here, "out_availability")
 
-    # Write cleaned classes summary
+    # Write cleaned classes summary, and a re-loadable copy for
+    # apply_calendar_exceptions.py (re-runs changed dates without scraping)
     with open(final_out_path, "w", encoding="utf-8") as f:
         for item in cleaned_classes:
             f.write(f"{item}\n")
+    with stream_io.JsonlWriter(os.path.join(here, CLEANED_CLASSES_FILE)) as f:
+        for item in cleaned_classes:
+            f.write(item)
 
     # Build per (roomId, date)
-    per_day = build_daily_busy_and_free(cleaned_classes, campus_open=("07:00", "22:00"))
-
-    # Write JSONL files relative to this script
-    with open(out_busy_path, "w", encoding="utf-8") as fb, open(out_avail_path, "w", encoding="utf-8") as fa:
-        for (roomId, date), data in per_day.items():
-            bcode, room_num = _split_room_id_for_floor(roomId)
-            floor = _infer_floor(room_num)
-            campusZone = _campus_zone_student(bcode)
-
-            fb.write(json.dumps({
-                "roomId": roomId,
-                "date": date,
-                "intervals": data["busy"],
-                "buildingCode": bcode,
-                "roomNumber": room_num,
-                "floor": floor,
-                "campusZone": campusZone
-            }) + "\n")
-
-            fa.write(json.dumps({
-                "roomId": roomId,
-                "date": date,
-                "campusOpen": {"start": "07:00", "end": "22:00"},
-                "free": data["free"],
-                "buildingCode": bcode,
-                "roomNumber": room_num,
-                "floor": floor,
-                "campusZone": campusZone
-            }) + "\n")
+    # Free time is clipped to each building's hours that weekday (campus_hours.json),
+    # holidays / cancelled-class days applied from calendar_exceptions.json
+    hours = load_campus_hours()
+    calendar = load_calendar_exceptions()
+    per_day = build_daily_busy_and_free(cleaned_classes, campus_open=CAMPUS_OPEN, hours=hours, calendar=calendar)
+
+    # Write busy/availability artifacts relative to this script, and slot docs
+    # straight from the in-memory free windows (no re-read of out_availability)
+    with artifacts.ArtifactWriter(out_busy_path, "busy") as fb, \
+            artifacts.ArtifactWriter(out_avail_path, "availability") as fa, \
+            SlotStage(here) as slots:
+        for room, date, data, open_hours in room_days(per_day, hours, calendar):
+            fb.write(busy_record(room, date, data))
+
+            # building closed that day: busy is kept, but there is nothing to offer
+            if not open_hours:
+                continue
+
+            fa.write(availability_record(room, date, data, open_hours))
+            slots.add(room, date, data["free"])
+    save_applied_calendar(here)
 
     print(f"✅ Scrape complete!")
     print(f"   - Wrote {len(cleaned_classes)} cleaned class entries to {final_out_path}")
     print(f"   - Wrote busy slots to {out_busy_path}")
     print(f"   - Wrote availability slots to {out_avail_path}")
+    print(f"   - Wrote {slots.count} slot docs (>= {slots.min_free_minutes} min) to {slots.path}")
+    print(f"   - Wrote {len(slots.snapshot_paths)} daily slot snapshots to {slots.snapshot_dir}")
 
 if __name__ == "__main__":
     main()
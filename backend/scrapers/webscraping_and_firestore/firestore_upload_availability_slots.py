@@ -1,29 +1,45 @@
 from google.cloud import firestore
-import json
-import os
-import time
+import artifacts
+import stream_io
 
-def upload_slots(jsonl_path="availability_slots.jsonl", batch_size=500):
-    db = firestore.Client()
-    batch = db.batch()
-    count = 0
-    with open(jsonl_path, "r", encoding="utf-8") as f:
-        for line in f:
-            obj = json.loads(line)
-            # unique, deterministic doc ID
-            doc_id = f'{obj["roomId"]}_{obj["date"]}_{obj["startMin"]}_{obj["endMin"]}'
-            ref = db.collection("availabilitySlots").document(doc_id)
-            batch.set(ref, obj)
-            count += 1
-            if count % batch_size == 0:
-                batch.commit()
-                print(f"Committed {count} docs so far...")
-                batch = db.batch()
-                # time.sleep(0.1)
+def _slot_doc_id(obj: dict) -> str:
+    # unique, deterministic doc ID
+    return f'{obj["roomId"]}_{obj["date"]}_{obj["startMin"]}_{obj["endMin"]}'
+
+def delete_stale_slots(db, dates, keep_ids: set, batch_size=500) -> int:
+    """Delete slot docs on `dates` whose id isn't in keep_ids (e.g. a day that is now closed)."""
+    def deletes():
+        for date in sorted(dates):
+            q = db.collection("availabilitySlots").where("date", "==", date).select([])
+            for snap in q.stream():
+                if snap.id not in keep_ids:
+                    yield snap.reference, None, False
+    n = stream_io.commit_in_batches(db, deletes(), batch_size)
+    print(f"Deleted {n} stale slot docs on {len(dates)} dates.")
+    return n
 
-    if count % batch_size != 0:
-        batch.commit()
-        print(f"Final commit: {count} total docs uploaded.")
+def upload_slots(jsonl_path="availability_slots.jsonl", batch_size=500, replace_dates=None):
+    """
+    .jsonl or .cols (see artifacts.py). With replace_dates, slot docs on those
+    dates that the file no longer has are deleted first. Records are streamed
+    into the batches, so memory doesn't grow with the file.
+    """
+    db = firestore.Client()
+    if replace_dates:
+        keep_ids = {_slot_doc_id(obj) for obj in artifacts.read_records(jsonl_path)
+                    if obj["date"] in replace_dates}
+        delete_stale_slots(db, replace_dates, keep_ids, batch_size)
+    slots = db.collection("availabilitySlots")
+    writes = ((slots.document(_slot_doc_id(obj)), obj, False) for obj in artifacts.read_records(jsonl_path))
+    count = stream_io.commit_in_batches(db, writes, batch_size,
+                                        on_commit=lambda n: print(f"Committed {n} docs so far..."))
+    print(f"Final commit: {count} total docs uploaded.")
 
 if __name__ == "__main__":
-    upload_slots()
+    from csulb_scraper import APPLIED_CALENDAR_FILE, UPLOADED_CALENDAR_FILE, load_saved_calendar, save_applied_calendar
+
+    # the file reflects the applied calendar; dates whose rule changed since
+    # the last upload may still hold docs the file no longer has
+    changed = load_saved_calendar(".").changed_dates(load_saved_calendar(".", UPLOADED_CALENDAR_FILE))
+    upload_slots(artifacts.find_artifact(".", "availability_slots"), replace_dates=changed)
+    save_applied_calendar(".", path=APPLIED_CALENDAR_FILE, name=UPLOADED_CALENDAR_FILE)
@@ -4,9 +4,13 @@ from typing import Dict, Iterable, Tuple, Set
 from google.cloud import firestore
 from google.api_core import exceptions as gex
 
+import artifacts
+import stream_io
+
 # ---------- INPUT FILES ----------
-BUSY_JSONL  = "out_busy.jsonl"
-FREE_JSONL  = "out_availability.jsonl"
+# .jsonl, or .cols when that's what the scraper wrote (ARTIFACT_FORMAT=columnar)
+BUSY_JSONL  = artifacts.find_artifact(".", "out_busy")
+FREE_JSONL  = artifacts.find_artifact(".", "out_availability")
 OVERRIDES   = "overrides_buildings.json"      # optional
 BUILDING_MAP_FILE = "building_codes.json"     # your 48 finalized names
 
@@ -54,21 +58,15 @@ def _commit_with_backoff(batch, desc: str):
                 return
 
 def batched_set(pairs: Iterable[tuple], batch_size=BATCH_SIZE, desc="write") -> int:
-    batch = db.batch()
-    i = total = 0
-    last_log = time.time()
-    for ref, data, merge in pairs:
-        batch.set(ref, data, merge=merge)
-        i += 1; total += 1
-        if i >= batch_size:
-            _commit_with_backoff(batch, desc)
-            time.sleep(INTER_COMMIT_SLEEP)
-            batch = db.batch(); i = 0
-            if time.time() - last_log > 10:
-                print(f"[{desc}] wrote {total} docs so far…"); last_log = time.time()
-    if i:
+    """(ref, data, merge) from any iterable — pass a generator to keep memory flat."""
+    last_log = [time.time()]
+    def commit(batch):
         _commit_with_backoff(batch, desc)
-    return total
+        time.sleep(INTER_COMMIT_SLEEP)
+    def progress(total):
+        if time.time() - last_log[0] > 10:
+            print(f"[{desc}] wrote {total} docs so far…"); last_log[0] = time.time()
+    return stream_io.commit_in_batches(db, pairs, batch_size, commit=commit, on_commit=progress)
 
 def split_room_id(room_id: str) -> Tuple[str, str]:
     return room_id.split("-", 1)
@@ -87,14 +85,9 @@ def collect_codes_from_jsonl(path: str) -> Set[str]:
     codes = set()
     if not os.path.exists(path):
         return codes
-    with open(path, "r", encoding="utf-8") as f:
-        for line in f:
-            if not line.strip():
-                continue
-            obj = json.loads(line)
-            rid = obj.get("roomId", "")
-            if "-" in rid:
-                codes.add(rid.split("-", 1)[0])
+    for rid in set(artifacts.iter_column(path, "roomId")):
+        if rid and "-" in rid:
+            codes.add(rid.split("-", 1)[0])
     return codes
 
 def load_building_map() -> Dict[str, str]:
@@ -154,52 +147,43 @@ def upsert_buildings():
     print(f"Upserted buildings: {n}")
 
 # ---------- ROOM HELPERS ----------
-def ensure_room_doc(bcode: str, room_id: str):
+def room_doc_write(bcode: str, room_id: str) -> tuple:
+    """Merge-write that makes sure buildings/{bcode}/rooms/{room_id} exists."""
     room_ref = db.collection("buildings").document(bcode).collection("rooms").document(room_id)
-    room_ref.set({"roomId": room_id, "buildingCode": bcode}, merge=True)
+    return room_ref, {"roomId": room_id, "buildingCode": bcode}, True
+
+def _room_day_writes(path: str, sub: str):
+    """
+    Streams (ref, payload, merge) for each record of a busy/availability file:
+    the room doc once per room (in the same batches), then rooms/{id}/{sub}/{date}.
+    """
+    seen_rooms = set()
+    for obj in artifacts.read_records(path):
+        room_id, date = obj["roomId"], obj["date"]
+        bcode, room = split_room_id(room_id)
+        if not _code_allowed(bcode): continue
+        if room_id not in seen_rooms:
+            seen_rooms.add(room_id)
+            yield room_doc_write(bcode, room_id)
+        doc_ref = (db.collection("buildings").document(bcode)
+                     .collection("rooms").document(room_id)
+                     .collection(sub).document(date))
+        if RESUME_MODE and doc_ref.get().exists: continue
+        payload = {**obj, "buildingCode": bcode, "room": room, "roomId": room_id}
+        yield doc_ref, payload, False
 
 # ---------- UPLOADERS (optional, you can comment out) ----------
 def upload_busy():
     if not os.path.exists(BUSY_JSONL):
         print(f"Skip: {BUSY_JSONL} not found"); return
-    writes = []
-    with open(BUSY_JSONL, "r", encoding="utf-8") as f:
-        for line in f:
-            if not line.strip(): continue
-            obj = json.loads(line)
-            room_id, date = obj["roomId"], obj["date"]
-            bcode, room = split_room_id(room_id)
-            if not _code_allowed(bcode): continue
-            ensure_room_doc(bcode, room_id)
-            doc_ref = (db.collection("buildings").document(bcode)
-                         .collection("rooms").document(room_id)
-                         .collection("busy").document(date))
-            if RESUME_MODE and doc_ref.get().exists: continue
-            payload = {**obj, "buildingCode": bcode, "room": room, "roomId": room_id}
-            writes.append((doc_ref, payload, False))
-    n = batched_set(writes, desc="busy")
-    print(f"Uploaded busy docs: {n}")
+    n = batched_set(_room_day_writes(BUSY_JSONL, "busy"), desc="busy")
+    print(f"Uploaded busy docs (incl. room docs): {n}")
 
 def upload_availability():
     if not os.path.exists(FREE_JSONL):
         print(f"Skip: {FREE_JSONL} not found"); return
-    writes = []
-    with open(FREE_JSONL, "r", encoding="utf-8") as f:
-        for line in f:
-            if not line.strip(): continue
-            obj = json.loads(line)
-            room_id, date = obj["roomId"], obj["date"]
-            bcode, room = split_room_id(room_id)
-            if not _code_allowed(bcode): continue
-            ensure_room_doc(bcode, room_id)
-            doc_ref = (db.collection("buildings").document(bcode)
-                         .collection("rooms").document(room_id)
-                         .collection("availability").document(date))
-            if RESUME_MODE and doc_ref.get().exists: continue
-            payload = {**obj, "buildingCode": bcode, "room": room, "roomId": room_id}
-            writes.append((doc_ref, payload, False))
-    n = batched_set(writes, desc="availability")
-    print(f"Uploaded availability docs: {n}")
+    n = batched_set(_room_day_writes(FREE_JSONL, "availability"), desc="availability")
+    print(f"Uploaded availability docs (incl. room docs): {n}")
 
 # ---------- MAIN ----------
 if __name__ == "__main__":
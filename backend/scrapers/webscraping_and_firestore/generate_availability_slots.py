@@ -1,53 +1,30 @@
-import json
 import os
 
-MIN_FREE_MINUTES = 30  # keep only intervals >= 30 min
+import artifacts
+from csulb_scraper import MIN_SLOT_MINUTES, SlotStage, slots_for_free
 
-def to_minutes(hhmm: str) -> int:
-    """Convert 'HH:MM' to total minutes since midnight."""
-    h, m = map(int, hhmm.split(":"))
-    return h * 60 + m
+# Re-runs only the slot stage from a saved out_availability file. csulb_scraper
+# already writes availability_slots (and the snapshots) during a scrape.
+MIN_FREE_MINUTES = MIN_SLOT_MINUTES  # keep only intervals >= this (30 min unless overridden)
+
+def slots_for_availability(obj: dict, min_free_minutes: int = MIN_FREE_MINUTES) -> list[dict]:
+    """Slot docs for one out_availability.jsonl record (free windows >= min_free_minutes)."""
+    return slots_for_free(obj, obj["date"], obj["free"], min_free_minutes)
 
 def generate_slots():
-    # --- paths relative to this script ---
+    # --- paths relative to this script (.jsonl or .cols, see artifacts.py) ---
     here = os.path.dirname(__file__)
-    in_path = os.path.join(here, "out_availability.jsonl")
-    out_path = os.path.join(here, "availability_slots.jsonl")
+    in_path = artifacts.find_artifact(here, "out_availability")
 
     # --- open and process ---
-    with open(in_path, "r", encoding="utf-8") as fin, open(out_path, "w", encoding="utf-8") as fout:
-        for line in fin:
-            if not line.strip():
-                continue
-            obj = json.loads(line)
-            common = {
-                "roomId": obj["roomId"],
-                "buildingCode": obj["buildingCode"],
-                "roomNumber": obj["roomNumber"],
-                "floor": obj["floor"],
-                "campusZone": obj["campusZone"],
-                "date": obj["date"],
-                "currentCheckins": 0,  # default value
-            }
-            for iv in obj["free"]:
-                s, e = iv["start"], iv["end"]
-                startMin, endMin = to_minutes(s), to_minutes(e)
-                duration = endMin - startMin
-                if duration < MIN_FREE_MINUTES:
-                    continue  # drop short intervals
-                slot = {
-                    **common,
-                    "start": s,
-                    "end": e,
-                    "startMin": startMin,
-                    "endMin": endMin,
-                    "durationMin": duration,
-                }
-                fout.write(json.dumps(slot) + "\n")
+    with SlotStage(here, MIN_FREE_MINUTES) as stage:
+        for obj in artifacts.read_records(in_path):
+            stage.add(obj, obj["date"], obj["free"])
 
-    print("✅ Created availability_slots.jsonl")
+    print(f"✅ Created {os.path.basename(stage.path)}")
     print(f"   - Input:  {in_path}")
-    print(f"   - Output: {out_path}")
+    print(f"   - Output: {stage.path}")
+    print(f"   - Snapshots: {len(stage.snapshot_paths)} days in {stage.snapshot_dir}")
 
 if __name__ == "__main__":
     generate_slots()
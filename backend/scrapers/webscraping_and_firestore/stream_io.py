@@ -0,0 +1,91 @@
+# stream_io.py — streaming JSONL I/O and batched Firestore writes for the pipeline
+#
+# - loads / dumps: orjson when installed (several times faster), else json
+# - iter_jsonl / JsonlWriter: binary files with a large buffer, one record
+#   in memory at a time
+# - commit_in_batches: feeds (ref, data, merge) from any iterable, usually a
+#   generator, into WriteBatches of batch_size, so memory doesn't grow with
+#   the input file
+#
+# artifacts.py (JSONL side), the slot generator and the uploaders use these.
+import json
+from typing import Callable, Iterable, Iterator, Optional
+
+try:
+    import orjson
+except ImportError:  # optional: pip install orjson
+    orjson = None
+
+BUFFER_SIZE = 1 << 20  # 1 MiB reads/writes
+
+if orjson is not None:
+    loads = orjson.loads
+
+    def dumps(obj) -> bytes:
+        return orjson.dumps(obj)
+else:
+    loads = json.loads
+
+    def dumps(obj) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+
+def iter_jsonl(path: str) -> Iterator[dict]:
+    """Records of a JSONL file, skipping blank lines."""
+    with open(path, "rb", buffering=BUFFER_SIZE) as f:
+        for line in f:
+            if line.strip():
+                yield loads(line)
+
+
+class JsonlWriter:
+    """with JsonlWriter(path) as w: w.write(obj) ... (buffered, one line per record)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.count = 0
+        self._f = open(path, "wb", buffering=BUFFER_SIZE)
+
+    def write(self, obj):
+        self._f.write(dumps(obj) + b"\n")
+        self.count += 1
+
+    def close(self):
+        self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def commit_in_batches(
+    db,
+    writes: Iterable[tuple],
+    batch_size: int = 500,
+    commit: Optional[Callable] = None,
+    on_commit: Optional[Callable[[int], None]] = None,
+) -> int:
+    """
+    Write (ref, data, merge) tuples in WriteBatches of batch_size; data=None
+    deletes ref. `commit(batch)` replaces batch.commit() (e.g. with backoff);
+    `on_commit(total)` runs after each full batch. Returns the count written.
+    """
+    commit = commit or (lambda b: b.commit())
+    batch, pending, total = db.batch(), 0, 0
+    for ref, data, merge in writes:
+        if data is None:
+            batch.delete(ref)
+        else:
+            batch.set(ref, data, merge=merge)
+        pending += 1
+        total += 1
+        if pending >= batch_size:
+            commit(batch)
+            batch, pending = db.batch(), 0
+            if on_commit:
+                on_commit(total)
+    if pending:
+        commit(batch)
+    return total
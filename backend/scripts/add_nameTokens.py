@@ -0,0 +1,46 @@
+# backend/scripts/add_nameTokens.py
+# Backfills the 'nameTokens' search array on study groups created before
+# prefix search existed. Run from backend/:  python -m scripts.add_nameTokens
+from google.cloud import firestore
+
+from routers.groups import COLLECTION, _name_search_tokens
+
+BATCH_SIZE = 500
+
+
+def main():
+    db = firestore.Client()
+    col = db.collection(COLLECTION)
+
+    total_updated = 0
+    last_doc = None
+
+    while True:
+        q = col.order_by("__name__").limit(BATCH_SIZE)
+        if last_doc is not None:
+            q = q.start_after(last_doc)
+
+        docs = list(q.stream(timeout=120))
+        if not docs:
+            break
+
+        batch = db.batch()
+        in_batch = 0
+        for doc in docs:
+            data = doc.to_dict() or {}
+            tokens = _name_search_tokens(data.get("name", ""))
+            if data.get("nameTokens") != tokens:
+                batch.update(doc.reference, {"nameTokens": tokens})
+                in_batch += 1
+        if in_batch:
+            batch.commit()
+            total_updated += in_batch
+
+        last_doc = docs[-1]
+        print(f"Processed batch, total updated so far: {total_updated}")
+
+    print(f"Done. Updated {total_updated} documents.")
+
+
+if __name__ == "__main__":
+    main()
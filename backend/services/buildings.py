@@ -0,0 +1,56 @@
+# backend/services/buildings.py
+"""
+Per-instance cache of the 'buildings' collection (code + name).
+
+The list only changes when the scrapers re-upload buildings, so GET
+/rooms/buildings serves it from memory for CACHE_TTL_SEC. The lifespan hook
+in main.py loads it at startup, so the first request after a cold start
+doesn't pay for it.
+"""
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+from services import metrics
+
+COLLECTION = "buildings"
+LIST_FIELDS = ["code", "name"]
+CACHE_TTL_SEC = float(os.getenv("BUILDINGS_CACHE_TTL_SEC", "600"))
+
+# (expires_at_monotonic, [{"code", "name"}, ...])
+_cached: Optional[tuple] = None
+_lock = threading.Lock()
+
+
+def _load(db) -> List[Dict[str, str]]:
+    buildings = []
+    for d in db.collection(COLLECTION).select(LIST_FIELDS).stream():
+        data = d.to_dict() or {}
+        code = data.get("code") or d.id
+        name = data.get("name") or code
+        buildings.append({"code": code, "name": name})
+
+    # sort by code so it's stable
+    buildings.sort(key=lambda b: b["code"])
+    return buildings
+
+
+def all_buildings(db) -> List[Dict[str, str]]:
+    """Every building as {"code", "name"}, sorted by code."""
+    global _cached
+    with _lock:
+        if _cached and _cached[0] > time.monotonic():
+            metrics.cache_hit("buildings")
+            return _cached[1]
+    metrics.cache_miss("buildings")
+    buildings = _load(db)
+    with _lock:
+        _cached = (time.monotonic() + CACHE_TTL_SEC, buildings)
+    return buildings
+
+
+def invalidate():
+    global _cached
+    with _lock:
+        _cached = None
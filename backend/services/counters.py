@@ -0,0 +1,188 @@
+# backend/services/counters.py
+"""
+Sharded counters for per-slot live values ('locked_reports', 'currentCheckins').
+
+Popular slots get many reports/check-ins at the top of the hour. Incrementing a
+field on the slot doc itself makes that doc a write hot-spot, so increments go
+to one of NUM_SHARDS shard docs instead:
+
+    availabilitySlots/{slotId}/counterShards/{day}_{0..NUM_SHARDS-1}
+        slotId, date, day, expireAt, locked_reports, currentCheckins
+
+Shards are partitioned by `day` (campus-local date): locked reports count
+toward the day they were made, check-ins toward the slot's own date. Only the
+current partition is read, so "today" starts at zero without any reset
+writes; old partitions are removed by a Firestore TTL policy on `expireAt`:
+
+    gcloud firestore fields ttls update expireAt \
+        --collection-group=counterShards --enable-ttl
+
+Reads aggregate all shards for a date with ONE collection-group query
+(needs a collection-group index on 'counterShards.date') and cache the result
+per instance for CACHE_TTL_SEC. Any value still stored on the slot doc itself
+(seeded by the scrapers / add_currentCheckins.py) is added on top, as are
+shards written before partitioning (no `day` field).
+"""
+import os
+import random
+import threading
+import time
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict
+
+from google.cloud import firestore
+
+from services import metrics
+
+try:
+    from zoneinfo import ZoneInfo
+    TZ = ZoneInfo("America/Los_Angeles")
+except Exception:
+    TZ = None
+
+log = logging.getLogger("uvicorn.error")
+
+SHARD_SUBCOLLECTION = "counterShards"
+NUM_SHARDS = max(1, int(os.getenv("COUNTER_SHARDS", "8")))
+CACHE_TTL_SEC = float(os.getenv("COUNTER_CACHE_TTL_SEC", "15"))
+# How long a day's partition is kept before TTL deletes it
+PARTITION_RETENTION_DAYS = int(os.getenv("COUNTER_RETENTION_DAYS", "2"))
+
+LOCKED_REPORTS = "locked_reports"
+CURRENT_CHECKINS = "currentCheckins"
+COUNTER_FIELDS = (LOCKED_REPORTS, CURRENT_CHECKINS)
+
+# (date, today) -> (expires_at_monotonic, {slotId: {field: total}})
+_date_cache: Dict[tuple, tuple] = {}
+_cache_lock = threading.Lock()
+
+
+def today() -> str:
+    """Current campus-local date, YYYY-MM-DD."""
+    now = datetime.now(TZ) if TZ else datetime.utcnow()
+    return now.strftime("%Y-%m-%d")
+
+
+def partition_day(field: str, slot_date: str) -> str:
+    """Partition a write to `field` belongs to."""
+    return slot_date if field == CURRENT_CHECKINS else today()
+
+
+def partition_expire_at(day: str) -> datetime:
+    """When TTL may delete a partition's docs."""
+    start = datetime.strptime(day, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+    return start + timedelta(days=PARTITION_RETENTION_DAYS)
+
+
+def shard_ref(slot_ref, day: str, shard: int | None = None):
+    """Shard doc for a slot's `day` partition; a random shard when `shard` is None."""
+    if shard is None:
+        shard = random.randrange(NUM_SHARDS)
+    return slot_ref.collection(SHARD_SUBCOLLECTION).document(f"{day}_{shard}")
+
+
+def add_increment(writer, slot_ref, date: str, field: str, amount: int = 1):
+    """
+    Queue an increment of `field` on a random shard into `writer`
+    (a WriteBatch or Transaction). Nothing is sent until the caller commits.
+    """
+    day = partition_day(field, date)
+    writer.set(
+        shard_ref(slot_ref, day),
+        {
+            "slotId": slot_ref.id,
+            "date": date,
+            "day": day,
+            "expireAt": partition_expire_at(day),
+            field: firestore.Increment(amount),
+        },
+        merge=True,
+    )
+
+
+def _add_shard(totals: Dict[str, Dict[str, int]], snap, live_day: Dict[str, str]):
+    """Add one shard doc's live-partition values into totals[slotId]."""
+    data = snap.to_dict() or {}
+    slot_id = data.get("slotId") or snap.reference.parent.parent.id
+    day = data.get("day")
+    slot_totals = totals.setdefault(slot_id, {f: 0 for f in COUNTER_FIELDS})
+    for f in COUNTER_FIELDS:
+        if day is None or day == live_day[f]:
+            slot_totals[f] += int(data.get(f, 0) or 0)
+
+
+def _load_date_counts(db, date: str, current_day: str) -> Dict[str, Dict[str, int]]:
+    totals: Dict[str, Dict[str, int]] = {}
+    live_day = {LOCKED_REPORTS: current_day, CURRENT_CHECKINS: date}
+    query = db.collection_group(SHARD_SUBCOLLECTION).where("date", "==", date)
+    for snap in query.stream():
+        _add_shard(totals, snap, live_day)
+    return totals
+
+
+def transactional_slot_count(transaction, slot_ref, slot_snap, date: str, field: str) -> int:
+    """
+    Exact value of `field` for one slot, read inside `transaction` (slot doc
+    value plus its shards), bypassing the cache. The shard reads join the
+    transaction, so a concurrent increment makes it retry; use this when a
+    decision such as a capacity check must not race with other writers.
+    """
+    totals: Dict[str, Dict[str, int]] = {}
+    live_day = {LOCKED_REPORTS: today(), CURRENT_CHECKINS: date}
+    shards = slot_ref.collection(SHARD_SUBCOLLECTION).where("date", "==", date)
+    for snap in transaction.get(shards):
+        _add_shard(totals, snap, live_day)
+    base = (slot_snap.to_dict() or {}).get(field, 0) if slot_snap.exists else 0
+    return slot_count(totals, slot_ref.id, field, base)
+
+
+def counts_for_date(db, date: str) -> Dict[str, Dict[str, int]]:
+    """
+    {slotId: {field: shardTotal}} for every slot on `date` that has shards.
+    Served from the per-instance cache while fresh.
+    """
+    key = (date, today())
+    now = time.monotonic()
+    with _cache_lock:
+        hit = _date_cache.get(key)
+        if hit and hit[0] > now:
+            metrics.cache_hit("counters")
+            return hit[1]
+
+    metrics.cache_miss("counters")
+    totals = _load_date_counts(db, date, key[1])
+    with _cache_lock:
+        # entries from a previous day are never read again
+        for stale in [k for k in _date_cache if k[1] != key[1]]:
+            del _date_cache[stale]
+        _date_cache[key] = (now + CACHE_TTL_SEC, totals)
+    return totals
+
+
+def slot_count(counts: Dict[str, Dict[str, int]], slot_id: str, field: str, base: int = 0) -> int:
+    """Slot-doc value (`base`) plus the aggregated shard total, never negative."""
+    return max(0, int(base or 0) + counts.get(slot_id, {}).get(field, 0))
+
+
+def apply_local_delta(date: str, slot_id: str, field: str, delta: int):
+    """
+    Reflect this instance's own committed write in its cache, so the caller
+    sees its update immediately; other instances pick it up after the TTL.
+    """
+    with _cache_lock:
+        hit = _date_cache.get((date, today()))
+        if not hit:
+            return
+        slot_totals = hit[1].setdefault(slot_id, {f: 0 for f in COUNTER_FIELDS})
+        slot_totals[field] = slot_totals.get(field, 0) + delta
+
+
+def invalidate(date: str | None = None):
+    """Drop cached totals for one date (or all dates)."""
+    with _cache_lock:
+        if date is None:
+            _date_cache.clear()
+        else:
+            for key in [k for k in _date_cache if k[0] == date]:
+                del _date_cache[key]
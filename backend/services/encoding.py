@@ -0,0 +1,109 @@
+# backend/services/encoding.py
+"""
+Response encoding for the list endpoints.
+
+  - FastJSONResponse is ORJSONResponse when orjson is installed (it is in
+    requirements.txt), plain JSONResponse otherwise. main.py uses it as the
+    app's default response class.
+  - respond() builds the response straight from a Pydantic model, skipping
+    FastAPI's second validation pass over response_model, and adds a weak
+    ETag so clients can revalidate with If-None-Match and get a bodiless 304.
+  - format=columnar turns a list of objects into one array per field:
+        {"items": {"length": 2, "columns": {"id": ["a", "b"], ...}}, ...}
+    Field names are sent once instead of once per row.
+
+Compression is applied by middleware in main.py (add_compression).
+"""
+import hashlib
+from typing import Any, Dict, List, Optional
+
+from fastapi import Request, Response
+from pydantic import BaseModel
+
+try:
+    import orjson  # noqa: F401  (ORJSONResponse needs it at call time)
+    from fastapi.responses import ORJSONResponse as FastJSONResponse
+except ImportError:
+    from fastapi.responses import JSONResponse as FastJSONResponse
+
+FORMATS = "^(json|columnar)$"
+# Compress bodies larger than this (a page of ~5 rooms)
+COMPRESS_MIN_BYTES = 1000
+
+
+def columnar(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Row dicts -> {"length", "columns": {field: [values]}}. Rows may differ in
+    shape (e.g. public vs private groups); a missing field is null.
+    """
+    fields = list(dict.fromkeys(f for r in rows for f in r))
+    return {
+        "length": len(rows),
+        "columns": {f: [r.get(f) for r in rows] for f in fields},
+    }
+
+
+def _opaque_tag(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """
+    If-None-Match check (RFC 9110 weak comparison): "*" or any listed
+    entity-tag whose opaque part equals etag's. Tags are compared whole,
+    never by substring.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    wanted = _opaque_tag(etag)
+    return any(_opaque_tag(t) == wanted for t in if_none_match.split(","))
+
+
+def respond(
+    request: Request,
+    content: Any,
+    fmt: str = "json",
+    list_field: Optional[str] = "items",
+) -> Response:
+    """
+    Encode `content` (a model, or a list of dicts/models) for the client.
+    With fmt="columnar", content[list_field] is sent in columnar form (or the
+    whole list, if content is a list).
+    """
+    if isinstance(content, BaseModel):
+        body = content.model_dump(mode="json")
+    elif isinstance(content, list):
+        body = [c.model_dump(mode="json") if isinstance(c, BaseModel) else c for c in content]
+    else:
+        body = content
+
+    if fmt == "columnar":
+        if isinstance(body, list):
+            body = columnar(body)
+        elif list_field:
+            body[list_field] = columnar(body[list_field])
+
+    response = FastJSONResponse(body)
+    # Weak: the tag is over the uncompressed JSON, and the compression
+    # middleware may send different bytes under it.
+    etag = 'W/"' + hashlib.blake2b(response.body, digest_size=12).hexdigest() + '"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache", "Vary": "Authorization"}
+    if etag_matches(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return response
+
+
+def add_compression(app):
+    """Brotli (if brotli-asgi is installed, with gzip fallback) else gzip."""
+    try:
+        from brotli_asgi import BrotliMiddleware
+    except ImportError:
+        from fastapi.middleware.gzip import GZipMiddleware
+        app.add_middleware(GZipMiddleware, minimum_size=COMPRESS_MIN_BYTES)
+        return "gzip"
+    app.add_middleware(BrotliMiddleware, minimum_size=COMPRESS_MIN_BYTES, gzip_fallback=True)
+    return "br"
@@ -6,6 +6,8 @@ from functools import lru_cache
 from google.cloud import firestore
 from google.oauth2 import service_account
 
+from services.metrics import instrument_client
+
 log = logging.getLogger("uvicorn.error")
 
 
@@ -27,6 +29,9 @@ def get_db() -> firestore.Client:
 
     This makes the backend immune to anyone accidentally setting corrupted
     FIRESTORE_PROJECT_ID values in Cloud Run.
+
+    Every client is wrapped by services.metrics.instrument_client, so reads,
+    writes and round trips show up at /metrics.
     """
 
     cred_path = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
@@ -49,13 +54,13 @@ def get_db() -> firestore.Client:
 
         if project_id:
             log.info(f"Firestore (LOCAL): using explicit project '{project_id}'")
-            return firestore.Client(project=project_id, credentials=creds)
+            return instrument_client(firestore.Client(project=project_id, credentials=creds))
 
         # No project provided — let Firestore infer it
         log.warning("Firestore (LOCAL): FIRESTORE_PROJECT_ID missing, inferring project from JSON file")
         client = firestore.Client(credentials=creds)
         log.info(f"Firestore (LOCAL): inferred project '{client.project}'")
-        return client
+        return instrument_client(client)
 
     # ------------------------------------------------------
     # CLOUD RUN (NO JSON CREDENTIALS)
@@ -67,4 +72,4 @@ def get_db() -> firestore.Client:
     client = firestore.Client()
     log.info(f"Firestore (CLOUD RUN): initialized with project '{client.project}'")
 
-    return client
+    return instrument_client(client)
@@ -0,0 +1,111 @@
+# backend/services/loader.py
+"""
+Request-scoped document loader (DataLoader-style) on top of get_db().
+
+Handlers often read the same user/group doc more than once per request, and
+read N related docs one `.get()` at a time. DocLoader:
+
+  - caches snapshots by path for the lifetime of one request,
+  - turns get_many([...]) into ONE db.get_all() round trip for whatever is
+    not cached yet,
+  - single-flights identical reads across concurrent requests: if another
+    request is already fetching a path, we wait for its result instead of
+    sending a second RPC.
+
+Use it as a FastAPI dependency:  loader: DocLoader = Depends(get_loader)
+Snapshots are point-in-time; call forget(ref) after writing a doc you will
+read again in the same request. A forgotten path is never single-flighted
+again by this loader: a read another request started before our write could
+return the old doc, so it is always fetched with our own RPC.
+"""
+import threading
+from concurrent.futures import Future
+from typing import Dict, Iterable, List
+
+from services import metrics
+from services.firestore_client import get_db
+
+# path -> Future[DocumentSnapshot] for reads currently on the wire (all requests)
+_inflight: Dict[str, Future] = {}
+_inflight_lock = threading.Lock()
+
+
+class DocLoader:
+    def __init__(self, db):
+        self._db = db
+        self._cache: Dict[str, object] = {}
+        # paths forget() was called for (written by this request)
+        self._written: set = set()
+
+    def get(self, ref):
+        """Snapshot for one DocumentReference (check `.exists`)."""
+        return self.get_many([ref])[0]
+
+    def get_many(self, refs: Iterable) -> List:
+        """Snapshots for `refs`, in the same order, with at most one get_all round trip."""
+        refs = list(refs)
+        wanted = {}
+        for ref in refs:
+            if ref.path not in self._cache:
+                wanted.setdefault(ref.path, ref)
+        if len(refs) > len(wanted):
+            metrics.cache_hit("loader", len(refs) - len(wanted))
+
+        if wanted:
+            self._load(wanted)
+        return [self._cache[ref.path] for ref in refs]
+
+    def prime(self, snapshot):
+        """Seed the cache with a snapshot a query already returned."""
+        self._cache[snapshot.reference.path] = snapshot
+
+    def forget(self, ref):
+        self._cache.pop(ref.path, None)
+        self._written.add(ref.path)
+
+    def _load(self, wanted: Dict[str, object]):
+        owned: Dict[str, Future] = {}
+        waiting: Dict[str, Future] = {}
+        # read-your-writes: written paths neither join nor publish a shared read
+        private = {p: Future() for p in wanted if p in self._written}
+        with _inflight_lock:
+            for path in wanted:
+                if path in private:
+                    continue
+                fut = _inflight.get(path)
+                if fut is None:
+                    fut = Future()
+                    _inflight[path] = fut
+                    owned[path] = fut
+                else:
+                    waiting[path] = fut
+        if waiting:
+            metrics.cache_hit("loader_inflight", len(waiting))
+        fetch = {**owned, **private}
+        if fetch:
+            metrics.cache_miss("loader", len(fetch))
+
+        if fetch:
+            try:
+                found = {}
+                for snap in self._db.get_all([wanted[p] for p in fetch]):
+                    found[snap.reference.path] = snap
+                for path, fut in fetch.items():
+                    fut.set_result(found[path])
+            except BaseException as e:
+                for fut in owned.values():
+                    if not fut.done():
+                        fut.set_exception(e)
+                raise
+            finally:
+                with _inflight_lock:
+                    for path in owned:
+                        _inflight.pop(path, None)
+
+        for path, fut in {**fetch, **waiting}.items():
+            self._cache[path] = fut.result()
+
+
+def get_loader() -> DocLoader:
+    """FastAPI dependency: a fresh loader per request."""
+    return DocLoader(get_db())
@@ -0,0 +1,230 @@
+# backend/services/locked_reports_reset.py
+"""
+Bulk reset engine behind POST /rooms/admin/reset_locked_reports?purgeLegacy=true.
+
+Day-partitioned reports (docs with a `day` field) never need resetting, so
+this only clears report data written before partitioning. Three phases, each
+a cursor-paged scan whose pages are split into chunks of at most
+MAX_BATCH_OPS writes and committed concurrently on a thread pool:
+
+    slots   availabilitySlots where locked_reports > 0  -> locked_reports = 0
+    shards  counterShards (collection group) with locked_reports > 0
+            and no `day`                                -> 0
+    votes   lockedReportsUsers (collection group) with no `day` -> delete
+
+Each phase pages by a cursor on (its order field, __name__). The slots phase
+drains itself (a reset doc no longer matches), but partitioned shards and
+vote markers keep matching their queries and are only skipped, so the
+resume position is checkpointed too: adminJobs/resetLockedReports holds the
+finished phases, the running totals and the cursor of the last page whose
+writes have all committed. It is updated after every such page, so after a
+Cloud Run timeout the next call continues from there instead of rescanning.
+"""
+import os
+import time
+import uuid
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+from services import counters
+
+log = logging.getLogger("uvicorn.error")
+
+SLOTS_COLLECTION = "availabilitySlots"
+VOTES_SUBCOLLECTION = "lockedReportsUsers"
+CHECKPOINT_COLLECTION = "adminJobs"
+CHECKPOINT_DOC = "resetLockedReports"
+
+PAGE_SIZE = 500
+MAX_BATCH_OPS = 500          # Firestore limit per batched write
+MAX_WORKERS = int(os.getenv("RESET_MAX_WORKERS", "8"))
+# Stop starting new pages after this long; Cloud Run's default timeout is 300s.
+TIME_BUDGET_SEC = float(os.getenv("RESET_TIME_BUDGET_SEC", "240"))
+
+PHASES = ("slots", "shards", "votes")
+_TOTAL_KEYS = {"slots": "slotsReset", "shards": "shardsReset", "votes": "userVotesCleared"}
+
+
+def _phase_query(db, phase: str):
+    if phase == "slots":
+        return (
+            db.collection(SLOTS_COLLECTION)
+            .where(counters.LOCKED_REPORTS, ">", 0)
+            .order_by(counters.LOCKED_REPORTS)
+            .order_by("__name__")
+            .select([counters.LOCKED_REPORTS])
+        )
+    if phase == "shards":
+        return (
+            db.collection_group(counters.SHARD_SUBCOLLECTION)
+            .where(counters.LOCKED_REPORTS, ">", 0)
+            .order_by(counters.LOCKED_REPORTS)
+            .order_by("__name__")
+            .select([counters.LOCKED_REPORTS, "day"])
+        )
+    return db.collection_group(VOTES_SUBCOLLECTION).order_by("__name__").select(["day"])
+
+
+def _cursor_of(phase: str, snap) -> Dict:
+    """Checkpointable cursor after `snap`: its order-field value and path."""
+    cursor = {"path": snap.reference.path}
+    if phase != "votes":
+        cursor[counters.LOCKED_REPORTS] = (snap.to_dict() or {}).get(counters.LOCKED_REPORTS, 0)
+    return cursor
+
+
+def _start_after(db, query, phase: str, cursor: Dict):
+    fields = {"__name__": db.document(cursor["path"])}
+    if phase != "votes":
+        fields = {counters.LOCKED_REPORTS: cursor[counters.LOCKED_REPORTS], **fields}
+    return query.start_after(fields)
+
+
+def _is_legacy(phase: str, snap) -> bool:
+    """Slot docs are always legacy; shards/votes only when un-partitioned."""
+    return phase == "slots" or (snap.to_dict() or {}).get("day") is None
+
+
+def _phase_write(phase: str) -> Callable:
+    if phase == "votes":
+        return lambda batch, ref: batch.delete(ref)
+    return lambda batch, ref: batch.update(ref, {counters.LOCKED_REPORTS: 0})
+
+
+def _commit_chunk(db, refs: List, write: Callable) -> float:
+    t0 = time.perf_counter()
+    batch = db.batch()
+    for ref in refs:
+        write(batch, ref)
+    batch.commit()
+    return time.perf_counter() - t0
+
+
+def _run_phase(db, phase: str, pool: ThreadPoolExecutor, deadline: float,
+               on_page: Callable, cursor: Optional[Dict] = None) -> Dict:
+    """
+    Page through `phase` from `cursor` and commit its chunks concurrently.
+    on_page(phase, n, cursor) runs, in page order, once every write of a page
+    and of the pages before it has committed. Returns per-phase stats;
+    stats["done"] is False if the time budget ran out.
+    """
+    query = _phase_query(db, phase)
+    write = _phase_write(phase)
+    stats = {"pages": 0, "docs": 0, "readSec": 0.0, "writeSec": 0.0, "wallSec": 0.0, "done": False}
+    t_phase = time.perf_counter()
+
+    # (future, (n, cursor) on a page's last chunk else None), in submit order
+    pending = []
+
+    def finish_oldest():
+        fut, page_end = pending.pop(0)
+        stats["writeSec"] += fut.result()
+        if page_end is not None:
+            on_page(phase, *page_end)
+
+    while time.monotonic() < deadline:
+        q = query.limit(PAGE_SIZE)
+        if cursor is not None:
+            q = _start_after(db, q, phase, cursor)
+
+        t0 = time.perf_counter()
+        docs = list(q.stream())
+        stats["readSec"] += time.perf_counter() - t0
+
+        if not docs:
+            stats["done"] = True
+            break
+
+        cursor = _cursor_of(phase, docs[-1])
+        refs = [d.reference for d in docs if _is_legacy(phase, d)]
+        chunks = [pool.submit(_commit_chunk, db, refs[i:i + MAX_BATCH_OPS], write)
+                  for i in range(0, len(refs), MAX_BATCH_OPS)]
+        if not chunks:  # nothing legacy on this page; still advances the checkpoint
+            chunks = [Future()]
+            chunks[0].set_result(0.0)
+        pending.extend((fut, None) for fut in chunks[:-1])
+        pending.append((chunks[-1], (len(refs), cursor)))
+
+        # Keep at most one page per worker in flight; report finished pages.
+        while len(pending) > MAX_WORKERS:
+            finish_oldest()
+
+        stats["pages"] += 1
+        stats["docs"] += len(refs)
+
+    while pending:
+        finish_oldest()
+
+    stats["wallSec"] = time.perf_counter() - t_phase
+    for k in ("readSec", "writeSec", "wallSec"):
+        stats[k] = round(stats[k], 3)
+    return stats
+
+
+def run_reset(db, time_budget_sec: float = TIME_BUDGET_SEC) -> Dict:
+    """
+    Run (or resume) the reset. Returns the response body for the endpoint:
+    status "ok" when every phase finished, "partial" when the time budget ran
+    out (call again to resume from the checkpoint).
+    """
+    deadline = time.monotonic() + time_budget_sec
+    ckpt_ref = db.collection(CHECKPOINT_COLLECTION).document(CHECKPOINT_DOC)
+    ckpt_snap = ckpt_ref.get()
+    ckpt = (ckpt_snap.to_dict() or {}) if ckpt_snap.exists else {}
+
+    if ckpt.get("status") == "running":
+        run_id = ckpt.get("runId", "")
+        done_phases = list(ckpt.get("donePhases", []))
+        totals = {k: int(ckpt.get(k, 0)) for k in _TOTAL_KEYS.values()}
+        # {"phase": ..., "cursor": {...}} for the phase that was interrupted
+        position = ckpt.get("position") or {}
+        log.info("reset_locked_reports: resuming run %s after phases %s at %s", run_id, done_phases, position)
+    else:
+        run_id = uuid.uuid4().hex
+        done_phases = []
+        totals = {k: 0 for k in _TOTAL_KEYS.values()}
+        position = {}
+
+    def save_checkpoint(status: str):
+        ckpt_ref.set({
+            "runId": run_id,
+            "status": status,
+            "donePhases": done_phases,
+            "position": position,
+            **totals,
+            "updatedAt": datetime.now(timezone.utc),
+        })
+
+    def on_page(phase: str, n: int, cursor: Dict):
+        totals[_TOTAL_KEYS[phase]] += n
+        position.clear()
+        position.update({"phase": phase, "cursor": cursor})
+        save_checkpoint("running")
+
+    save_checkpoint("running")
+    phase_stats: Dict[str, Dict] = {}
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+        for phase in PHASES:
+            if phase in done_phases:
+                continue
+            start = position.get("cursor") if position.get("phase") == phase else None
+            stats = _run_phase(db, phase, pool, deadline, on_page, start)
+            phase_stats[phase] = stats
+            log.info("reset_locked_reports: phase=%s stats=%s", phase, stats)
+            if not stats["done"]:
+                break
+            done_phases.append(phase)
+            position.clear()
+
+    complete = len(done_phases) == len(PHASES)
+    save_checkpoint("done" if complete else "running")
+    counters.invalidate()
+
+    return {
+        "status": "ok" if complete else "partial",
+        "runId": run_id,
+        **totals,
+        "phases": phase_stats,
+    }
@@ -0,0 +1,65 @@
+# backend/services/logging_setup.py
+"""
+Non-blocking, level-gated logging for the API.
+
+Handlers write to stdout/stderr synchronously; under load that blocks the
+worker serving the request. configure_logging() moves the existing handlers
+of our logger ("uvicorn.error", the one every module uses) behind a
+QueueHandler, so a log call only enqueues the record and a background
+QueueListener thread does the formatting and I/O.
+
+STUDYBUDDY_DEBUG=1 turns on DEBUG level (e.g. list_rooms previews). When it
+is off, debug calls are dropped by the level check before any argument is
+formatted; guard anything expensive to build with log.isEnabledFor(DEBUG).
+"""
+import atexit
+import logging
+import os
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+LOGGER_NAME = "uvicorn.error"
+
+_listener: QueueListener | None = None
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """
+    Enqueue the record as-is. The stock prepare() formats the message in the
+    calling thread; the queue is in-process, so formatting can wait for the
+    listener thread.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+def configure_logging() -> logging.Logger:
+    """Idempotent; returns the app logger."""
+    global _listener
+    log = logging.getLogger(LOGGER_NAME)
+    debug = os.getenv("STUDYBUDDY_DEBUG", "").lower() in ("1", "true", "yes")
+    log.setLevel(logging.DEBUG if debug else logging.INFO)
+    if _listener is not None:
+        return log
+
+    handlers = [h for h in log.handlers if not isinstance(h, QueueHandler)]
+    if not handlers and log.parent is not None:
+        # uvicorn attaches its handler to "uvicorn" and lets "uvicorn.error" propagate
+        handlers = list(log.parent.handlers)
+    if not handlers:
+        # Not started by uvicorn (scripts, tests): log to stderr like uvicorn would
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(levelname)s:     %(message)s"))
+        handlers = [handler]
+
+    records: queue.SimpleQueue = queue.SimpleQueue()
+    for h in handlers:
+        log.removeHandler(h)
+    log.addHandler(_DeferredQueueHandler(records))
+    log.propagate = False
+
+    _listener = QueueListener(records, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+    return log
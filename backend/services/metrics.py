@@ -0,0 +1,317 @@
+# backend/services/metrics.py
+"""
+In-process request metrics, exported at GET /metrics in Prometheus text format.
+
+  - per-route latency histograms and request counts (middleware in main.py)
+  - Firestore reads / writes / round trips / response bytes, both in total
+    and per route, recorded by wrapping the client's GAPIC API object
+    (instrument_client, applied in get_db())
+  - cache hit/miss counters (cache_hit / cache_miss)
+  - cold-start timings: module import, each lifespan warm-up step and the
+    first request (record_startup)
+
+Per-request Firestore numbers are collected in a RequestStats object held in
+a contextvar; FastAPI runs sync endpoints in a worker thread with a copy of
+the request context, so RPCs made by a handler land on its own request.
+The middleware observes a request when its body has been sent, so a
+StreamingResponse's Firestore calls (list_rooms range mode) count too.
+Work on other threads (e.g. the reset engine's pool) is counted under the
+"(background)" route.
+"""
+import logging
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, Optional, Tuple
+
+log = logging.getLogger("uvicorn.error")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+ROUND_TRIP_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+BACKGROUND_ROUTE = "(background)"
+
+
+class RequestStats:
+    __slots__ = ("reads", "writes", "round_trips", "bytes", "firestore_sec")
+
+    def __init__(self):
+        self.reads = 0
+        self.writes = 0
+        self.round_trips = 0
+        self.bytes = 0
+        self.firestore_sec = 0.0
+
+
+class _Histogram:
+    __slots__ = ("buckets", "counts", "total", "count")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        for i, upper in enumerate(self.buckets):
+            if value <= upper:
+                self.counts[i] += 1
+        self.total += value
+        self.count += 1
+
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+_lock = threading.Lock()
+
+_requests: Dict[Tuple[str, str, str], int] = {}                # (method, route, status)
+_latency: Dict[Tuple[str, str], _Histogram] = {}               # (method, route)
+_route_round_trips: Dict[Tuple[str, str], _Histogram] = {}     # (method, route)
+_route_fs: Dict[str, Dict[str, float]] = {}                    # route -> reads/writes/...
+_rpcs: Dict[str, int] = {}                                     # rpc name
+_cache: Dict[Tuple[str, str], int] = {}                        # (cache, hit|miss)
+_startup: Dict[str, float] = {}                                # phase -> seconds
+
+
+# ------------------------------------------------------------------
+# Request lifecycle (called by the middleware in main.py)
+# ------------------------------------------------------------------
+def begin_request():
+    """Start collecting Firestore stats for the current request."""
+    stats = RequestStats()
+    return stats, _current.set(stats)
+
+
+def end_request(token):
+    _current.reset(token)
+
+
+def observe_request(method: str, route: str, status: int, seconds: float, stats: RequestStats):
+    with _lock:
+        key = (method, route)
+        _requests[(method, route, str(status))] = _requests.get((method, route, str(status)), 0) + 1
+        _latency.setdefault(key, _Histogram(LATENCY_BUCKETS)).observe(seconds)
+        _route_round_trips.setdefault(key, _Histogram(ROUND_TRIP_BUCKETS)).observe(stats.round_trips)
+        _add_route_fs(route, stats.reads, stats.writes, stats.round_trips, stats.bytes)
+
+
+def server_timing_header(seconds: float, stats: RequestStats) -> str:
+    """Value for an optional `Server-Timing` response header."""
+    return (
+        f"app;dur={seconds * 1000:.1f}, "
+        f"firestore;dur={stats.firestore_sec * 1000:.1f};desc=\"rt={stats.round_trips} "
+        f"r={stats.reads} w={stats.writes}\""
+    )
+
+
+def _add_route_fs(route: str, reads: int, writes: int, round_trips: int, nbytes: int):
+    fs = _route_fs.setdefault(route, {"reads": 0, "writes": 0, "round_trips": 0, "bytes": 0})
+    fs["reads"] += reads
+    fs["writes"] += writes
+    fs["round_trips"] += round_trips
+    fs["bytes"] += nbytes
+
+
+# ------------------------------------------------------------------
+# Firestore accounting
+# ------------------------------------------------------------------
+def record_rpc(rpc: str, reads: int = 0, writes: int = 0, nbytes: int = 0, seconds: float = 0.0, round_trip: bool = True):
+    stats = _current.get()
+    with _lock:
+        if round_trip:
+            _rpcs[rpc] = _rpcs.get(rpc, 0) + 1
+        if stats is None:
+            _add_route_fs(BACKGROUND_ROUTE, reads, writes, int(round_trip), nbytes)
+    if stats is not None:
+        stats.reads += reads
+        stats.writes += writes
+        stats.round_trips += int(round_trip)
+        stats.bytes += nbytes
+        stats.firestore_sec += seconds
+
+
+def _pb_size(message) -> int:
+    try:
+        return type(message).pb(message).ByteSize()
+    except Exception:
+        return 0
+
+
+def _streamed(rpc: str, iterator, is_read):
+    """Wrap a server-streaming response so reads/bytes are counted as consumed."""
+    record_rpc(rpc)
+    while True:
+        t0 = time.perf_counter()
+        try:
+            resp = next(iterator)
+        except StopIteration:
+            record_rpc(rpc, seconds=time.perf_counter() - t0, round_trip=False)
+            return
+        record_rpc(
+            rpc,
+            reads=1 if is_read(resp) else 0,
+            nbytes=_pb_size(resp),
+            seconds=time.perf_counter() - t0,
+            round_trip=False,
+        )
+        yield resp
+
+
+class _InstrumentedFirestoreApi:
+    """Transparent proxy over the GAPIC FirestoreClient that records every RPC."""
+
+    _STREAMING_READS = {
+        "batch_get_documents": lambda r: bool(r.found) or bool(r.missing),
+        "run_query": lambda r: bool(r.document),
+        "run_aggregation_query": lambda r: bool(r.result),
+    }
+
+    def __init__(self, api):
+        self._api = api
+
+    def __getattr__(self, name):
+        attr = getattr(self._api, name)
+        if name in self._STREAMING_READS:
+            is_read = self._STREAMING_READS[name]
+            return lambda *a, **kw: _streamed(name, iter(attr(*a, **kw)), is_read)
+        if name == "commit":
+            return self._commit
+        if name in ("begin_transaction", "rollback", "list_documents", "list_collection_ids", "partition_query"):
+            return self._timed(name, attr)
+        return attr
+
+    def _timed(self, name, fn):
+        def call(*args, **kwargs):
+            t0 = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                record_rpc(name, seconds=time.perf_counter() - t0)
+        return call
+
+    def _commit(self, *args, **kwargs):
+        request = kwargs.get("request") or (args[0] if args else None) or {}
+        writes = request.get("writes", []) if isinstance(request, dict) else getattr(request, "writes", [])
+        t0 = time.perf_counter()
+        try:
+            return self._api.commit(*args, **kwargs)
+        finally:
+            record_rpc("commit", writes=len(writes), seconds=time.perf_counter() - t0)
+
+
+def instrument_client(client):
+    """
+    Route a firestore.Client's RPCs through the accounting proxy (idempotent).
+
+    The Client has no public transport/interceptor hook, so this swaps the
+    private `_firestore_api_internal` that the `_firestore_api` property
+    caches (google-cloud-firestore==2.16.0, pinned in requirements.txt). If
+    an upgrade moves it, the client is returned unwrapped and an error is
+    logged, rather than breaking client init or silently losing accounting.
+    """
+    api = client._firestore_api
+    if isinstance(api, _InstrumentedFirestoreApi):
+        return client
+    if "_firestore_api_internal" not in vars(client):
+        log.error("metrics: firestore.Client has no _firestore_api_internal "
+                  "(google-cloud-firestore upgraded?); Firestore RPCs are NOT instrumented")
+        return client
+    client._firestore_api_internal = _InstrumentedFirestoreApi(api)
+    if client._firestore_api is not client._firestore_api_internal:
+        client._firestore_api_internal = api
+        log.error("metrics: firestore.Client ignores _firestore_api_internal "
+                  "(google-cloud-firestore upgraded?); Firestore RPCs are NOT instrumented")
+    return client
+
+
+# ------------------------------------------------------------------
+# Caches
+# ------------------------------------------------------------------
+def cache_hit(cache: str, n: int = 1):
+    with _lock:
+        _cache[(cache, "hit")] = _cache.get((cache, "hit"), 0) + n
+
+
+def cache_miss(cache: str, n: int = 1):
+    with _lock:
+        _cache[(cache, "miss")] = _cache.get((cache, "miss"), 0) + n
+
+
+# ------------------------------------------------------------------
+# Startup
+# ------------------------------------------------------------------
+def record_startup(phase: str, seconds: float) -> bool:
+    """Record a cold-start phase once; returns False if it was already recorded."""
+    with _lock:
+        if phase in _startup:
+            return False
+        _startup[phase] = seconds
+        return True
+
+
+def startup_recorded(phase: str) -> bool:
+    return phase in _startup
+
+
+# ------------------------------------------------------------------
+# Prometheus text exposition
+# ------------------------------------------------------------------
+def _labels(**kv) -> str:
+    parts = []
+    for k, v in kv.items():
+        v = str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        parts.append(f'{k}="{v}"')
+    return "{" + ",".join(parts) + "}"
+
+
+def _render_histogram(lines, name, hists):
+    for (method, route), h in sorted(hists.items()):
+        for upper, n in zip(h.buckets, h.counts):
+            lines.append(f"{name}_bucket{_labels(method=method, route=route, le=upper)} {n}")
+        lines.append(f"{name}_bucket{_labels(method=method, route=route, le='+Inf')} {h.count}")
+        lines.append(f"{name}_sum{_labels(method=method, route=route)} {h.total}")
+        lines.append(f"{name}_count{_labels(method=method, route=route)} {h.count}")
+
+
+def render_prometheus() -> str:
+    lines = []
+    with _lock:
+        lines.append("# HELP studybuddy_http_requests_total HTTP requests by route and status.")
+        lines.append("# TYPE studybuddy_http_requests_total counter")
+        for (method, route, status), n in sorted(_requests.items()):
+            lines.append(f"studybuddy_http_requests_total{_labels(method=method, route=route, status=status)} {n}")
+
+        lines.append("# HELP studybuddy_http_request_duration_seconds Request latency by route.")
+        lines.append("# TYPE studybuddy_http_request_duration_seconds histogram")
+        _render_histogram(lines, "studybuddy_http_request_duration_seconds", _latency)
+
+        lines.append("# HELP studybuddy_firestore_round_trips_per_request Firestore RPCs per request by route.")
+        lines.append("# TYPE studybuddy_firestore_round_trips_per_request histogram")
+        _render_histogram(lines, "studybuddy_firestore_round_trips_per_request", _route_round_trips)
+
+        for field, help_text in (
+            ("reads", "Firestore documents read"),
+            ("writes", "Firestore writes committed"),
+            ("round_trips", "Firestore RPCs"),
+            ("bytes", "Firestore response bytes"),
+        ):
+            name = f"studybuddy_firestore_{field}_total"
+            lines.append(f"# HELP {name} {help_text}, by route.")
+            lines.append(f"# TYPE {name} counter")
+            for route, fs in sorted(_route_fs.items()):
+                lines.append(f"{name}{_labels(route=route)} {int(fs[field])}")
+
+        lines.append("# HELP studybuddy_firestore_rpcs_total Firestore RPCs by method.")
+        lines.append("# TYPE studybuddy_firestore_rpcs_total counter")
+        for rpc, n in sorted(_rpcs.items()):
+            lines.append(f"studybuddy_firestore_rpcs_total{_labels(rpc=rpc)} {n}")
+
+        lines.append("# HELP studybuddy_cache_requests_total Cache lookups by result.")
+        lines.append("# TYPE studybuddy_cache_requests_total counter")
+        for (cache, result), n in sorted(_cache.items()):
+            lines.append(f"studybuddy_cache_requests_total{_labels(cache=cache, result=result)} {n}")
+
+        lines.append("# HELP studybuddy_startup_seconds Cold-start time by phase.")
+        lines.append("# TYPE studybuddy_startup_seconds gauge")
+        for phase, sec in sorted(_startup.items()):
+            lines.append(f"studybuddy_startup_seconds{_labels(phase=phase)} {sec:.6f}")
+
+    return "\n".join(lines) + "\n"
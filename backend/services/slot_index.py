@@ -0,0 +1,183 @@
+# backend/services/slot_index.py
+"""
+Per-date in-memory index of availability slots, behind GET /rooms/search.
+
+Slot docs are written by the scrapers and only their live counters change
+during the day (and those live in services.counters). So instead of one
+composite index per filter combination (zone x floor x duration x time),
+each instance loads a date's slots with ONE projected query, keeps them for
+INDEX_TTL_SEC, and answers searches in memory:
+
+    index = slot_index.for_date(db, "2025-10-28")
+    index.search(zone="upper", floor=2, window=(600, 780), min_minutes=60)
+
+Rows are bucketed by campus zone and by building, and sorted by startMin so
+a window search stops at the first slot starting after the window ends.
+
+With SLOT_SNAPSHOT_URI set, a date that has a scraper-written snapshot is
+served from the mmapped file instead (services.slot_snapshot), with no
+Firestore query at all. A snapshot that is replaced or evicted is closed
+RETIRE_GRACE_SEC later, so requests still holding it can finish.
+"""
+import bisect
+import os
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from models.room import SlotRow
+from services import metrics, slot_snapshot
+
+COLLECTION = "availabilitySlots"
+INDEX_TTL_SEC = float(os.getenv("SLOT_INDEX_TTL_SEC", "300"))
+# replaced snapshots are unmapped after this long (no request takes longer)
+RETIRE_GRACE_SEC = 60.0
+
+INDEX_FIELDS = [
+    "roomId",
+    "buildingCode",
+    "roomNumber",
+    "date",
+    "start",
+    "end",
+    "startMin",
+    "endMin",
+    "durationMin",
+    "floor",
+    "campusZone",
+    "capacity",
+    "locked_reports",
+    "currentCheckins",
+]
+
+# date -> (expires_at_monotonic, SlotIndex)
+_indexes: Dict[str, tuple] = {}
+_lock = threading.Lock()
+# date -> Lock, so concurrent misses for one date load it once (pruned
+# along with the dates' index entries)
+_load_locks: Dict[str, threading.Lock] = {}
+# (retired_at_monotonic, index) waiting to be closed
+_retired: List[tuple] = []
+
+
+class SlotIndex:
+    """Immutable view of one date's slots."""
+
+    def __init__(self, date: str, rows: Iterable[SlotRow]):
+        self.date = date
+        self.rows: List[SlotRow] = sorted(rows, key=lambda r: (r.startMin, r.roomId))
+        self._starts = [r.startMin for r in self.rows]
+        self.by_zone: Dict[str, List[SlotRow]] = {}
+        self.by_building: Dict[str, List[SlotRow]] = {}
+        for r in self.rows:
+            self.by_zone.setdefault(r.campusZone or "", []).append(r)
+            self.by_building.setdefault(r.buildingCode, []).append(r)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def close(self):
+        """Nothing to release (DaySnapshot has the same method)."""
+
+    def search(
+        self,
+        *,
+        building: Optional[str] = None,
+        zone: Optional[str] = None,
+        floor: Optional[int] = None,
+        window: Tuple[int, int] = (0, 24 * 60),
+        min_minutes: int = 0,
+    ) -> List[Tuple[SlotRow, int, int]]:
+        """
+        (row, freeStartMin, freeEndMin) for every slot whose overlap with
+        `window` is at least `min_minutes` long (and at least one minute).
+        """
+        lo, hi = window
+        need = max(min_minutes, 1)
+        if building:
+            candidates = self.by_building.get(building, [])
+        elif zone:
+            candidates = self.by_zone.get(zone, [])
+        else:
+            # sorted by startMin: nothing starting at/after `hi - need` can fit
+            candidates = self.rows[:bisect.bisect_right(self._starts, hi - need)]
+
+        out = []
+        for r in candidates:
+            if zone and r.campusZone != zone:
+                continue
+            if floor is not None and r.floor != floor:
+                continue
+            free_start = max(r.startMin, lo)
+            free_end = min(r.endMin, hi)
+            if free_end - free_start >= need:
+                out.append((r, free_start, free_end))
+        return out
+
+
+def _retire(index, now: float):
+    """Queue a replaced/evicted index for closing; call with _lock held."""
+    _retired.append((now, index))
+
+
+def _prune_load_locks():
+    """Drop load locks of dates with no index and no load running; call with _lock held."""
+    for d in [d for d, lk in _load_locks.items() if d not in _indexes and not lk.locked()]:
+        del _load_locks[d]
+
+
+def _close_retired(now: float):
+    with _lock:
+        due = [ix for t, ix in _retired if now - t >= RETIRE_GRACE_SEC]
+        _retired[:] = [(t, ix) for t, ix in _retired if now - t < RETIRE_GRACE_SEC]
+    for ix in due:
+        ix.close()
+
+
+def _load(db, date: str, previous=None) -> SlotIndex:
+    snapshot = slot_snapshot.open_day(date, db.collection(COLLECTION), previous)
+    if snapshot is not None:
+        return snapshot
+    query = db.collection(COLLECTION).where("date", "==", date).select(INDEX_FIELDS)
+    return SlotIndex(date, (SlotRow.from_snapshot(s) for s in query.stream()))
+
+
+def for_date(db, date: str) -> SlotIndex:
+    """The index for `date`, loaded on first use and refreshed after INDEX_TTL_SEC."""
+    now = time.monotonic()
+    with _lock:
+        hit = _indexes.get(date)
+        if hit and hit[0] > now:
+            metrics.cache_hit("slot_index")
+            return hit[1]
+        load_lock = _load_locks.setdefault(date, threading.Lock())
+
+    with load_lock:
+        with _lock:
+            hit = _indexes.get(date)
+            if hit and hit[0] > time.monotonic():
+                metrics.cache_hit("slot_index")
+                return hit[1]
+        metrics.cache_miss("slot_index")
+        index = _load(db, date, hit[1] if hit else None)
+        with _lock:
+            if hit and hit[1] is not index:
+                _retire(hit[1], now)
+            _indexes[date] = (time.monotonic() + INDEX_TTL_SEC, index)
+            # past dates are rarely searched again; keep memory bounded
+            for stale in [d for d, (exp, _) in _indexes.items() if exp <= now and d != date]:
+                _retire(_indexes.pop(stale)[1], now)
+            _prune_load_locks()
+        _close_retired(now)
+        return index
+
+
+def invalidate(date: Optional[str] = None):
+    """Drop one date's index (or all), e.g. after re-uploading slots."""
+    now = time.monotonic()
+    with _lock:
+        dropped = list(_indexes) if date is None else [date]
+        for d in dropped:
+            if d in _indexes:
+                _retire(_indexes.pop(d)[1], now)
+        _prune_load_locks()
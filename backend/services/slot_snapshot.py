@@ -0,0 +1,303 @@
+# backend/services/slot_snapshot.py
+"""
+Memory-mapped per-day slot snapshots, an alternative source for slot_index.
+
+The scraper pipeline (generate_availability_slots.py) writes one fixed-width
+binary file per date, slots-YYYY-MM-DD.snap. When SLOT_SNAPSHOT_URI is set,
+slot_index serves a date from its snapshot instead of querying Firestore:
+
+    SLOT_SNAPSHOT_URI=/srv/snapshots            local directory
+    SLOT_SNAPSHOT_URI=gs://bucket/prefix        downloaded once per host into
+                                                SLOT_SNAPSHOT_CACHE_DIR
+
+The file is mmapped read-only and searched through typed memoryviews, so
+nothing is deserialized except the matching slots, and every worker on a host
+shares the same page-cache copy. Dates without a snapshot fall back to the
+Firestore query. slot_index closes a replaced snapshot (DaySnapshot.close);
+the map is released once the searches still using it have finished.
+
+Rows carry the same fields as SlotIndex rows: the slot doc values of
+locked_reports / currentCheckins / capacity as the pipeline uploaded them,
+to which /rooms/search adds the live shard totals (services.counters).
+
+Layout (little-endian; sections 8-byte aligned, in this order):
+
+    "SBSLOTS2"  n_slots u32, n_rooms u32, n_strings u32, blob_len u32
+    slot_room   u32[n_slots]     index into the room table
+    slot_start  u16[n_slots]     startMin; slots sorted by (startMin, roomId)
+    slot_end    u16[n_slots]     endMin
+    slot_reports  i32[n_slots]   locked_reports
+    slot_checkins i32[n_slots]   currentCheckins
+    slot_capacity i32[n_slots]   capacity, CAPACITY_NONE when unset
+    room_str    u32[n_rooms * 4] string ids: roomId, buildingCode, roomNumber, campusZone
+    room_floor  i16[n_rooms]     FLOOR_NONE when unknown
+    str_offsets u32[n_strings + 1]
+    blob        utf-8 strings; string 0 is the date
+
+"SBSLOTS1" files (written before the slot_* value sections existed) are
+still read; their rows have zero counters and no capacity.
+"""
+import array
+import bisect
+import logging
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import threading
+import time
+from typing import List, Optional, Tuple
+
+from models.room import SlotRow
+from services import metrics
+
+log = logging.getLogger("uvicorn.error")
+
+MAGIC = b"SBSLOTS2"
+MAGIC_V1 = b"SBSLOTS1"
+HEADER = struct.Struct("<4I")
+FLOOR_NONE = -32768
+CAPACITY_NONE = -1
+SNAPSHOT_URI = os.getenv("SLOT_SNAPSHOT_URI", "")
+CACHE_DIR = os.getenv("SLOT_SNAPSHOT_CACHE_DIR") or os.path.join(tempfile.gettempdir(), "studybuddy-slot-snapshots")
+# a downloaded copy older than this is fetched again (the scraper re-runs)
+MAX_AGE_SEC = float(os.getenv("SLOT_SNAPSHOT_MAX_AGE_SEC", "3600"))
+
+_download_lock = threading.Lock()
+
+
+def file_name(date: str) -> str:
+    return f"slots-{date}.snap"
+
+
+def _align(n: int) -> int:
+    return (n + 7) & ~7
+
+
+def _view(buf, offset: int, count: int, fmt: str):
+    """Typed read-only view of `count` items at `offset` (a copy on big-endian hosts)."""
+    size = struct.calcsize(fmt)
+    raw = buf[offset:offset + count * size]
+    if sys.byteorder == "little":
+        return raw.cast(fmt)
+    a = array.array(fmt, raw.tobytes())
+    a.byteswap()
+    return a
+
+
+class DaySnapshot:
+    """
+    One date's slots, read from an mmapped snapshot file. search() has the
+    same signature and result order as slot_index.SlotIndex.search().
+    """
+
+    def __init__(self, path: str, collection=None):
+        self.path = path
+        self._collection = collection
+        with open(path, "rb") as f:
+            self._stat = _file_id(os.fstat(f.fileno()))
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._buf = buf = memoryview(self._mm)
+        magic = bytes(buf[:len(MAGIC)])
+        if magic not in (MAGIC, MAGIC_V1):
+            buf.release()
+            self._mm.close()
+            raise ValueError(f"{path}: not a slot snapshot")
+        n_slots, n_rooms, n_strings, blob_len = HEADER.unpack_from(buf, len(MAGIC))
+
+        layout = [("room", n_slots, "I"), ("start", n_slots, "H"), ("end", n_slots, "H")]
+        if magic == MAGIC:
+            layout += [("reports", n_slots, "i"), ("checkins", n_slots, "i"), ("capacity", n_slots, "i")]
+        layout += [
+            ("room_str", n_rooms * 4, "I"),
+            ("room_floor", n_rooms, "h"),
+            ("str_offsets", n_strings + 1, "I"),
+        ]
+        pos = _align(len(MAGIC) + HEADER.size)
+        sections = {}
+        for name, count, fmt in layout:
+            sections[name] = _view(buf, pos, count, fmt)
+            pos = _align(pos + count * struct.calcsize(fmt))
+        self._blob = buf[pos:pos + blob_len]
+        # every view into the map, released by close()
+        self._views = [*sections.values(), self._blob]
+
+        self._room, self._start, self._end = sections["room"], sections["start"], sections["end"]
+        self._reports = sections.get("reports")
+        self._checkins = sections.get("checkins")
+        self._capacity = sections.get("capacity")
+        # searches in flight; close() defers the unmap until they finish
+        self._active = 0
+        self._closing = False
+        self._close_lock = threading.Lock()
+        self._room_str, self._room_floor = sections["room_str"], sections["room_floor"]
+        self._str_offsets = sections["str_offsets"]
+        self._strings: List[Optional[str]] = [None] * n_strings
+        self.n_rooms = n_rooms
+        self.date = self._str(0)
+
+    def __len__(self):
+        return len(self._start)
+
+    def is_current(self) -> bool:
+        """True while `path` is still the file this snapshot mapped."""
+        try:
+            return _file_id(os.stat(self.path)) == self._stat
+        except OSError:
+            return False
+
+    def close(self):
+        """Release the map (now, or when the last running search finishes)."""
+        with self._close_lock:
+            self._closing = True
+            if self._active:
+                return
+        self._unmap()
+
+    def _unmap(self):
+        for v in self._views:
+            if isinstance(v, memoryview):
+                v.release()
+        self._views = []
+        self._buf.release()
+        self._mm.close()
+
+    def _str(self, i: int) -> str:
+        s = self._strings[i]
+        if s is None:
+            s = self._strings[i] = str(self._blob[self._str_offsets[i]:self._str_offsets[i + 1]], "utf-8")
+        return s
+
+    def _room_field(self, room: int, k: int) -> str:
+        """k: 0 roomId, 1 buildingCode, 2 roomNumber, 3 campusZone."""
+        return self._str(self._room_str[room * 4 + k])
+
+    def _floor(self, room: int) -> Optional[int]:
+        f = self._room_floor[room]
+        return None if f == FLOOR_NONE else f
+
+    def _rooms_matching(self, building, zone, floor) -> Optional[set]:
+        if not building and not zone and floor is None:
+            return None
+        return {
+            r for r in range(self.n_rooms)
+            if (not building or self._room_field(r, 1) == building)
+            and (not zone or self._room_field(r, 3) == zone)
+            and (floor is None or self._floor(r) == floor)
+        }
+
+    def _row(self, i: int) -> SlotRow:
+        room, s, e = self._room[i], self._start[i], self._end[i]
+        room_id = self._room_field(room, 0)
+        slot_id = f"{room_id}_{self.date}_{s}_{e}"
+        ref = self._collection.document(slot_id) if self._collection is not None else None
+        capacity = self._capacity[i] if self._capacity is not None else CAPACITY_NONE
+        return SlotRow(slot_id, ref, {
+            "roomId": room_id,
+            "buildingCode": self._room_field(room, 1),
+            "roomNumber": self._room_field(room, 2),
+            "date": self.date,
+            "start": f"{s // 60:02d}:{s % 60:02d}",
+            "end": f"{e // 60:02d}:{e % 60:02d}",
+            "startMin": s,
+            "endMin": e,
+            "floor": self._floor(room),
+            "campusZone": self._room_field(room, 3),
+            "capacity": None if capacity == CAPACITY_NONE else capacity,
+            "locked_reports": self._reports[i] if self._reports is not None else 0,
+            "currentCheckins": self._checkins[i] if self._checkins is not None else 0,
+        })
+
+    def search(
+        self,
+        *,
+        building: Optional[str] = None,
+        zone: Optional[str] = None,
+        floor: Optional[int] = None,
+        window: Tuple[int, int] = (0, 24 * 60),
+        min_minutes: int = 0,
+    ) -> List[Tuple[SlotRow, int, int]]:
+        with self._close_lock:
+            if self._closing:
+                raise ValueError(f"{self.path}: snapshot is closed")
+            self._active += 1
+        try:
+            return self._search(building, zone, floor, window, min_minutes)
+        finally:
+            with self._close_lock:
+                self._active -= 1
+                unmap = self._closing and not self._active
+            if unmap:
+                self._unmap()
+
+    def _search(self, building, zone, floor, window, min_minutes):
+        lo, hi = window
+        need = max(min_minutes, 1)
+        allowed = self._rooms_matching(building, zone, floor)
+        starts, ends, rooms = self._start, self._end, self._room
+        out = []
+        # sorted by startMin: nothing starting after `hi - need` can fit
+        for i in range(bisect.bisect_right(starts, hi - need)):
+            if allowed is not None and rooms[i] not in allowed:
+                continue
+            free_start = max(starts[i], lo)
+            free_end = min(ends[i], hi)
+            if free_end - free_start >= need:
+                out.append((self._row(i), free_start, free_end))
+        return out
+
+
+def _file_id(st) -> tuple:
+    return st.st_ino, st.st_size, st.st_mtime_ns
+
+
+def _local_path(date: str) -> Optional[str]:
+    """Local snapshot file for `date`, downloading it first for gs:// URIs."""
+    if not SNAPSHOT_URI.startswith("gs://"):
+        path = os.path.join(SNAPSHOT_URI, file_name(date))
+        return path if os.path.exists(path) else None
+
+    path = os.path.join(CACHE_DIR, file_name(date))
+    with _download_lock:
+        try:
+            if time.time() - os.path.getmtime(path) < MAX_AGE_SEC:
+                return path
+        except OSError:
+            pass
+        bucket, _, prefix = SNAPSHOT_URI[len("gs://"):].partition("/")
+        name = f"{prefix.rstrip('/')}/{file_name(date)}".lstrip("/")
+        tmp = f"{path}.{os.getpid()}.tmp"
+        try:
+            from google.cloud import storage  # only needed for bucket snapshots
+
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            storage.Client().bucket(bucket).blob(name).download_to_filename(tmp)
+        except Exception as e:
+            # NotFound for dates the pipeline hasn't produced, or no GCS access
+            # (library, credentials, network); Firestore covers them
+            log.debug("[slot_snapshot] gs://%s/%s: %s: %s", bucket, name, type(e).__name__, e)
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            return path if os.path.exists(path) else None
+        # atomic: workers that already mapped the old file keep their copy
+        os.replace(tmp, path)
+        return path
+
+
+def open_day(date: str, collection=None, previous=None) -> Optional[DaySnapshot]:
+    """
+    The snapshot for `date`, or None when snapshots are off or there is none.
+    `previous` (the date's last DaySnapshot) is returned as is when its file
+    hasn't changed, so a refresh doesn't map the same file again.
+    """
+    if not SNAPSHOT_URI:
+        return None
+    path = _local_path(date)
+    if path is None:
+        metrics.cache_miss("slot_snapshot")
+        return None
+    metrics.cache_hit("slot_snapshot")
+    if isinstance(previous, DaySnapshot) and previous.path == path and previous.is_current():
+        return previous
+    return DaySnapshot(path, collection)
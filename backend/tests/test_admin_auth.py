@@ -0,0 +1,40 @@
+# backend/tests/test_admin_auth.py
+# The /rooms/admin endpoints must reject non-admin callers with 403 before
+# touching Firestore (auth.require_admin).
+#
+#   cd backend && python -m pytest -q tests
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import auth
+from routers import rooms
+
+ADMIN_ENDPOINTS = [
+    "/rooms/admin/reset_locked_reports",
+    "/rooms/admin/reset_locked_reports?purgeLegacy=true",
+    "/rooms/admin/expire_checkins",
+]
+
+
+def _client(monkeypatch, claims):
+    def no_db():
+        raise AssertionError("non-admin request reached Firestore")
+
+    monkeypatch.setattr(rooms, "get_db", no_db)
+    app = FastAPI()
+    app.include_router(rooms.router, prefix="/rooms")
+    app.dependency_overrides[auth.verify_firebase_token] = lambda: claims
+    return TestClient(app)
+
+
+@pytest.mark.parametrize("claims", [
+    {"firebase": {"sign_in_provider": "google.com"}, "uid": "u1", "email": "student@student.csulb.edu"},
+    {"firebase": {"sign_in_provider": "google.com"}, "uid": "u1", "email": "student@student.csulb.edu", "admin": "true"},
+    {"email": "someone-else@project.iam.gserviceaccount.com"},
+])
+@pytest.mark.parametrize("path", ADMIN_ENDPOINTS)
+def test_non_admin_is_forbidden(monkeypatch, claims, path):
+    response = _client(monkeypatch, claims).post(path)
+    assert response.status_code == 403
+    assert response.json()["detail"] == "Admin access required"